@@ -1,6 +1,6 @@
 from typing import Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 
 from app.models.alert import Alert, AlertRule, AlertRuleCreate, AlertStatus
 from app.services.alert_service import get_alert_service
@@ -10,6 +10,11 @@ router = APIRouter()
 
 @router.post("/rules", response_model=AlertRule, status_code=201)
 async def create_rule(rule: AlertRuleCreate):
+    if rule.aggregate and not rule.window_seconds:
+        raise HTTPException(
+            status_code=400, detail="window_seconds is required with aggregate"
+        )
+
     service = get_alert_service()
     return await service.create_rule(rule)
 
@@ -1,16 +1,100 @@
+import inspect
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Literal, Optional, Union
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 
-from app.models.telemetry import TelemetryBatch, TelemetryPoint, TelemetryQuery
+from app.core.offload import get_batch_offloader
+from app.core.payloads import (
+    JSON_MEDIA_TYPES,
+    MSGPACK_MEDIA_TYPES,
+    PayloadValidationError,
+    UnsupportedPayloadError,
+    decode_batch,
+    decode_point,
+)
+from app.core.rate_limiter import BatchTooLargeError
+from app.models.telemetry import (
+    LatestValue,
+    LatestValuesQuery,
+    RollupResolution,
+    TelemetryBatch,
+    TelemetryPoint,
+    TelemetryQuery,
+    TelemetryRollup,
+)
 from app.services.telemetry_service import get_telemetry_service
 
 router = APIRouter()
 
+MAX_NDJSON_LINE_BYTES = 65536
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
-@router.post("/point", status_code=202)
-async def ingest_point(point: TelemetryPoint):
+_points_adapter = TypeAdapter(list[TelemetryPoint])
+_rollups_adapter = TypeAdapter(list[TelemetryRollup])
+
+
+def _request_body(model) -> dict:
+    schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+    schema.pop("$defs", None)
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                media: {"schema": schema}
+                for media in sorted(JSON_MEDIA_TYPES | MSGPACK_MEDIA_TYPES)
+            },
+        }
+    }
+
+
+async def _read_payload(request: Request, decoder):
+    try:
+        payload = decoder(await request.body(), request.headers.get("content-type"))
+        return await payload if inspect.isawaitable(payload) else payload
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    except PayloadValidationError as e:
+        raise RequestValidationError(e.errors)
+    except UnsupportedPayloadError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+
+async def _decode_batch(body: bytes, content_type: Optional[str]):
+    offloader = get_batch_offloader()
+    if offloader.should_offload(len(body)):
+        return await offloader.prepare(body, content_type)
+    return decode_batch(body, content_type), None
+
+
+async def _iter_ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    pending = b""
+    oversized = False
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        if lines and oversized:
+            lines.pop(0)
+            oversized = False
+        for line in lines:
+            if line.strip():
+                yield line
+        if len(pending) > MAX_NDJSON_LINE_BYTES:
+            pending = b""
+            if not oversized:
+                oversized = True
+                yield b""
+
+    if pending.strip() and not oversized:
+        yield pending
+
+
+@router.post("/point", status_code=202, openapi_extra=_request_body(TelemetryPoint))
+async def ingest_point(request: Request):
+    point = await _read_payload(request, decode_point)
     service = get_telemetry_service()
     try:
         await service.ingest_point(point)
@@ -21,25 +105,65 @@ async def ingest_point(point: TelemetryPoint):
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/batch", status_code=202)
-async def ingest_batch(batch: TelemetryBatch):
+@router.post("/batch", status_code=202, openapi_extra=_request_body(TelemetryBatch))
+async def ingest_batch(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="idempotency-key"),
+):
+    batch, writes = await _read_payload(request, _decode_batch)
+    if batch.batch_id is None:
+        batch.batch_id = idempotency_key
     service = get_telemetry_service()
     try:
-        await service.ingest_batch(batch)
+        if not await service.ingest_batch(batch, writes):
+            return {"status": "duplicate", "count": len(batch.points)}
         return {"status": "accepted", "count": len(batch.points)}
+    except BatchTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except ValueError as e:
         if "Rate limit exceeded" in str(e):
             raise HTTPException(status_code=429, detail=str(e))
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/{device_id}", response_model=list[TelemetryPoint])
+@router.post("/bulk", status_code=202)
+async def ingest_bulk(request: Request):
+    service = get_telemetry_service()
+    result = await service.ingest_bulk(_iter_ndjson_lines(request))
+
+    devices = result["devices"]
+    return {
+        "status": "accepted",
+        "accepted": sum(c["accepted"] for c in devices.values()),
+        "rejected": sum(c["rejected"] for c in devices.values()),
+        "invalid": result["invalid"],
+        "devices": devices,
+    }
+
+
+@router.post("/latest", response_model=dict[str, dict[str, LatestValue]])
+async def get_latest_values(query: LatestValuesQuery):
+    if not query.device_ids and not query.group_id:
+        raise HTTPException(
+            status_code=400, detail="Provide device_ids or group_id to look up"
+        )
+    service = get_telemetry_service()
+    return await service.get_latest_values(query)
+
+
+@router.get(
+    "/{device_id}",
+    response_model=Union[list[TelemetryPoint], list[TelemetryRollup]],
+)
 async def query_telemetry(
     device_id: str,
     metric: Optional[str] = None,
     start_time: Optional[datetime] = None,
     end_time: Optional[datetime] = None,
-    limit: int = 100,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    resolution: Optional[RollupResolution] = None,
+    response_format: Literal["json", "ndjson"] = Query("json", alias="format"),
 ):
     service = get_telemetry_service()
     query = TelemetryQuery(
@@ -47,9 +171,42 @@ async def query_telemetry(
         metric=metric,
         start_time=start_time,
         end_time=end_time,
-        limit=limit,
+        limit=limit if limit is not None else 100,
+        cursor=cursor,
+        resolution=resolution,
+    )
+
+    if resolution:
+        if cursor:
+            raise HTTPException(
+                status_code=400,
+                detail="Cursor pagination is not supported for rollup queries",
+            )
+        rollups = await service.query_rollups(query)
+        if response_format == "ndjson":
+            return Response(
+                content=b"".join(r.model_dump_json().encode() + b"\n" for r in rollups),
+                media_type="application/x-ndjson",
+            )
+        return Response(
+            content=_rollups_adapter.dump_json(rollups), media_type="application/json"
+        )
+
+    if response_format == "ndjson":
+
+        async def ndjson_pages():
+            async for points in service.stream_telemetry(query, max_points=limit):
+                yield b"".join(p.model_dump_json().encode() + b"\n" for p in points)
+
+        return StreamingResponse(ndjson_pages(), media_type="application/x-ndjson")
+
+    points, next_cursor = await service.query_telemetry_page(query)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return Response(
+        content=_points_adapter.dump_json(points),
+        media_type="application/json",
+        headers=headers,
     )
-    return await service.query_telemetry(query)
 
 
 @router.get("/{device_id}/{metric}/latest", response_model=TelemetryPoint)
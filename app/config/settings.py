@@ -9,8 +9,12 @@ class Settings(BaseSettings):
     redis_socket_timeout: int = 5
 
     rate_limit_telemetry_per_device: int = 100
+    rate_limit_telemetry_points_per_device: int = 10000
     rate_limit_window_seconds: int = 60
+    rate_limit_telemetry_per_group: int = 0
     rate_limit_global_per_second: int = 10000
+    rate_limit_global_lease_size: int = 100
+    rate_limit_global_lease_refill_ratio: float = 0.5
 
     circuit_breaker_failure_threshold: int = 6
     circuit_breaker_timeout_seconds: int = 60
@@ -21,9 +25,96 @@ class Settings(BaseSettings):
 
     telemetry_batch_max_size: int = 1000
     telemetry_retention_seconds: int = 86400
+    telemetry_chunk_span_seconds: int = 7200
+    telemetry_chunk_compact_blocks: int = 32
+    telemetry_query_page_size: int = 1000
+
+    telemetry_cold_tier_enabled: bool = False
+    telemetry_cold_tier_path: str = "data/telemetry"
+    telemetry_cold_tier_age_seconds: int = 14400
+    telemetry_cold_tier_retention_seconds: int = 7776000
+    telemetry_cold_tier_interval_seconds: int = 300
+
+    telemetry_rollups_enabled: bool = True
+    telemetry_rollup_1m_retention_seconds: int = 2592000
+    telemetry_rollup_1h_retention_seconds: int = 31536000
+    telemetry_rollup_1d_retention_seconds: int = 157680000
+
+    telemetry_dedupe_window_seconds: int = 600
+    telemetry_dedupe_slice_seconds: int = 60
+    telemetry_dedupe_bloom_bits: int = 8388608
+    telemetry_dedupe_bloom_hashes: int = 5
+    telemetry_dedupe_sequence_window: int = 1024
+    telemetry_dedupe_claim_ttl_seconds: int = 30
+
+    telemetry_offload_enabled: bool = False
+    telemetry_offload_workers: int = 2
+    telemetry_offload_min_bytes: int = 262144
+
+    telemetry_stream_ingest_enabled: bool = False
+    telemetry_stream_partitions: int = 8
+    telemetry_stream_max_len: int = 1000000
+    telemetry_stream_group: str = "persisters"
+    telemetry_stream_in_process_consumer: bool = True
+    telemetry_stream_read_count: int = 1000
+    telemetry_stream_block_ms: int = 1000
+    telemetry_stream_claim_idle_ms: int = 30000
+    telemetry_stream_claim_interval_ms: int = 5000
+
+    telemetry_write_behind_enabled: bool = False
+    telemetry_write_behind_linger_ms: int = 50
+    telemetry_write_behind_flush_size: int = 5000
+    telemetry_write_behind_max_points: int = 50000
+    telemetry_write_behind_max_retries: int = 10
+    telemetry_write_behind_flush_on_shutdown: bool = True
+
+    ingest_pipeline_async_side_stages: bool = False
+    ingest_pipeline_queue_size: int = 10000
+    ingest_pipeline_batch_size: int = 100
+    ingest_pipeline_linger_ms: int = 5
+    ingest_pipeline_activity_concurrency: int = 1
+    ingest_pipeline_alert_concurrency: int = 4
+    ingest_pipeline_event_concurrency: int = 2
+
+    device_last_seen_coalesce_ms: int = 1000
+
+    analytics_counter_flush_interval_ms: int = 1000
+    analytics_rate_bucket_seconds: int = 10
+    analytics_rate_window_seconds: int = 60
 
     event_bus_queue_max_size: int = 10000
+    event_bus_high_priority_queue_max_size: int = 10000
+    event_bus_low_priority_queue_max_size: int = 10000
+    event_bus_topic_priorities: dict[str, str] = {
+        "alert.triggered": "high",
+        "alert.rules": "high",
+        "telemetry.ingested": "low",
+    }
+    event_bus_topic_overflow: dict[str, str] = {
+        "alert.triggered": "block",
+        "alert.rules": "block",
+        "telemetry.ingested": "sample",
+    }
+    event_bus_default_overflow: str = "drop_newest"
+    event_bus_sample_threshold: float = 0.5
+    event_bus_sample_every: int = 10
     event_bus_worker_count: int = 4
+    event_bus_transport_enabled: bool = False
+    event_bus_local_topics: list[str] = ["telemetry.ingested"]
+    event_bus_transport_block_ms: int = 1000
+    event_bus_transport_read_count: int = 500
+    event_bus_transport_claim_idle_ms: int = 30000
+    event_bus_transport_claim_interval_ms: int = 5000
+    event_bus_sync_handler_threads: int = 8
+
+    event_store_max_len: int = 100000
+    event_store_retention_seconds: int = 86400
+    event_store_write_behind_enabled: bool = True
+    event_store_linger_ms: int = 20
+    event_store_flush_size: int = 500
+    event_store_max_pending: int = 10000
+
+    alert_window_slots: int = 12
 
     backpressure_queue_threshold: int = 8000
     backpressure_reject_threshold: int = 9500
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Optional
+
+from app.config.settings import get_settings
+from app.core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = "global"
+
+
+def group_scope(group_id: str) -> str:
+    return f"group:{group_id}"
+
+
+def device_scope(device_id: str) -> str:
+    return f"device:{device_id}"
+
+
+class ThroughputCounters:
+    def __init__(self):
+        self.redis = None
+        self.settings = get_settings()
+        self.pending_buckets: dict[tuple[int, str], int] = defaultdict(int)
+        self.running = False
+        self.flusher: Optional[asyncio.Task] = None
+        self.stopping: asyncio.Event = None
+
+    async def initialize(self):
+        if not self.redis:
+            self.redis = await get_redis_client()
+
+    async def start(self):
+        await self.initialize()
+        self.stopping = asyncio.Event()
+        self.running = True
+        self.flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        self.running = False
+
+        if self.flusher:
+            self.stopping.set()
+            await asyncio.gather(self.flusher, return_exceptions=True)
+            self.flusher = None
+
+        await self.flush()
+
+    def _bucket_key(self, bucket: int) -> str:
+        return f"analytics:rate:{bucket}"
+
+    def _bucket(self, now: float) -> int:
+        size = self.settings.analytics_rate_bucket_seconds
+        return int(now) // size * size
+
+    async def record(
+        self, device_id: str, count: int, group_id: Optional[str] = None
+    ) -> None:
+        bucket = self._bucket(time.time())
+
+        self.pending_buckets[(bucket, GLOBAL_SCOPE)] += count
+        self.pending_buckets[(bucket, device_scope(device_id))] += count
+        if group_id:
+            self.pending_buckets[(bucket, group_scope(group_id))] += count
+
+        if not self.running:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self.pending_buckets:
+            return
+
+        await self.initialize()
+
+        buckets = self.pending_buckets
+        self.pending_buckets = defaultdict(int)
+
+        ttl = self.settings.analytics_rate_window_seconds * 2
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for (bucket, scope), count in buckets.items():
+                    pipe.hincrby(self._bucket_key(bucket), scope, count)
+
+                for bucket in {bucket for bucket, _ in buckets}:
+                    pipe.expire(self._bucket_key(bucket), ttl)
+
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Counter flush failed, retrying next interval: {e}")
+            for key, count in buckets.items():
+                self.pending_buckets[key] += count
+
+    async def _flush_loop(self):
+        interval = self.settings.analytics_counter_flush_interval_ms / 1000
+
+        while self.running:
+            try:
+                await asyncio.wait_for(self.stopping.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def get_rate(self, scope: str, window_seconds: Optional[int] = None) -> float:
+        await self.initialize()
+
+        window = window_seconds or self.settings.analytics_rate_window_seconds
+        size = self.settings.analytics_rate_bucket_seconds
+        now = time.time()
+        current = self._bucket(now)
+        span = (max(window // size, 1) - 1) * size
+        buckets = list(range(current - span, current + 1, size))
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for bucket in buckets:
+                pipe.hget(self._bucket_key(bucket), scope)
+            values = await pipe.execute()
+
+        total = sum(int(v) for v in values if v)
+        total += sum(self.pending_buckets.get((bucket, scope), 0) for bucket in buckets)
+
+        elapsed = now - buckets[0]
+        return total / elapsed if elapsed > 0 else 0.0
+
+
+_counters = ThroughputCounters()
+
+
+def get_throughput_counters() -> ThroughputCounters:
+    return _counters
@@ -0,0 +1,178 @@
+import hashlib
+import time
+from typing import Optional
+
+from app.config.settings import get_settings
+from app.core.redis_client import get_redis_client
+from app.core.scripts import get_script_registry
+
+CLAIM_SCRIPT = """
+local sequence = ARGV[1]
+local ttl = tonumber(ARGV[2])
+local claims = tonumber(ARGV[3])
+local slices = tonumber(ARGV[4])
+
+if sequence ~= '' and redis.call('ZSCORE', KEYS[1], sequence) then
+    return 0
+end
+
+if #ARGV > 4 then
+    for i = claims + 2, claims + slices + 1 do
+        local seen = true
+        for p = 5, #ARGV do
+            if redis.call('GETBIT', KEYS[i], ARGV[p]) == 0 then
+                seen = false
+                break
+            end
+        end
+        if seen then
+            return 0
+        end
+    end
+end
+
+for i = 2, claims + 1 do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        return 0
+    end
+end
+
+for i = 2, claims + 1 do
+    redis.call('SET', KEYS[i], 1, 'PX', ttl)
+end
+return 1
+"""
+
+get_script_registry().register("dedupe_claim", CLAIM_SCRIPT)
+
+
+class BatchDeduplicator:
+    def __init__(self):
+        self.redis = None
+        self.settings = get_settings()
+        self.scripts = get_script_registry()
+
+    async def initialize(self):
+        if not self.redis:
+            self.redis = await get_redis_client()
+
+    def _slice(self, now: float) -> int:
+        size = self.settings.telemetry_dedupe_slice_seconds
+        return int(now) // size * size
+
+    def _slice_key(self, slice_start: int) -> str:
+        return f"dedupe:batch:{slice_start}"
+
+    def _sequence_key(self, device_id: str) -> str:
+        return f"dedupe:sequence:{device_id}"
+
+    def _window_slices(self, now: float) -> list[int]:
+        size = self.settings.telemetry_dedupe_slice_seconds
+        current = self._slice(now)
+        count = -(-self.settings.telemetry_dedupe_window_seconds // size)
+        return [current - size * n for n in range(count + 1)]
+
+    def _positions(self, device_id: str, batch_id: str) -> list[int]:
+        digest = hashlib.blake2b(
+            f"{device_id}\0{batch_id}".encode(), digest_size=16
+        ).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        bits = self.settings.telemetry_dedupe_bloom_bits
+        return [
+            (h1 + n * h2) % bits
+            for n in range(self.settings.telemetry_dedupe_bloom_hashes)
+        ]
+
+    def _claim_keys(
+        self, device_id: str, batch_id: Optional[str], sequence: Optional[int]
+    ) -> list[str]:
+        keys = []
+        if batch_id is not None:
+            keys.append(f"dedupe:claim:{device_id}:batch:{batch_id}")
+        if sequence is not None:
+            keys.append(f"dedupe:claim:{device_id}:sequence:{sequence}")
+        return keys
+
+    async def claim(
+        self,
+        device_id: str,
+        batch_id: Optional[str] = None,
+        sequence: Optional[int] = None,
+    ) -> bool:
+        if batch_id is None and sequence is None:
+            return True
+
+        claims = self._claim_keys(device_id, batch_id, sequence)
+        slices = []
+        positions = []
+        if batch_id is not None:
+            slices = [
+                self._slice_key(slice_start)
+                for slice_start in self._window_slices(time.time())
+            ]
+            positions = self._positions(device_id, batch_id)
+
+        claimed = await self.scripts.call(
+            "dedupe_claim",
+            [self._sequence_key(device_id), *claims, *slices],
+            [
+                "" if sequence is None else sequence,
+                self.settings.telemetry_dedupe_claim_ttl_seconds * 1000,
+                len(claims),
+                len(slices),
+                *positions,
+            ],
+        )
+        return bool(claimed)
+
+    async def release(
+        self,
+        device_id: str,
+        batch_id: Optional[str] = None,
+        sequence: Optional[int] = None,
+    ) -> None:
+        claims = self._claim_keys(device_id, batch_id, sequence)
+        if not claims:
+            return
+
+        await self.initialize()
+        await self.redis.delete(*claims)
+
+    async def remember(
+        self,
+        device_id: str,
+        batch_id: Optional[str] = None,
+        sequence: Optional[int] = None,
+    ) -> None:
+        if batch_id is None and sequence is None:
+            return
+
+        await self.initialize()
+        window = self.settings.telemetry_dedupe_window_seconds
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            if sequence is not None:
+                key = self._sequence_key(device_id)
+                limit = self.settings.telemetry_dedupe_sequence_window
+                pipe.zadd(key, {sequence: sequence})
+                pipe.zremrangebyrank(key, 0, -(limit + 1))
+                pipe.expire(key, window)
+            if batch_id is not None:
+                slice_start = self._slice(time.time())
+                key = self._slice_key(slice_start)
+                bitfield = pipe.bitfield(key)
+                for position in self._positions(device_id, batch_id):
+                    bitfield.set("u1", position, 1)
+                bitfield.execute()
+                pipe.expire(key, window + self.settings.telemetry_dedupe_slice_seconds)
+            claims = self._claim_keys(device_id, batch_id, sequence)
+            pipe.delete(*claims)
+            await pipe.execute()
+
+
+_deduplicator = BatchDeduplicator()
+
+
+def get_batch_deduplicator() -> BatchDeduplicator:
+    return _deduplicator
@@ -1,71 +1,292 @@
 import asyncio
+import itertools
 import logging
-from collections import defaultdict
-from typing import Callable
+import zlib
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Callable, Optional
 
 from app.config.settings import get_settings
+from app.core.event_transport import RedisEventTransport
+from app.storage.event_buffer import get_event_buffer
 from app.storage.event_store import get_event_store
 
 logger = logging.getLogger(__name__)
 
 
+class EventPriority(str, Enum):
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+class OverflowPolicy(str, Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    SAMPLE = "sample"
+
+
+class DeliveryMode(str, Enum):
+    BROADCAST = "broadcast"
+    COMPETING = "competing"
+
+
+class EventLane:
+    def __init__(self, capacities: dict[EventPriority, int]):
+        self.capacities = capacities
+        self.queues: dict[EventPriority, deque] = {
+            priority: deque() for priority in EventPriority
+        }
+        self.changed = asyncio.Condition()
+        self.closed = False
+
+    def depth(self, priority: EventPriority) -> int:
+        return len(self.queues[priority])
+
+    def full(self, priority: EventPriority) -> bool:
+        return self.depth(priority) >= self.capacities[priority]
+
+    def qsize(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    async def put(self, priority: EventPriority, event: dict) -> None:
+        async with self.changed:
+            self.queues[priority].append(event)
+            self.changed.notify_all()
+
+    async def put_wait(self, priority: EventPriority, event: dict) -> bool:
+        async with self.changed:
+            await self.changed.wait_for(lambda: self.closed or not self.full(priority))
+            if self.closed:
+                return False
+            self.queues[priority].append(event)
+            self.changed.notify_all()
+            return True
+
+    def pop_oldest(self, priority: EventPriority) -> dict:
+        return self.queues[priority].popleft()
+
+    async def get(self) -> dict:
+        async with self.changed:
+            await self.changed.wait_for(self.qsize)
+            queue = next(queue for queue in self.queues.values() if queue)
+            event = queue.popleft()
+            self.changed.notify_all()
+            return event
+
+    async def close(self) -> None:
+        async with self.changed:
+            self.closed = True
+            self.changed.notify_all()
+
+
 class EventBus:
     def __init__(self):
         self.subscribers: dict[str, list[Callable]] = defaultdict(list)
+        self.group_subscribers: dict[tuple[str, str], list[Callable]] = defaultdict(
+            list
+        )
         self.settings = get_settings()
-        self.queue: asyncio.Queue = None
+        self.lanes: list[EventLane] = []
         self.workers: list[asyncio.Task] = []
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.round_robin = itertools.count()
         self.running = False
         self.event_store = get_event_store()
+        self.event_buffer = get_event_buffer()
+        self.transport: Optional[RedisEventTransport] = None
+        self.policies: dict[str, tuple[EventPriority, OverflowPolicy]] = {}
+        self.published: dict[str, int] = defaultdict(int)
+        self.dropped: dict[str, int] = defaultdict(int)
+        self.sampled: dict[str, int] = defaultdict(int)
 
     async def start(self):
-        self.queue = asyncio.Queue(maxsize=self.settings.event_bus_queue_max_size)
+        partitions = self.settings.event_bus_worker_count
+        capacities = {
+            EventPriority.HIGH: self.settings.event_bus_high_priority_queue_max_size,
+            EventPriority.NORMAL: self.settings.event_bus_queue_max_size,
+            EventPriority.LOW: self.settings.event_bus_low_priority_queue_max_size,
+        }
+        capacities = {
+            priority: max(size // partitions, 1)
+            for priority, size in capacities.items()
+        }
+        self.lanes = [EventLane(capacities) for _ in range(partitions)]
+        self.policies.clear()
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.settings.event_bus_sync_handler_threads,
+            thread_name_prefix="event-handler",
+        )
         self.running = True
 
-        for i in range(self.settings.event_bus_worker_count):
+        for i in range(partitions):
             worker = asyncio.create_task(self._worker(i))
             self.workers.append(worker)
 
-        logger.info(
-            f"Event bus started with {self.settings.event_bus_worker_count} workers"
-        )
+        if self.settings.event_bus_transport_enabled:
+            self.transport = RedisEventTransport(self)
+            await self.transport.start()
+
+        logger.info(f"Event bus started with {partitions} partitioned workers")
 
     async def stop(self):
+        if self.transport:
+            await self.transport.stop()
+            self.transport = None
+
         self.running = False
 
+        for lane in self.lanes:
+            await lane.close()
+
         for worker in self.workers:
             worker.cancel()
 
         await asyncio.gather(*self.workers, return_exceptions=True)
         self.workers.clear()
 
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
         logger.info("Event bus stopped")
 
-    def subscribe(self, topic: str, handler: Callable):
-        self.subscribers[topic].append(handler)
+    def subscribe(
+        self,
+        topic: str,
+        handler: Callable,
+        mode: DeliveryMode = DeliveryMode.BROADCAST,
+        group: str = "workers",
+    ):
+        if mode == DeliveryMode.COMPETING:
+            self.group_subscribers[(topic, group)].append(handler)
+        else:
+            self.subscribers[topic].append(handler)
+
+    def is_local(self, topic: str) -> bool:
+        return self.transport is None or topic in self.settings.event_bus_local_topics
 
-    async def publish(self, topic: str, event_type: str, payload: dict):
+    def remote_topics(self, group: Optional[str] = None) -> list[str]:
+        if group is None:
+            topics = [topic for topic, handlers in self.subscribers.items() if handlers]
+        else:
+            topics = [
+                topic
+                for (topic, name), handlers in self.group_subscribers.items()
+                if name == group and handlers
+            ]
+        return sorted(topic for topic in topics if not self.is_local(topic))
+
+    def remote_groups(self) -> set[str]:
+        return {
+            group
+            for (topic, group), handlers in self.group_subscribers.items()
+            if handlers and not self.is_local(topic)
+        }
+
+    async def publish(
+        self,
+        topic: str,
+        event_type: str,
+        payload: dict,
+        durable: bool = False,
+        key: Optional[str] = None,
+        wait: bool = False,
+    ) -> bool:
         event = {
             "topic": topic,
             "type": event_type,
             "payload": payload,
         }
 
-        await self.event_store.append_event(topic, event_type, payload)
+        record = self.event_store.build_event(topic, event_type, payload)
+        await self.event_buffer.add(record, wait=durable)
 
-        try:
-            self.queue.put_nowait(event)
-        except asyncio.QueueFull:
-            logger.error(f"Event queue full, dropping event: {topic}/{event_type}")
+        if not self.lanes:
+            return False
+
+        self.published[topic] += 1
+        if not self.is_local(topic):
+            return True
+
+        return await self._enqueue(event, key or payload.get("device_id"), wait)
+
+    async def deliver(self, event: dict, group: Optional[str] = None) -> bool:
+        event = {**event, "remote": True, "group": group}
+        return await self._enqueue(event, event["payload"].get("device_id"), True)
+
+    async def _enqueue(self, event: dict, key: Optional[str], wait: bool) -> bool:
+        topic = event["topic"]
+        lane = self.lanes[self._partition(key)]
+        priority, overflow = self._policy(topic)
+
+        if wait or overflow == OverflowPolicy.BLOCK:
+            if await lane.put_wait(priority, event):
+                return True
+            self._drop(topic)
+            return False
+
+        if (
+            overflow == OverflowPolicy.SAMPLE
+            and lane.depth(priority)
+            >= lane.capacities[priority] * self.settings.event_bus_sample_threshold
+        ):
+            self.sampled[topic] += 1
+            if self.sampled[topic] % self.settings.event_bus_sample_every:
+                self._drop(topic)
+                return False
+
+        if lane.full(priority):
+            if overflow != OverflowPolicy.DROP_OLDEST:
+                self._drop(topic)
+                return False
+            self._drop(lane.pop_oldest(priority)["topic"])
+
+        await lane.put(priority, event)
+        return True
+
+    def _policy(self, topic: str) -> tuple[EventPriority, OverflowPolicy]:
+        if topic not in self.policies:
+            self.policies[topic] = (
+                EventPriority(
+                    self.settings.event_bus_topic_priorities.get(
+                        topic, EventPriority.NORMAL
+                    )
+                ),
+                OverflowPolicy(
+                    self.settings.event_bus_topic_overflow.get(
+                        topic, self.settings.event_bus_default_overflow
+                    )
+                ),
+            )
+        return self.policies[topic]
+
+    def _drop(self, topic: str) -> None:
+        self.dropped[topic] += 1
+        if self.dropped[topic] == 1 or self.dropped[topic] % 1000 == 0:
+            logger.error(
+                f"Event lane full, dropped {self.dropped[topic]} events on {topic}"
+            )
+
+    def _partition(self, key: Optional[str]) -> int:
+        if key is None:
+            return next(self.round_robin) % len(self.lanes)
+        return zlib.crc32(str(key).encode()) % len(self.lanes)
 
     async def _worker(self, worker_id: int):
         logger.info(f"Event bus worker {worker_id} started")
+        lane = self.lanes[worker_id]
 
         while self.running:
             try:
-                event = await asyncio.wait_for(self.queue.get(), timeout=1.0)
+                event = await asyncio.wait_for(lane.get(), timeout=1.0)
                 await self._process_event(event)
-                self.queue.task_done()
+                if event.get("group"):
+                    await self.event_store.ack(
+                        event["topic"], event["group"], [event["id"]]
+                    )
             except asyncio.TimeoutError:
                 continue
             except Exception as e:
@@ -75,19 +296,55 @@ class EventBus:
 
     async def _process_event(self, event: dict):
         topic = event["topic"]
-        handlers = self.subscribers.get(topic, [])
+        if event.get("group"):
+            handlers = self.group_subscribers.get((topic, event["group"]), [])
+        elif event.get("remote"):
+            handlers = self.subscribers.get(topic, [])
+        else:
+            handlers = self.subscribers.get(topic, []) + [
+                handler
+                for (name, _), group_handlers in self.group_subscribers.items()
+                if name == topic
+                for handler in group_handlers
+            ]
 
-        for handler in handlers:
-            try:
-                if asyncio.iscoroutinefunction(handler):
-                    await handler(event)
-                else:
-                    handler(event)
-            except Exception as e:
-                logger.error(f"Error in event handler for {topic}: {e}", exc_info=True)
+        if len(handlers) == 1:
+            await self._run_handler(handlers[0], event)
+        elif handlers:
+            await asyncio.gather(
+                *(self._run_handler(handler, event) for handler in handlers)
+            )
+
+    async def _run_handler(self, handler: Callable, event: dict):
+        try:
+            if asyncio.iscoroutinefunction(handler):
+                await handler(event)
+            else:
+                await asyncio.get_running_loop().run_in_executor(
+                    self.executor, handler, event
+                )
+        except Exception as e:
+            logger.error(
+                f"Error in event handler for {event['topic']}: {e}", exc_info=True
+            )
 
     def get_queue_size(self) -> int:
-        return self.queue.qsize() if self.queue else 0
+        return sum(
+            lane.depth(priority)
+            for lane in self.lanes
+            for priority in (EventPriority.HIGH, EventPriority.NORMAL)
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            "queue_depth": {
+                priority.value: sum(lane.depth(priority) for lane in self.lanes)
+                for priority in EventPriority
+            },
+            "published": dict(self.published),
+            "dropped": dict(self.dropped),
+            "transport": self.transport.get_stats() if self.transport else None,
+        }
 
 
 _event_bus = EventBus()
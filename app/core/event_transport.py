@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import TYPE_CHECKING, Optional
+
+from app.config.settings import get_settings
+from app.storage.event_store import get_event_store
+
+if TYPE_CHECKING:
+    from app.core.event_bus import EventBus
+
+logger = logging.getLogger(__name__)
+
+
+class RedisEventTransport:
+    def __init__(self, bus: "EventBus"):
+        self.bus = bus
+        self.settings = get_settings()
+        self.store = get_event_store()
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self.running = False
+        self.stopping: asyncio.Event = None
+        self.broadcaster: Optional[asyncio.Task] = None
+        self.group_readers: dict[str, asyncio.Task] = {}
+        self.cursors: dict[str, str] = {}
+        self.joined: set[tuple[str, str]] = set()
+
+        self.received = 0
+        self.claimed = 0
+        self.failed_reads = 0
+
+    async def start(self):
+        self.stopping = asyncio.Event()
+        self.running = True
+        self.broadcaster = asyncio.create_task(self._broadcast_loop())
+
+        logger.info(f"Event transport started as {self.consumer}")
+
+    async def stop(self):
+        self.running = False
+        self.stopping.set()
+
+        tasks = [self.broadcaster, *self.group_readers.values()]
+        await asyncio.gather(*(task for task in tasks if task), return_exceptions=True)
+        self.broadcaster = None
+        self.group_readers.clear()
+
+        logger.info("Event transport stopped")
+
+    async def _broadcast_loop(self):
+        block_ms = self.settings.event_bus_transport_block_ms
+        count = self.settings.event_bus_transport_read_count
+
+        while self.running:
+            self._start_group_readers()
+
+            topics = self.bus.remote_topics()
+            if not topics:
+                await self._pause(block_ms / 1000)
+                continue
+
+            try:
+                new_topics = [topic for topic in topics if topic not in self.cursors]
+                if new_topics:
+                    self.cursors.update(await self.store.latest_ids(new_topics))
+
+                events = await self.store.read_topics(
+                    {topic: self.cursors[topic] for topic in topics}, count, block_ms
+                )
+                for event in events:
+                    self.cursors[event["topic"]] = event["id"]
+                    await self._deliver(event)
+            except Exception as e:
+                self.failed_reads += 1
+                logger.error(f"Event broadcast read failed: {e}")
+                await self._pause(block_ms / 1000)
+
+    def _start_group_readers(self):
+        for group in self.bus.remote_groups():
+            if group not in self.group_readers:
+                self.group_readers[group] = asyncio.create_task(self._group_loop(group))
+
+    async def _group_loop(self, group: str):
+        block_ms = self.settings.event_bus_transport_block_ms
+        count = self.settings.event_bus_transport_read_count
+        claim_interval = self.settings.event_bus_transport_claim_interval_ms / 1000
+        pending: Optional[dict[str, str]] = {}
+        next_claim = 0.0
+
+        while self.running:
+            topics = self.bus.remote_topics(group)
+            if not topics:
+                await self._pause(block_ms / 1000)
+                continue
+
+            try:
+                for topic in topics:
+                    if (topic, group) not in self.joined:
+                        await self.store.create_consumer_group(topic, group, "$")
+                        self.joined.add((topic, group))
+
+                if pending is not None:
+                    events = await self.store.read_pending_topics(
+                        {topic: pending.get(topic, "0") for topic in topics},
+                        group,
+                        self.consumer,
+                        count,
+                    )
+                    if not events:
+                        pending = None
+                    for event in events:
+                        pending[event["topic"]] = event["id"]
+                        await self._deliver(event, group)
+                    continue
+
+                if time.monotonic() >= next_claim:
+                    await self._claim_idle(topics, group, count)
+                    next_claim = time.monotonic() + claim_interval
+
+                events = await self.store.read_group_topics(
+                    topics, group, self.consumer, count, block_ms
+                )
+                for event in events:
+                    await self._deliver(event, group)
+            except Exception as e:
+                self.failed_reads += 1
+                logger.error(f"Event group {group} read failed: {e}")
+                await self._pause(block_ms / 1000)
+
+    async def _claim_idle(self, topics: list[str], group: str, count: int):
+        min_idle_ms = self.settings.event_bus_transport_claim_idle_ms
+
+        for topic in topics:
+            cursor = "0-0"
+            while self.running:
+                cursor, events = await self.store.claim_idle(
+                    topic, group, self.consumer, min_idle_ms, count, cursor
+                )
+                self.claimed += len(events)
+                for event in events:
+                    await self._deliver(event, group)
+                if cursor == "0-0":
+                    break
+
+    async def _deliver(self, event: dict, group: Optional[str] = None):
+        self.received += 1
+        await self.bus.deliver(event, group)
+
+    async def _pause(self, seconds: float):
+        try:
+            await asyncio.wait_for(self.stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def get_stats(self) -> dict:
+        return {
+            "consumer": self.consumer,
+            "broadcast_topics": len(self.cursors),
+            "groups": sorted(self.group_readers),
+            "received": self.received,
+            "claimed": self.claimed,
+            "failed_reads": self.failed_reads,
+        }
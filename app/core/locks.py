@@ -4,6 +4,26 @@ from typing import Optional
 
 from app.config.settings import get_settings
 from app.core.redis_client import get_redis_client
+from app.core.scripts import get_script_registry
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+else
+    return 0
+end
+"""
+
+EXTEND_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("expire", KEYS[1], ARGV[2])
+else
+    return 0
+end
+"""
+
+get_script_registry().register("lock_release", RELEASE_LOCK_SCRIPT)
+get_script_registry().register("lock_extend", EXTEND_LOCK_SCRIPT)
 
 
 class DistributedLock:
@@ -12,6 +32,7 @@ class DistributedLock:
         self.settings = get_settings()
         self.timeout = timeout or self.settings.lock_timeout_seconds
         self.redis = None
+        self.scripts = get_script_registry()
         self.lock_key = f"lock:{resource}"
         self.lock_value = None
 
@@ -38,15 +59,9 @@ class DistributedLock:
         if not self.lock_value:
             return False
 
-        lua_script = """
-        if redis.call("get", KEYS[1]) == ARGV[1] then
-            return redis.call("del", KEYS[1])
-        else
-            return 0
-        end
-        """
-
-        result = await self.redis.eval(lua_script, 1, self.lock_key, self.lock_value)
+        result = await self.scripts.call(
+            "lock_release", [self.lock_key], [self.lock_value]
+        )
 
         return bool(result)
 
@@ -56,16 +71,8 @@ class DistributedLock:
         if not self.lock_value:
             return False
 
-        lua_script = """
-        if redis.call("get", KEYS[1]) == ARGV[1] then
-            return redis.call("expire", KEYS[1], ARGV[2])
-        else
-            return 0
-        end
-        """
-
-        result = await self.redis.eval(
-            lua_script, 1, self.lock_key, self.lock_value, additional_time
+        result = await self.scripts.call(
+            "lock_extend", [self.lock_key], [self.lock_value, additional_time]
         )
 
         return bool(result)
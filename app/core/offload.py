@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from pydantic import ValidationError
+
+from app.config.settings import get_settings
+from app.core.payloads import PayloadValidationError, decode_batch
+from app.models.telemetry import TelemetryBatch, TelemetryPoint
+from app.storage.telemetry_store import PreparedWrites, prepare_writes
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_up() -> None:
+    return None
+
+
+def prepare_batch(
+    body: bytes, content_type: Optional[str], span_seconds: int, rollups: bool
+) -> tuple[dict, list[tuple], PreparedWrites]:
+    try:
+        batch = decode_batch(body, content_type)
+    except ValidationError as e:
+        raise PayloadValidationError(
+            e.errors(include_url=False, include_context=False)
+        ) from None
+
+    header = {
+        "device_id": batch.device_id,
+        "batch_id": batch.batch_id,
+        "sequence": batch.sequence,
+    }
+    rows = [
+        (p.device_id, p.timestamp, p.metric, p.value, p.unit, p.metadata)
+        for p in batch.points
+    ]
+    return header, rows, prepare_writes(batch.points, span_seconds, rollups)
+
+
+class BatchOffloader:
+    def __init__(self):
+        self.settings = get_settings()
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.offloaded_batches = 0
+
+    async def start(self):
+        workers = self.settings.telemetry_offload_workers
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        for _ in range(workers):
+            self.executor.submit(_warm_up)
+
+        logger.info(
+            f"Batch offload pool started with {workers} workers "
+            f"(threshold={self.settings.telemetry_offload_min_bytes} bytes)"
+        )
+
+    async def stop(self):
+        if not self.executor:
+            return
+
+        executor = self.executor
+        self.executor = None
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+        logger.info("Batch offload pool stopped")
+
+    def should_offload(self, size: int) -> bool:
+        return (
+            self.executor is not None
+            and size >= self.settings.telemetry_offload_min_bytes
+        )
+
+    async def prepare(
+        self, body: bytes, content_type: Optional[str]
+    ) -> tuple[TelemetryBatch, PreparedWrites]:
+        loop = asyncio.get_running_loop()
+        header, rows, writes = await loop.run_in_executor(
+            self.executor,
+            prepare_batch,
+            body,
+            content_type,
+            self.settings.telemetry_chunk_span_seconds,
+            self.settings.telemetry_rollups_enabled,
+        )
+        self.offloaded_batches += 1
+
+        points = [
+            TelemetryPoint.model_construct(
+                device_id=device_id,
+                timestamp=timestamp,
+                metric=metric,
+                value=value,
+                unit=unit,
+                metadata=metadata,
+            )
+            for device_id, timestamp, metric, value, unit, metadata in rows
+        ]
+        return TelemetryBatch.model_construct(points=points, **header), writes
+
+
+_offloader = BatchOffloader()
+
+
+def get_batch_offloader() -> BatchOffloader:
+    return _offloader
@@ -0,0 +1,112 @@
+from typing import Any, Callable, Optional
+
+import msgpack
+
+from app.models.telemetry import TelemetryBatch, TelemetryPoint
+
+JSON_MEDIA_TYPES = {"application/json"}
+MSGPACK_MEDIA_TYPES = {
+    "application/msgpack",
+    "application/x-msgpack",
+    "application/vnd.msgpack",
+}
+
+COMPACT_POINT_FIELDS = ("timestamp", "metric", "value", "unit", "metadata")
+
+
+class UnsupportedPayloadError(Exception):
+    pass
+
+
+class PayloadValidationError(Exception):
+    def __init__(self, errors: list):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def media_type(content_type: Optional[str]) -> str:
+    if not content_type:
+        return "application/json"
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def _unpack(body: bytes) -> Any:
+    try:
+        return msgpack.unpackb(body, raw=False, timestamp=3, strict_map_key=False)
+    except (TypeError, ValueError, msgpack.UnpackException) as e:
+        raise PayloadValidationError(
+            [
+                {
+                    "type": "msgpack_invalid",
+                    "loc": (),
+                    "msg": f"Invalid msgpack payload: {e}",
+                    "input": None,
+                }
+            ]
+        ) from e
+
+
+def _expand_point(item: Any, device_id: Optional[str] = None, loc: tuple = ()) -> Any:
+    if isinstance(item, (list, tuple)):
+        if len(item) > len(COMPACT_POINT_FIELDS):
+            raise PayloadValidationError(
+                [
+                    {
+                        "type": "too_long",
+                        "loc": loc,
+                        "msg": (
+                            "Compact point has more than "
+                            f"{len(COMPACT_POINT_FIELDS)} fields"
+                        ),
+                        "input": list(item),
+                    }
+                ]
+            )
+        item = dict(zip(COMPACT_POINT_FIELDS, item))
+    if isinstance(item, dict) and device_id is not None:
+        item.setdefault("device_id", device_id)
+    return item
+
+
+def _decode_msgpack_point(body: bytes) -> TelemetryPoint:
+    return TelemetryPoint.model_validate(_expand_point(_unpack(body)))
+
+
+def _decode_msgpack_batch(body: bytes) -> TelemetryBatch:
+    data = _unpack(body)
+    if isinstance(data, dict) and isinstance(data.get("points"), list):
+        device_id = data.get("device_id")
+        data["points"] = [
+            _expand_point(item, device_id, ("points", index))
+            for index, item in enumerate(data["points"])
+        ]
+    return TelemetryBatch.model_validate(data)
+
+
+def _decoder(
+    content_type: Optional[str],
+    json_decoder: Callable[[bytes], Any],
+    msgpack_decoder: Callable[[bytes], Any],
+) -> Callable[[bytes], Any]:
+    kind = media_type(content_type)
+    if kind in JSON_MEDIA_TYPES:
+        return json_decoder
+    if kind in MSGPACK_MEDIA_TYPES:
+        return msgpack_decoder
+    raise UnsupportedPayloadError(f"Unsupported content type: {kind}")
+
+
+def decode_point(body: bytes, content_type: Optional[str]) -> TelemetryPoint:
+    decoder = _decoder(
+        content_type,
+        TelemetryPoint.model_validate_json,
+        _decode_msgpack_point,
+    )
+    return decoder(body)
+
+
+def decode_batch(body: bytes, content_type: Optional[str]) -> TelemetryBatch:
+    decoder = _decoder(
+        content_type, TelemetryBatch.model_validate_json, _decode_msgpack_batch
+    )
+    return decoder(body)
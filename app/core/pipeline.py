@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+StageHandler = Callable[[list[Any]], Awaitable[None]]
+
+
+class PipelineStage:
+    def __init__(
+        self,
+        name: str,
+        handler: StageHandler,
+        asynchronous: bool = False,
+        concurrency: int = 1,
+        max_queue_size: int = 10000,
+        batch_size: int = 1,
+        linger_ms: int = 0,
+    ):
+        self.name = name
+        self.handler = handler
+        self.asynchronous = asynchronous
+        self.concurrency = concurrency
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.linger_ms = linger_ms
+        self.queue: asyncio.Queue = None
+        self.workers: list[asyncio.Task] = []
+        self.running = False
+
+        self.in_flight = 0
+        self.processed = 0
+        self.batches = 0
+        self.failed = 0
+        self.total_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.total_service_ms = 0.0
+
+    async def start(self):
+        if not self.asynchronous:
+            return
+
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.running = True
+        for i in range(self.concurrency):
+            self.workers.append(asyncio.create_task(self._worker(i)))
+
+    async def stop(self):
+        if not self.running:
+            return
+
+        await self.queue.join()
+        self.running = False
+
+        for worker in self.workers:
+            worker.cancel()
+
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers.clear()
+
+    async def submit(self, items: list[Any]) -> None:
+        if not self.running:
+            await self.run(items, time.monotonic())
+            return
+
+        enqueued_at = time.monotonic()
+        for item in items:
+            await self.queue.put((enqueued_at, item))
+
+    async def run(self, items: list[Any], enqueued_at: float) -> None:
+        self.in_flight += len(items)
+        started = time.monotonic()
+        try:
+            await self.handler(items)
+        except Exception:
+            self.failed += len(items)
+            raise
+        finally:
+            finished = time.monotonic()
+            self.in_flight -= len(items)
+            self.processed += len(items)
+            self.batches += 1
+            latency_ms = (finished - enqueued_at) * 1000
+            self.total_latency_ms += latency_ms * len(items)
+            self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+            self.total_service_ms += (finished - started) * 1000
+
+    async def _next_batch(self) -> list[tuple[float, Any]]:
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.linger_ms / 1000
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _worker(self, worker_id: int):
+        while self.running:
+            batch = await self._next_batch()
+            try:
+                await self.run([item for _, item in batch], min(at for at, _ in batch))
+            except Exception as e:
+                logger.error(
+                    f"Pipeline stage {self.name} worker {worker_id} error: {e}"
+                )
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def get_queue_depth(self) -> int:
+        return self.queue.qsize() if self.queue else 0
+
+    def get_stats(self) -> dict:
+        return {
+            "mode": "async" if self.running else "inline",
+            "concurrency": self.concurrency if self.running else 1,
+            "queue_depth": self.get_queue_depth(),
+            "in_flight": self.in_flight,
+            "processed": self.processed,
+            "batches": self.batches,
+            "failed": self.failed,
+            "avg_latency_ms": round(self.total_latency_ms / self.processed, 3)
+            if self.processed
+            else 0.0,
+            "max_latency_ms": round(self.max_latency_ms, 3),
+            "avg_service_ms": round(self.total_service_ms / self.batches, 3)
+            if self.batches
+            else 0.0,
+        }
+
+
+class IngestionPipeline:
+    def __init__(self, name: str):
+        self.name = name
+        self.stages: list[PipelineStage] = []
+
+    def add_stage(self, stage: PipelineStage) -> PipelineStage:
+        self.stages.append(stage)
+        return stage
+
+    def get_stage(self, name: str) -> Optional[PipelineStage]:
+        return next((stage for stage in self.stages if stage.name == name), None)
+
+    async def start(self):
+        for stage in self.stages:
+            await stage.start()
+
+        async_stages = [stage.name for stage in self.stages if stage.running]
+        logger.info(
+            f"Pipeline {self.name} started "
+            f"(async stages: {', '.join(async_stages) or 'none'})"
+        )
+
+    async def stop(self):
+        for stage in self.stages:
+            await stage.stop()
+
+        logger.info(f"Pipeline {self.name} stopped")
+
+    async def process(self, items: list[Any]) -> None:
+        for stage in self.stages:
+            await stage.submit(items)
+
+    def get_queue_depth(self) -> int:
+        return sum(stage.get_queue_depth() for stage in self.stages)
+
+    def get_stats(self) -> dict:
+        return {stage.name: stage.get_stats() for stage in self.stages}
@@ -1,79 +1,318 @@
+import asyncio
+import logging
 import time
+from typing import Optional
 
 from app.config.settings import get_settings
-from app.core.redis_client import get_redis_client
+from app.core.scripts import get_script_registry
+
+logger = logging.getLogger(__name__)
+
+GCRA_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local partial = ARGV[5] == '1'
+
+local tat = tonumber(redis.call('GET', key)) or now
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + cost * interval
+local allow_at = new_tat - burst
+if allow_at > now + 0.001 then
+    local available = math.floor((burst - (tat - now)) / interval + 0.001)
+    if not partial or available < 1 then
+        return {0, available}
+    end
+    cost = available
+    new_tat = tat + cost * interval
+end
+
+redis.call(
+    'SET', key, string.format('%.3f', new_tat),
+    'PX', math.ceil(new_tat - now)
+)
+local remaining = math.floor((burst - (new_tat - now)) / interval + 0.001)
+if partial then
+    return {cost, remaining}
+end
+return {1, remaining}
+"""
+
+ADMIT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local tats = {}
+local remaining
+
+for i = 1, #KEYS do
+    local base = (i - 1) * 3 + 1
+    local interval = tonumber(ARGV[base + 1])
+    local burst = tonumber(ARGV[base + 2])
+    local cost = tonumber(ARGV[base + 3])
+
+    local tat = tonumber(redis.call('GET', KEYS[i])) or now
+    if tat < now then
+        tat = now
+    end
+
+    local new_tat = tat + cost * interval
+    if new_tat - burst > now + 0.001 then
+        return {0, 0, i}
+    end
+
+    tats[i] = new_tat
+    local left = math.floor((burst - (new_tat - now)) / interval + 0.001)
+    if not remaining or left < remaining then
+        remaining = left
+    end
+end
+
+for i = 1, #KEYS do
+    redis.call(
+        'SET', KEYS[i], string.format('%.3f', tats[i]),
+        'PX', math.ceil(tats[i] - now)
+    )
+end
+return {1, remaining or 0, 0}
+"""
+
+get_script_registry().register("rate_limit_gcra", GCRA_SCRIPT)
+get_script_registry().register("rate_limit_admit", ADMIT_SCRIPT)
+
+
+class TokenLease:
+    def __init__(
+        self,
+        limiter: "RateLimiter",
+        identifier: str,
+        max_requests: int,
+        window_seconds: int,
+        size: int,
+        refill_ratio: float,
+    ):
+        self.limiter = limiter
+        self.identifier = identifier
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.size = size
+        self.low_water = int(size * refill_ratio)
+        self.tokens = 0
+        self.expires_at = 0.0
+        self.denied_until = 0.0
+        self.refill: Optional[asyncio.Task] = None
+
+        self.leases = 0
+        self.leased_tokens = 0
+        self.local_grants = 0
+        self.denials = 0
+
+    async def acquire(self, cost: int = 1) -> tuple[bool, int]:
+        now = time.monotonic()
+        if now >= self.expires_at:
+            self.tokens = 0
+
+        if self.tokens < cost and now >= self.denied_until:
+            await self._start_refill()
+
+        if self.tokens < cost:
+            self.denials += 1
+            return False, 0
+
+        self.tokens -= cost
+        self.local_grants += 1
+        if self.tokens <= self.low_water:
+            self._start_refill()
+        return True, self.tokens
+
+    def _start_refill(self) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        if self.refill is None or self.refill.done() or self.refill.get_loop() != loop:
+            self.refill = loop.create_task(self._lease())
+        return self.refill
+
+    async def _lease(self) -> None:
+        try:
+            granted = await self.limiter.lease(
+                self.identifier, self.max_requests, self.window_seconds, self.size
+            )
+        except Exception as e:
+            logger.error(f"Leasing rate limit tokens for {self.identifier} failed: {e}")
+            return
+
+        now = time.monotonic()
+        if not granted:
+            self.denied_until = (
+                now + self.size * self.window_seconds / self.max_requests
+            )
+            return
+
+        if now >= self.expires_at:
+            self.tokens = 0
+        self.tokens += granted
+        self.expires_at = now + self.window_seconds
+        self.leases += 1
+        self.leased_tokens += granted
+
+    def get_stats(self) -> dict:
+        return {
+            "lease_size": self.size,
+            "local_tokens": self.tokens,
+            "leases": self.leases,
+            "leased_tokens": self.leased_tokens,
+            "local_grants": self.local_grants,
+            "denials": self.denials,
+        }
 
 
 class RateLimiter:
     def __init__(self):
-        self.redis = None
         self.settings = get_settings()
-
-    async def initialize(self):
-        if not self.redis:
-            self.redis = await get_redis_client()
+        self.scripts = get_script_registry()
+        self.global_lease: Optional[TokenLease] = None
 
     async def check_rate_limit(
         self,
         identifier: str,
         max_requests: int,
         window_seconds: int,
+        cost: int = 1,
     ) -> tuple[bool, int]:
-        await self.initialize()
-
-        now = int(time.time() * 1000)
-        window_start = now - (window_seconds * 1000)
-        key = f"ratelimit:{identifier}"
-
-        lua_script = """
-        local key = KEYS[1]
-        local now = tonumber(ARGV[1])
-        local window_start = tonumber(ARGV[2])
-        local max_requests = tonumber(ARGV[3])
-        local window_seconds = tonumber(ARGV[4])
-
-        redis.call('ZREMRANGEBYSCORE', key, 0, window_start)
-
-        local current_count = redis.call('ZCARD', key)
-
-        if current_count < max_requests then
-            redis.call('ZADD', key, now, now)
-            redis.call('EXPIRE', key, window_seconds * 2)
-            return {1, max_requests - current_count - 1}
-        else
-            return {0, 0}
-        end
-        """
-
-        result = await self.redis.eval(
-            lua_script,
-            1,
-            key,
-            now,
-            window_start,
-            max_requests,
-            window_seconds,
+        result = await self._eval_gcra(
+            identifier, max_requests, window_seconds, cost, partial=False
         )
 
         allowed = bool(result[0])
-        remaining = int(result[1])
+        remaining = max(int(result[1]), 0)
 
         return allowed, remaining
 
-    async def check_device_rate_limit(self, device_id: str) -> tuple[bool, int]:
-        return await self.check_rate_limit(
-            f"device:{device_id}",
-            self.settings.rate_limit_telemetry_per_device,
-            self.settings.rate_limit_window_seconds,
+    async def lease(
+        self, identifier: str, max_requests: int, window_seconds: int, size: int
+    ) -> int:
+        result = await self._eval_gcra(
+            identifier, max_requests, window_seconds, size, partial=True
         )
+        return max(int(result[0]), 0)
+
+    async def _eval_gcra(
+        self,
+        identifier: str,
+        max_requests: int,
+        window_seconds: int,
+        cost: int,
+        partial: bool,
+    ) -> list:
+        burst = window_seconds * 1000
+        return await self.scripts.call(
+            "rate_limit_gcra",
+            [f"ratelimit:gcra:{identifier}"],
+            [
+                repr(time.time() * 1000),
+                repr(burst / max_requests),
+                burst,
+                cost,
+                int(partial),
+            ],
+        )
+
+    async def check_admission(
+        self,
+        device_id: str,
+        cost: int = 1,
+        group_id: Optional[str] = None,
+        include_global: bool = False,
+    ) -> tuple[bool, int]:
+        limits = [
+            (
+                f"device:{device_id}",
+                self.settings.rate_limit_telemetry_per_device,
+                self.settings.rate_limit_window_seconds,
+                1,
+            ),
+            (
+                f"device_points:{device_id}",
+                self.settings.rate_limit_telemetry_points_per_device,
+                self.settings.rate_limit_window_seconds,
+                cost,
+            ),
+        ]
+        if group_id and self.settings.rate_limit_telemetry_per_group > 0:
+            limits.append(
+                (
+                    f"group:{group_id}",
+                    self.settings.rate_limit_telemetry_per_group,
+                    self.settings.rate_limit_window_seconds,
+                    cost,
+                )
+            )
+        if include_global:
+            limits.append(("global", self.settings.rate_limit_global_per_second, 1, 1))
+
+        keys = []
+        args = [repr(time.time() * 1000)]
+        for identifier, max_requests, window_seconds, charge in limits:
+            burst = window_seconds * 1000
+            keys.append(f"ratelimit:gcra:{identifier}")
+            args.extend([repr(burst / max_requests), burst, charge])
+
+        result = await self.scripts.call("rate_limit_admit", keys, args)
+        return bool(result[0]), max(int(result[1]), 0)
+
+    def admission_capacity(self, group_id: Optional[str] = None) -> int:
+        capacity = self.settings.rate_limit_telemetry_points_per_device
+        if group_id and self.settings.rate_limit_telemetry_per_group > 0:
+            capacity = min(capacity, self.settings.rate_limit_telemetry_per_group)
+        return capacity
+
+    async def check_device_rate_limit(
+        self, device_id: str, cost: int = 1
+    ) -> tuple[bool, int]:
+        return await self.check_admission(device_id, cost)
+
+    async def check_global_rate_limit(self, cost: int = 1) -> tuple[bool, int]:
+        if self.leases_global():
+            return await self._get_global_lease().acquire(cost)
 
-    async def check_global_rate_limit(self) -> tuple[bool, int]:
         return await self.check_rate_limit(
             "global",
             self.settings.rate_limit_global_per_second,
             1,
+            cost,
         )
 
+    def leases_global(self) -> bool:
+        return self.settings.rate_limit_global_lease_size > 0
+
+    def admits_in_service(self, method: str, path: str) -> bool:
+        return (
+            not self.leases_global()
+            and method == "POST"
+            and path in ("/telemetry/point", "/telemetry/batch")
+        )
+
+    def _get_global_lease(self) -> TokenLease:
+        if self.global_lease is None:
+            self.global_lease = TokenLease(
+                self,
+                "global",
+                self.settings.rate_limit_global_per_second,
+                1,
+                self.settings.rate_limit_global_lease_size,
+                self.settings.rate_limit_global_lease_refill_ratio,
+            )
+        return self.global_lease
+
+    def get_stats(self) -> dict:
+        return self.global_lease.get_stats() if self.global_lease else {}
+
+
+class BatchTooLargeError(Exception):
+    pass
+
 
 _rate_limiter = RateLimiter()
 
@@ -0,0 +1,93 @@
+import hashlib
+import logging
+
+from redis.exceptions import NoScriptError
+
+from app.core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class ScriptRegistry:
+    def __init__(self):
+        self.redis = None
+        self.sources: dict[str, str] = {}
+        self.shas: dict[str, str] = {}
+        self.loaded = False
+        self.reloads = 0
+
+    async def initialize(self):
+        if not self.redis:
+            self.redis = await get_redis_client()
+
+    def register(self, name: str, source: str) -> str:
+        sha = hashlib.sha1(source.encode()).hexdigest()
+        if self.shas.get(name, sha) != sha:
+            raise ValueError(f"Script {name} is already registered")
+
+        self.sources[name] = source
+        self.shas[name] = sha
+        return name
+
+    async def load(self) -> None:
+        await self.initialize()
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for source in self.sources.values():
+                pipe.script_load(source)
+            await pipe.execute()
+
+        self.loaded = True
+        logger.info(f"Loaded {len(self.sources)} Redis scripts")
+
+    async def _reload(self) -> None:
+        self.reloads += 1
+        logger.warning("Redis script cache was flushed, reloading scripts")
+        await self.load()
+
+    async def call(self, name: str, keys: list, args: list):
+        await self.initialize()
+        sha = self.shas[name]
+
+        try:
+            return await self.redis.evalsha(sha, len(keys), *keys, *args)
+        except NoScriptError:
+            await self._reload()
+            return await self.redis.evalsha(sha, len(keys), *keys, *args)
+
+    def queue(self, pipe, name: str, keys: list, args: list) -> None:
+        pipe.evalsha(self.shas[name], len(keys), *keys, *args)
+
+    async def execute(self, pipe) -> list:
+        commands = [args for args, _ in pipe.command_stack]
+        results = await pipe.execute(raise_on_error=False)
+
+        missing = [
+            position
+            for position, result in enumerate(results)
+            if isinstance(result, NoScriptError)
+        ]
+        if missing:
+            await self._reload()
+            for position in missing:
+                results[position] = await self.redis.evalsha(*commands[position][1:])
+
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+        return results
+
+    def get_stats(self) -> dict:
+        return {
+            "scripts": len(self.sources),
+            "loaded": self.loaded,
+            "reloads": self.reloads,
+        }
+
+
+_registry = ScriptRegistry()
+
+
+def get_script_registry() -> ScriptRegistry:
+    return _registry
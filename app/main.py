@@ -5,10 +5,22 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
 from app.api import alerts, analytics, devices, firmware, telemetry
+from app.config.settings import get_settings
+from app.core.counters import get_throughput_counters
 from app.core.event_bus import get_event_bus
+from app.core.offload import get_batch_offloader
+from app.core.rate_limiter import get_rate_limiter
 from app.core.redis_client import get_redis_client
+from app.core.scripts import get_script_registry
 from app.middleware.backpressure import BackpressureMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
+from app.services.alert_rule_index import get_alert_rule_index
+from app.services.stream_persister import get_stream_persister
+from app.services.telemetry_service import get_telemetry_service
+from app.storage.event_buffer import get_event_buffer
+from app.storage.ingest_stream import StreamBacklogFullError
+from app.storage.telemetry_buffer import get_telemetry_buffer
+from app.storage.telemetry_tiering import get_tier_compactor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,12 +28,48 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    settings = get_settings()
     redis_client = await get_redis_client()
+    await get_script_registry().load()
+    event_buffer = get_event_buffer()
+    if settings.event_store_write_behind_enabled:
+        await event_buffer.start()
     event_bus = get_event_bus()
     await event_bus.start()
+    await get_alert_rule_index().load()
+    counters = get_throughput_counters()
+    await counters.start()
+    telemetry_buffer = get_telemetry_buffer()
+    if settings.telemetry_write_behind_enabled:
+        await telemetry_buffer.start()
+    telemetry_service = get_telemetry_service()
+    await telemetry_service.start()
+    persister = get_stream_persister()
+    if (
+        settings.telemetry_stream_ingest_enabled
+        and settings.telemetry_stream_in_process_consumer
+    ):
+        await persister.start()
+    offloader = get_batch_offloader()
+    if settings.telemetry_offload_enabled:
+        await offloader.start()
+    tier_compactor = get_tier_compactor()
+    if settings.telemetry_cold_tier_enabled:
+        await tier_compactor.start()
     logger.info("SensorHub started")
     yield
+    if tier_compactor.running:
+        await tier_compactor.stop()
+    await offloader.stop()
+    if persister.running:
+        await persister.stop()
+    await telemetry_service.stop()
+    if telemetry_buffer.running:
+        await telemetry_buffer.stop()
+    await counters.stop()
     await event_bus.stop()
+    if event_buffer.running:
+        await event_buffer.stop()
     await redis_client.close()
     logger.info("SensorHub stopped")
 
@@ -40,7 +88,29 @@ app.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "sensorhub"}
+    health = {"status": "healthy", "service": "sensorhub"}
+    health["pipeline"] = get_telemetry_service().pipeline.get_stats()
+    health["scripts"] = get_script_registry().get_stats()
+    health["event_bus"] = get_event_bus().get_stats()
+    telemetry_buffer = get_telemetry_buffer()
+    if telemetry_buffer.running:
+        health["write_behind"] = telemetry_buffer.get_stats()
+    event_buffer = get_event_buffer()
+    if event_buffer.running:
+        health["event_writes"] = event_buffer.get_stats()
+    persister = get_stream_persister()
+    if persister.running:
+        health["ingest_stream"] = {
+            **await persister.stream.get_stats(),
+            **persister.get_stats(),
+        }
+    rate_limiter = get_rate_limiter()
+    if rate_limiter.global_lease:
+        health["global_rate_limit"] = rate_limiter.get_stats()
+    tier_compactor = get_tier_compactor()
+    if tier_compactor.running:
+        health["cold_tier"] = tier_compactor.get_stats()
+    return health
 
 
 @app.exception_handler(ValueError)
@@ -48,6 +118,15 @@ async def value_error_handler(request: Request, exc: ValueError):
     return JSONResponse(status_code=400, content={"error": str(exc)})
 
 
+@app.exception_handler(StreamBacklogFullError)
+async def stream_backlog_handler(request: Request, exc: StreamBacklogFullError):
+    return JSONResponse(
+        status_code=503,
+        content={"error": str(exc), "retry_after": 5},
+        headers={"Retry-After": "5"},
+    )
+
+
 @app.exception_handler(KeyError)
 async def key_error_handler(request: Request, exc: KeyError):
     return JSONResponse(status_code=404, content={"error": str(exc)})
@@ -7,8 +7,11 @@ from app.core.rate_limiter import get_rate_limiter
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
-        if request.url.path.startswith("/telemetry"):
-            rate_limiter = get_rate_limiter()
+        path = request.url.path
+        rate_limiter = get_rate_limiter()
+        if path.startswith("/telemetry") and not rate_limiter.admits_in_service(
+            request.method, path
+        ):
             allowed, remaining = await rate_limiter.check_global_rate_limit()
 
             if not allowed:
@@ -2,7 +2,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class AlertSeverity(str, Enum):
@@ -24,6 +24,14 @@ class RuleOperator(str, Enum):
     NE = "ne"
 
 
+class WindowAggregate(str, Enum):
+    AVG = "avg"
+    MIN = "min"
+    MAX = "max"
+    RATE = "rate"
+    COUNT = "count"
+
+
 class AlertRule(BaseModel):
     id: str
     device_id: Optional[str] = None
@@ -32,6 +40,9 @@ class AlertRule(BaseModel):
     operator: RuleOperator
     threshold: float
     severity: AlertSeverity
+    aggregate: Optional[WindowAggregate] = None
+    window_seconds: Optional[int] = None
+    min_count: int = 1
     enabled: bool = True
     created_at: datetime
 
@@ -57,3 +68,6 @@ class AlertRuleCreate(BaseModel):
     operator: RuleOperator
     threshold: float
     severity: AlertSeverity
+    aggregate: Optional[WindowAggregate] = None
+    window_seconds: Optional[int] = Field(default=None, gt=0)
+    min_count: int = Field(default=1, ge=1)
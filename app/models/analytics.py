@@ -8,6 +8,7 @@ class DeviceMetrics(BaseModel):
     device_id: str
     uptime_seconds: int
     message_count: int
+    messages_per_second: float = 0.0
     last_seen: Optional[datetime]
     error_count: int
     average_latency_ms: float
@@ -29,5 +30,6 @@ class GroupAnalytics(BaseModel):
     device_count: int
     active_count: int
     total_messages: int
+    messages_per_second: float = 0.0
     alert_count: int
     average_uptime_seconds: float
@@ -1,9 +1,16 @@
 from datetime import datetime
+from enum import Enum
 from typing import Any, Optional
 
 from pydantic import BaseModel, Field
 
 
+class RollupResolution(str, Enum):
+    MINUTE = "1m"
+    HOUR = "1h"
+    DAY = "1d"
+
+
 class TelemetryPoint(BaseModel):
     device_id: str
     timestamp: datetime
@@ -16,6 +23,8 @@ class TelemetryPoint(BaseModel):
 class TelemetryBatch(BaseModel):
     device_id: str
     points: list[TelemetryPoint]
+    batch_id: Optional[str] = None
+    sequence: Optional[int] = None
 
 
 class TelemetryQuery(BaseModel):
@@ -24,3 +33,31 @@ class TelemetryQuery(BaseModel):
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     limit: int = 100
+    cursor: Optional[str] = None
+    resolution: Optional[RollupResolution] = None
+
+
+class LatestValuesQuery(BaseModel):
+    device_ids: list[str] = Field(default_factory=list)
+    group_id: Optional[str] = None
+    metrics: Optional[list[str]] = None
+
+
+class LatestValue(BaseModel):
+    timestamp: datetime
+    value: Any
+    unit: str = ""
+    metadata: dict = Field(default_factory=dict)
+
+
+class TelemetryRollup(BaseModel):
+    device_id: str
+    metric: str
+    resolution: RollupResolution
+    bucket_start: datetime
+    count: int
+    sum: float
+    min: float
+    max: float
+    avg: float
+    last: float
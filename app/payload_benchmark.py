@@ -0,0 +1,88 @@
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+import msgpack
+
+from app.config.settings import get_settings
+from app.core.payloads import decode_batch
+
+
+def build_bodies(size: int) -> dict[str, tuple[str, bytes]]:
+    device_id = "bench-device"
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    points = [
+        {
+            "device_id": device_id,
+            "timestamp": start + timedelta(seconds=i),
+            "metric": "temperature",
+            "value": 20.0 + i % 100 / 10,
+            "unit": "celsius",
+        }
+        for i in range(size)
+    ]
+
+    as_json = {
+        "device_id": device_id,
+        "points": [{**p, "timestamp": p["timestamp"].isoformat()} for p in points],
+    }
+    compact = {
+        "device_id": device_id,
+        "points": [
+            [p["timestamp"], p["metric"], p["value"], p["unit"]] for p in points
+        ],
+    }
+
+    return {
+        "json": ("application/json", json.dumps(as_json).encode()),
+        "msgpack": (
+            "application/msgpack",
+            msgpack.packb({"device_id": device_id, "points": points}, datetime=True),
+        ),
+        "msgpack-compact": (
+            "application/msgpack",
+            msgpack.packb(compact, datetime=True),
+        ),
+    }
+
+
+def measure(body: bytes, content_type: str, rounds: int) -> list[float]:
+    decode_batch(body, content_type)
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        decode_batch(body, content_type)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure telemetry batch decoding per payload format"
+    )
+    parser.add_argument(
+        "--points",
+        type=int,
+        default=get_settings().telemetry_batch_max_size,
+        help="Points per batch",
+    )
+    parser.add_argument("--rounds", type=int, default=200, help="Timed decodes")
+    args = parser.parse_args()
+
+    print(f"{args.points} points per batch, {args.rounds} rounds")
+    print(f"{'format':<16}{'bytes':>10}{'median ms':>12}{'p95 ms':>10}{'points/s':>12}")
+    for name, (content_type, body) in build_bodies(args.points).items():
+        timings = sorted(measure(body, content_type, args.rounds))
+        median = statistics.median(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(
+            f"{name:<16}{len(body):>10}{median:>12.3f}{p95:>10.3f}"
+            f"{args.points / median * 1000:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import logging
+import signal
+from typing import Optional
+
+from app.config.settings import get_settings
+from app.core.counters import get_throughput_counters
+from app.core.event_bus import get_event_bus
+from app.core.redis_client import get_redis_client
+from app.services.alert_rule_index import get_alert_rule_index
+from app.services.stream_persister import get_stream_persister
+from app.services.telemetry_service import get_telemetry_service
+from app.storage.telemetry_buffer import get_telemetry_buffer
+
+logger = logging.getLogger(__name__)
+
+
+async def run(consumer: Optional[str] = None):
+    settings = get_settings()
+    redis_client = await get_redis_client()
+    event_bus = get_event_bus()
+    await event_bus.start()
+    await get_alert_rule_index().load()
+    counters = get_throughput_counters()
+    await counters.start()
+    telemetry_buffer = get_telemetry_buffer()
+    if settings.telemetry_write_behind_enabled:
+        await telemetry_buffer.start()
+    telemetry_service = get_telemetry_service()
+    await telemetry_service.start()
+    persister = get_stream_persister()
+    await persister.start(consumer)
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    logger.info("SensorHub persister started")
+    await stopping.wait()
+
+    await persister.stop()
+    await telemetry_service.stop()
+    if telemetry_buffer.running:
+        await telemetry_buffer.stop()
+    await counters.stop()
+    await event_bus.stop()
+    await redis_client.close()
+    logger.info("SensorHub persister stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Drain the telemetry ingest stream into storage"
+    )
+    parser.add_argument("--consumer", help="Consumer name within the group")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.consumer))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import logging
+import operator
+from collections import defaultdict
+from typing import Callable
+
+from app.core.event_bus import get_event_bus
+from app.models.alert import AlertRule, RuleOperator
+from app.services.device_service import get_device_service
+from app.storage.alert_store import get_alert_store
+
+logger = logging.getLogger(__name__)
+
+_COMPARATORS: dict[RuleOperator, Callable] = {
+    RuleOperator.GT: operator.gt,
+    RuleOperator.LT: operator.lt,
+    RuleOperator.EQ: operator.eq,
+    RuleOperator.NE: operator.ne,
+}
+
+
+class CompiledRule:
+    __slots__ = ("rule", "compare", "threshold")
+
+    def __init__(self, rule: AlertRule):
+        self.rule = rule
+        self.compare = _COMPARATORS[rule.operator]
+        self.threshold = rule.threshold
+
+    def matches(self, value) -> bool:
+        try:
+            return bool(self.compare(value, self.threshold))
+        except TypeError:
+            return False
+
+
+class AlertRuleIndex:
+    def __init__(self):
+        self.store = get_alert_store()
+        self.device_service = get_device_service()
+        self.event_bus = get_event_bus()
+        self.rules: dict[str, CompiledRule] = {}
+        self.by_device: dict[tuple[str, str], list[CompiledRule]] = defaultdict(list)
+        self.by_group: dict[tuple[str, str], list[CompiledRule]] = defaultdict(list)
+        self.loaded = False
+        self.subscribed = False
+
+    async def load(self):
+        self.rules.clear()
+        self.by_device.clear()
+        self.by_group.clear()
+
+        for rule in await self.store.list_rules(enabled_only=True):
+            self.add_rule(rule)
+
+        self.loaded = True
+
+        if not self.subscribed:
+            self.event_bus.subscribe("alert.rules", self._on_rule_event)
+            self.event_bus.subscribe("device.lifecycle", self._on_device_event)
+            self.subscribed = True
+
+        logger.info(f"Alert rule index loaded with {len(self.rules)} rules")
+
+    def _bucket(self, rule: AlertRule) -> list[CompiledRule]:
+        if rule.device_id:
+            return self.by_device[(rule.device_id, rule.metric)]
+        return self.by_group[(rule.group_id, rule.metric)]
+
+    def add_rule(self, rule: AlertRule) -> None:
+        self.remove_rule(rule.id)
+        if not rule.enabled or not (rule.device_id or rule.group_id):
+            return
+
+        compiled = CompiledRule(rule)
+        self.rules[rule.id] = compiled
+        self._bucket(rule).append(compiled)
+
+    def remove_rule(self, rule_id: str) -> None:
+        compiled = self.rules.pop(rule_id, None)
+        if compiled:
+            self._bucket(compiled.rule).remove(compiled)
+
+    async def match(self, device_id: str, metric: str) -> list[CompiledRule]:
+        if not self.loaded:
+            await self.load()
+
+        matched = self.by_device.get((device_id, metric), [])
+
+        if self.by_group:
+            group_id = await self.device_service.resolve_group(device_id)
+            if group_id:
+                matched = matched + self.by_group.get((group_id, metric), [])
+
+        return matched
+
+    async def _on_rule_event(self, event: dict):
+        rule_id = event["payload"].get("rule_id")
+        if not rule_id:
+            return
+
+        rule = await self.store.get_rule(rule_id)
+        if rule:
+            self.add_rule(rule)
+        else:
+            self.remove_rule(rule_id)
+
+    async def _on_device_event(self, event: dict):
+        payload = event["payload"]
+        if event["type"] == "device.registered":
+            self.device_service.cache_group(
+                payload["device_id"], payload.get("group_id")
+            )
+        elif "group_id" in payload.get("updates", {}):
+            self.device_service.cache_group(
+                payload["device_id"], payload["updates"]["group_id"]
+            )
+
+
+_index = AlertRuleIndex()
+
+
+def get_alert_rule_index() -> AlertRuleIndex:
+    return _index
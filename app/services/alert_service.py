@@ -9,16 +9,20 @@ from app.models.alert import (
     AlertRule,
     AlertRuleCreate,
     AlertStatus,
-    RuleOperator,
+    WindowAggregate,
 )
 from app.models.telemetry import TelemetryPoint
+from app.services.alert_rule_index import get_alert_rule_index
 from app.storage.alert_store import get_alert_store
+from app.storage.telemetry_codec import to_micros
+from app.storage.telemetry_rollups import rollup_value
 
 
 class AlertService:
     def __init__(self):
         self.store = get_alert_store()
         self.event_bus = get_event_bus()
+        self.rule_index = get_alert_rule_index()
         self.notification_cb = get_circuit_breaker("notification_service")
         self.notification_call_count = 0
 
@@ -31,10 +35,14 @@ class AlertService:
             operator=rule_create.operator,
             threshold=rule_create.threshold,
             severity=rule_create.severity,
+            aggregate=rule_create.aggregate,
+            window_seconds=rule_create.window_seconds,
+            min_count=rule_create.min_count,
             created_at=datetime.utcnow(),
         )
 
         await self.store.save_rule(rule)
+        self.rule_index.add_rule(rule)
 
         await self.event_bus.publish(
             "alert.rules",
@@ -54,37 +62,44 @@ class AlertService:
         return await self.store.list_rules(device_id)
 
     async def check_alerts(self, point: TelemetryPoint) -> None:
-        rules = await self.store.list_rules(point.device_id, enabled_only=True)
-
-        for rule in rules:
-            if rule.metric != point.metric:
-                continue
-
-            if self._evaluate_rule(rule, point.value):
-                await self._trigger_alert(rule, point)
-
-    def _evaluate_rule(self, rule: AlertRule, value: float) -> bool:
-        threshold = rule.threshold
-
-        if rule.operator == RuleOperator.GT:
-            return value > threshold
-        elif rule.operator == RuleOperator.LT:
-            return value < threshold
-        elif rule.operator == RuleOperator.EQ:
-            return value == threshold
-        elif rule.operator == RuleOperator.NE:
-            return value != threshold
-
-        return False
-
-    async def _trigger_alert(self, rule: AlertRule, point: TelemetryPoint) -> None:
+        for compiled in await self.rule_index.match(point.device_id, point.metric):
+            if compiled.rule.aggregate:
+                await self._check_window(compiled.rule, point)
+            elif compiled.matches(point.value):
+                await self._trigger_alert(compiled.rule, point)
+
+    async def _check_window(self, rule: AlertRule, point: TelemetryPoint) -> None:
+        value = rollup_value(point.value)
+        if value is None:
+            return
+
+        result = await self.store.update_window(
+            rule, point.device_id, to_micros(point.timestamp) / 1_000_000, value
+        )
+        if result is not None:
+            await self._trigger_alert(rule, point, result)
+
+    def _describe(self, rule: AlertRule, metric: str) -> str:
+        condition = f"{rule.operator.value} {rule.threshold}"
+        if not rule.aggregate:
+            return f"{metric} {condition}"
+        if rule.aggregate == WindowAggregate.COUNT:
+            return (
+                f"count({metric} {condition}, {rule.window_seconds}s) "
+                f">= {rule.min_count}"
+            )
+        return f"{rule.aggregate.value}({metric}, {rule.window_seconds}s) {condition}"
+
+    async def _trigger_alert(
+        self, rule: AlertRule, point: TelemetryPoint, value: Optional[float] = None
+    ) -> None:
         alert = Alert(
             id=str(uuid.uuid4()),
             rule_id=rule.id,
             device_id=point.device_id,
             severity=rule.severity,
-            message=f"{point.metric} {rule.operator.value} {rule.threshold}",
-            value=point.value,
+            message=self._describe(rule, point.metric),
+            value=point.value if value is None else value,
             threshold=rule.threshold,
             triggered_at=datetime.utcnow(),
         )
@@ -1,4 +1,9 @@
-from app.core.redis_client import get_redis_client
+from app.core.counters import (
+    GLOBAL_SCOPE,
+    device_scope,
+    get_throughput_counters,
+    group_scope,
+)
 from app.models.analytics import DeviceMetrics, FleetAnalytics, GroupAnalytics
 from app.models.device import DeviceStatus
 from app.storage.alert_store import get_alert_store
@@ -13,6 +18,7 @@ class AnalyticsService:
         self.telemetry_store = get_telemetry_store()
         self.alert_store = get_alert_store()
         self.firmware_store = get_firmware_store()
+        self.counters = get_throughput_counters()
 
     async def get_device_metrics(self, device_id: str) -> DeviceMetrics:
         device = await self.device_store.get_device(device_id)
@@ -31,6 +37,7 @@ class AnalyticsService:
             device_id=device_id,
             uptime_seconds=uptime_seconds,
             message_count=message_count,
+            messages_per_second=await self.counters.get_rate(device_scope(device_id)),
             last_seen=device.last_seen,
             error_count=0,
             average_latency_ms=10.5,
@@ -43,9 +50,9 @@ class AnalyticsService:
         active_devices = sum(1 for d in devices if d.status == DeviceStatus.ACTIVE)
         inactive_devices = total_devices - active_devices
 
-        redis = await get_redis_client()
-        total_messages_bytes = await redis.get("analytics:global:message_count")
-        total_messages = int(total_messages_bytes) if total_messages_bytes else 0
+        total_messages = await self.telemetry_store.get_total_message_count(
+            [device.id for device in devices]
+        )
 
         total_uptime = 0
         for device in devices:
@@ -64,7 +71,7 @@ class AnalyticsService:
             active_devices=active_devices,
             inactive_devices=inactive_devices,
             total_messages=total_messages,
-            messages_per_second=0.0,
+            messages_per_second=await self.counters.get_rate(GLOBAL_SCOPE),
             active_alerts=active_alerts,
             pending_updates=pending_updates,
             average_uptime_seconds=avg_uptime,
@@ -76,10 +83,8 @@ class AnalyticsService:
         device_count = len(devices)
         active_count = sum(1 for d in devices if d.status == DeviceStatus.ACTIVE)
 
-        total_messages = 0
         total_uptime = 0
         for device in devices:
-            total_messages += await self.telemetry_store.get_message_count(device.id)
             if device.last_seen and device.registered_at:
                 total_uptime += int(
                     (device.last_seen - device.registered_at).total_seconds()
@@ -91,7 +96,10 @@ class AnalyticsService:
             group_id=group_id,
             device_count=device_count,
             active_count=active_count,
-            total_messages=total_messages,
+            total_messages=await self.telemetry_store.get_total_message_count(
+                [device.id for device in devices]
+            ),
+            messages_per_second=await self.counters.get_rate(group_scope(group_id)),
             alert_count=0,
             average_uptime_seconds=avg_uptime,
         )
@@ -1,8 +1,10 @@
 import asyncio
+import time
 import uuid
 from datetime import datetime
 from typing import Optional
 
+from app.config.settings import get_settings
 from app.core.event_bus import get_event_bus
 from app.core.redis_client import get_redis_client
 from app.models.device import Device, DeviceRegistration, DeviceUpdate
@@ -13,6 +15,9 @@ class DeviceService:
     def __init__(self):
         self.store = get_device_store()
         self.event_bus = get_event_bus()
+        self.settings = get_settings()
+        self.device_groups: dict[str, Optional[str]] = {}
+        self.last_marked: dict[str, float] = {}
 
     async def register_device(
         self, registration: DeviceRegistration, idempotency_key: str
@@ -43,11 +48,16 @@ class DeviceService:
 
             if success:
                 await self.store.save_device(device)
+                self.cache_group(device.id, device.group_id)
 
                 await self.event_bus.publish(
                     "device.lifecycle",
                     "device.registered",
-                    {"device_id": device.id, "serial_number": device.serial_number},
+                    {
+                        "device_id": device.id,
+                        "serial_number": device.serial_number,
+                        "group_id": device.group_id,
+                    },
                 )
 
                 return device
@@ -71,6 +81,8 @@ class DeviceService:
     async def update_device(self, device_id: str, updates: DeviceUpdate) -> Device:
         update_dict = updates.model_dump(exclude_unset=True)
         device = await self.store.update_device(device_id, update_dict)
+        self.cache_group(device_id, device.group_id)
+        self.last_marked.pop(device_id, None)
 
         await self.event_bus.publish(
             "device.lifecycle",
@@ -85,7 +97,28 @@ class DeviceService:
     ) -> list[Device]:
         return await self.store.list_devices(group_id, limit)
 
+    async def list_group_device_ids(self, group_id: str) -> list[str]:
+        return await self.store.list_group_device_ids(group_id)
+
+    def cache_group(self, device_id: str, group_id: Optional[str]) -> None:
+        if group_id is None:
+            self.device_groups.pop(device_id, None)
+        else:
+            self.device_groups[device_id] = group_id
+
+    async def resolve_group(self, device_id: str) -> Optional[str]:
+        if device_id not in self.device_groups:
+            device = await self.store.get_device(device_id)
+            self.device_groups[device_id] = device.group_id if device else None
+        return self.device_groups[device_id]
+
     async def mark_active(self, device_id: str):
+        now = time.monotonic()
+        coalesce = self.settings.device_last_seen_coalesce_ms / 1000
+        if now - self.last_marked.get(device_id, float("-inf")) < coalesce:
+            return
+
+        self.last_marked[device_id] = now
         await self.store.update_last_seen(device_id)
 
 
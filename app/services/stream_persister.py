@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Optional
+
+from app.config.settings import get_settings
+from app.services.telemetry_service import IngestJob, get_telemetry_service
+from app.storage.ingest_stream import StreamEntry, get_ingest_stream_store
+
+logger = logging.getLogger(__name__)
+
+
+class StreamPersister:
+    def __init__(self):
+        self.settings = get_settings()
+        self.stream = get_ingest_stream_store()
+        self.service = get_telemetry_service()
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self.running = False
+        self.reader: Optional[asyncio.Task] = None
+        self.claimer: Optional[asyncio.Task] = None
+        self.stopping: asyncio.Event = None
+
+        self.persisted_entries = 0
+        self.persisted_points = 0
+        self.claimed_entries = 0
+        self.failed_batches = 0
+        self.poison_entries = 0
+
+    async def start(self, consumer: Optional[str] = None):
+        if consumer:
+            self.consumer = consumer
+
+        await self.stream.ensure_groups()
+        self.stopping = asyncio.Event()
+        self.running = True
+        self.reader = asyncio.create_task(self._read_loop())
+        self.claimer = asyncio.create_task(self._claim_loop())
+
+        logger.info(
+            f"Stream persister {self.consumer} started on "
+            f"{self.settings.telemetry_stream_partitions} partitions"
+        )
+
+    async def stop(self):
+        self.running = False
+
+        if self.stopping:
+            self.stopping.set()
+
+        tasks = [task for task in (self.reader, self.claimer) if task]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.reader = None
+        self.claimer = None
+
+        logger.info(f"Stream persister {self.consumer} stopped")
+
+    async def persist(self, entries: list[StreamEntry]) -> int:
+        jobs = []
+        valid = []
+        poison = []
+
+        for entry in entries:
+            try:
+                points = self.stream.decode_points(entry)
+            except ValueError as e:
+                logger.error(f"Dropping undecodable stream entry {entry.entry_id}: {e}")
+                poison.append(entry)
+                continue
+            jobs.append(
+                IngestJob(entry.device_id, points, entry.event_type, write_through=True)
+            )
+            valid.append(entry)
+
+        if jobs:
+            try:
+                await self.service.pipeline.process(jobs)
+            except Exception as e:
+                self.failed_batches += 1
+                logger.error(
+                    f"Persisting {len(jobs)} stream entries failed, "
+                    f"leaving them pending: {e}"
+                )
+                await self.stream.ack(poison)
+                self.poison_entries += len(poison)
+                return 0
+
+        await self.stream.ack(valid + poison)
+        self.poison_entries += len(poison)
+        self.persisted_entries += len(valid)
+        self.persisted_points += sum(len(job.points) for job in jobs)
+        return len(valid)
+
+    async def _read_loop(self):
+        count = self.settings.telemetry_stream_read_count
+        block_ms = self.settings.telemetry_stream_block_ms
+        pending: Optional[dict[str, str]] = {}
+
+        while self.running:
+            try:
+                if pending is not None:
+                    entries = await self.stream.read(
+                        self.consumer, count, pending=True, cursors=pending
+                    )
+                    if not entries:
+                        pending = None
+                    for entry in entries:
+                        pending[entry.stream] = entry.entry_id
+                else:
+                    entries = await self.stream.read(self.consumer, count, block_ms)
+                if entries:
+                    await self.persist(entries)
+            except Exception as e:
+                logger.error(f"Stream read failed: {e}")
+                await self._pause(block_ms / 1000)
+
+    async def _claim_loop(self):
+        interval = self.settings.telemetry_stream_claim_interval_ms / 1000
+
+        while self.running:
+            await self._pause(interval)
+            if not self.running:
+                break
+
+            try:
+                started = time.monotonic()
+                entries = await self.stream.claim_idle(
+                    self.consumer,
+                    self.settings.telemetry_stream_claim_idle_ms,
+                    self.settings.telemetry_stream_read_count,
+                )
+                if entries:
+                    self.claimed_entries += len(entries)
+                    await self.persist(entries)
+                    logger.info(
+                        f"Recovered {len(entries)} idle stream entries in "
+                        f"{(time.monotonic() - started) * 1000:.1f}ms"
+                    )
+            except Exception as e:
+                logger.error(f"Stream pending recovery failed: {e}")
+
+    async def _pause(self, seconds: float):
+        try:
+            await asyncio.wait_for(self.stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def get_stats(self) -> dict:
+        return {
+            "consumer": self.consumer,
+            "persisted_entries": self.persisted_entries,
+            "persisted_points": self.persisted_points,
+            "claimed_entries": self.claimed_entries,
+            "failed_batches": self.failed_batches,
+            "poison_entries": self.poison_entries,
+        }
+
+
+_persister = StreamPersister()
+
+
+def get_stream_persister() -> StreamPersister:
+    return _persister
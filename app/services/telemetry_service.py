@@ -1,92 +1,363 @@
-from typing import Optional
+import asyncio
+from collections import defaultdict
+from typing import AsyncIterator, NamedTuple, Optional
 
+from pydantic import ValidationError
+
+from app.config.settings import get_settings
+from app.core.counters import get_throughput_counters
+from app.core.dedupe import get_batch_deduplicator
 from app.core.event_bus import get_event_bus
-from app.core.rate_limiter import get_rate_limiter
-from app.core.redis_client import get_redis_client
-from app.models.telemetry import TelemetryBatch, TelemetryPoint, TelemetryQuery
+from app.core.pipeline import IngestionPipeline, PipelineStage
+from app.core.rate_limiter import BatchTooLargeError, get_rate_limiter
+from app.models.telemetry import (
+    LatestValuesQuery,
+    TelemetryBatch,
+    TelemetryPoint,
+    TelemetryQuery,
+    TelemetryRollup,
+)
 from app.services.alert_service import get_alert_service
 from app.services.device_service import get_device_service
-from app.storage.telemetry_store import get_telemetry_store
+from app.storage.ingest_stream import get_ingest_stream_store
+from app.storage.telemetry_buffer import get_telemetry_buffer
+from app.storage.telemetry_store import PreparedWrites, get_telemetry_store
+
+
+class IngestJob(NamedTuple):
+    device_id: str
+    points: list[TelemetryPoint]
+    event_type: str = "telemetry.batch"
+    batch_id: Optional[str] = None
+    sequence: Optional[int] = None
+    writes: Optional[PreparedWrites] = None
+    write_through: bool = False
 
 
 class TelemetryService:
     def __init__(self):
+        self.settings = get_settings()
         self.store = get_telemetry_store()
+        self.buffer = get_telemetry_buffer()
         self.device_service = get_device_service()
         self.alert_service = get_alert_service()
         self.event_bus = get_event_bus()
         self.rate_limiter = get_rate_limiter()
+        self.counters = get_throughput_counters()
+        self.deduplicator = get_batch_deduplicator()
+        self.stream = get_ingest_stream_store()
+        self.pipeline: Optional[IngestionPipeline] = None
 
-    async def ingest_point(self, point: TelemetryPoint) -> None:
-        allowed, remaining = await self.rate_limiter.check_device_rate_limit(
-            point.device_id
+    def _build_pipeline(self) -> IngestionPipeline:
+        settings = self.settings
+        side_async = settings.ingest_pipeline_async_side_stages
+        pipeline = IngestionPipeline("telemetry")
+
+        pipeline.add_stage(PipelineStage("storage", self._store_stage))
+        pipeline.add_stage(
+            PipelineStage(
+                "activity",
+                self._activity_stage,
+                asynchronous=side_async,
+                concurrency=settings.ingest_pipeline_activity_concurrency,
+                max_queue_size=settings.ingest_pipeline_queue_size,
+                batch_size=settings.ingest_pipeline_batch_size,
+                linger_ms=settings.ingest_pipeline_linger_ms,
+            )
+        )
+        pipeline.add_stage(
+            PipelineStage(
+                "alerts",
+                self._alert_stage,
+                asynchronous=side_async,
+                concurrency=settings.ingest_pipeline_alert_concurrency,
+                max_queue_size=settings.ingest_pipeline_queue_size,
+                batch_size=settings.ingest_pipeline_batch_size,
+                linger_ms=settings.ingest_pipeline_linger_ms,
+            )
         )
+        pipeline.add_stage(
+            PipelineStage(
+                "events",
+                self._event_stage,
+                asynchronous=side_async,
+                concurrency=settings.ingest_pipeline_event_concurrency,
+                max_queue_size=settings.ingest_pipeline_queue_size,
+                batch_size=settings.ingest_pipeline_batch_size,
+                linger_ms=settings.ingest_pipeline_linger_ms,
+            )
+        )
+
+        return pipeline
+
+    async def start(self):
+        self.pipeline = self._build_pipeline()
+        await self.pipeline.start()
 
-        if not allowed:
+    async def stop(self):
+        if self.pipeline:
+            await self.pipeline.stop()
+
+    async def ingest_point(self, point: TelemetryPoint) -> None:
+        if not await self._admit(point.device_id, 1, include_global=True):
             raise ValueError(f"Rate limit exceeded for device {point.device_id}")
 
-        await self.store.save_point(point)
+        await self._dispatch([IngestJob(point.device_id, [point], "telemetry.point")])
 
-        redis = await get_redis_client()
-        current_bytes = await redis.get("analytics:global:message_count")
-        current = int(current_bytes) if current_bytes else 0
-        await redis.set("analytics:global:message_count", current + 1)
+    async def ingest_batch(
+        self, batch: TelemetryBatch, writes: Optional[PreparedWrites] = None
+    ) -> bool:
+        if not await self.deduplicator.claim(
+            batch.device_id, batch.batch_id, batch.sequence
+        ):
+            return False
 
-        await self.device_service.mark_active(point.device_id)
+        try:
+            await self._ingest_new_batch(batch, writes)
+        except Exception:
+            await self.deduplicator.release(
+                batch.device_id, batch.batch_id, batch.sequence
+            )
+            raise
+        return True
 
-        await self.alert_service.check_alerts(point)
+    async def _ingest_new_batch(
+        self, batch: TelemetryBatch, writes: Optional[PreparedWrites]
+    ) -> None:
+        cost = len(batch.points)
+        capacity = self.rate_limiter.admission_capacity(
+            await self._admission_group(batch.device_id)
+        )
+        if cost > capacity:
+            raise BatchTooLargeError(
+                f"Batch of {cost} points exceeds the rate limit burst of "
+                f"{capacity} points for device {batch.device_id}"
+            )
 
-        await self.event_bus.publish(
-            "telemetry.ingested",
-            "telemetry.point",
-            {
-                "device_id": point.device_id,
-                "metric": point.metric,
-                "value": point.value,
-            },
+        if not await self._admit(batch.device_id, cost, include_global=True):
+            raise ValueError(f"Rate limit exceeded for device {batch.device_id}")
+
+        await self._dispatch(
+            [
+                IngestJob(
+                    batch.device_id,
+                    batch.points,
+                    batch_id=batch.batch_id,
+                    sequence=batch.sequence,
+                    writes=writes,
+                )
+            ]
         )
 
-    async def ingest_batch(self, batch: TelemetryBatch) -> None:
-        allowed, remaining = await self.rate_limiter.check_device_rate_limit(
-            batch.device_id
+    async def ingest_bulk(self, lines: AsyncIterator[bytes]) -> dict:
+        results: dict[str, dict[str, int]] = {}
+        pending: dict[str, list[TelemetryPoint]] = defaultdict(list)
+        buffered = 0
+        invalid = 0
+
+        async for line in lines:
+            try:
+                point = TelemetryPoint.model_validate_json(line)
+            except ValidationError:
+                invalid += 1
+                continue
+
+            pending[point.device_id].append(point)
+            buffered += 1
+
+            if buffered >= self.settings.telemetry_batch_max_size:
+                await self._ingest_device_groups(pending, results)
+                pending = defaultdict(list)
+                buffered = 0
+
+        if pending:
+            await self._ingest_device_groups(pending, results)
+
+        return {"devices": results, "invalid": invalid}
+
+    async def _ingest_device_groups(
+        self,
+        groups: dict[str, list[TelemetryPoint]],
+        results: dict[str, dict[str, int]],
+    ) -> None:
+        checks = await asyncio.gather(
+            *(
+                self._admit(device_id, len(points))
+                for device_id, points in groups.items()
+            )
         )
 
-        if not allowed:
-            raise ValueError(f"Rate limit exceeded for device {batch.device_id}")
+        jobs = []
+        for (device_id, points), allowed in zip(groups.items(), checks):
+            counts = results.setdefault(device_id, {"accepted": 0, "rejected": 0})
+            if allowed:
+                jobs.append(IngestJob(device_id, points))
+                counts["accepted"] += len(points)
+            else:
+                counts["rejected"] += len(points)
 
-        await self.store.save_batch(batch.points)
+        if jobs:
+            await self._dispatch(jobs)
 
-        redis = await get_redis_client()
-        current_bytes = await redis.get("analytics:global:message_count")
-        current = int(current_bytes) if current_bytes else 0
-        await redis.set("analytics:global:message_count", current + len(batch.points))
+    async def _admission_group(self, device_id: str) -> Optional[str]:
+        if self.settings.rate_limit_telemetry_per_group > 0:
+            return await self.device_service.resolve_group(device_id)
+        return None
 
-        await self.device_service.mark_active(batch.device_id)
+    async def _admit(
+        self, device_id: str, cost: int, include_global: bool = False
+    ) -> bool:
+        allowed, _ = await self.rate_limiter.check_admission(
+            device_id,
+            cost,
+            await self._admission_group(device_id),
+            include_global and not self.rate_limiter.leases_global(),
+        )
+        return allowed
 
-        for point in batch.points:
-            await self.alert_service.check_alerts(point)
+    async def _dispatch(self, jobs: list[IngestJob]) -> None:
+        if not self.settings.telemetry_stream_ingest_enabled:
+            await self.pipeline.process(jobs)
+            return
 
-        await self.event_bus.publish(
-            "telemetry.ingested",
-            "telemetry.batch",
-            {
-                "device_id": batch.device_id,
-                "point_count": len(batch.points),
-            },
+        await self.stream.append(
+            [(job.device_id, job.event_type, job.points) for job in jobs]
         )
+        await self._remember(jobs)
+
+    async def _remember(self, jobs: list[IngestJob]) -> None:
+        await asyncio.gather(
+            *(
+                self.deduplicator.remember(job.device_id, job.batch_id, job.sequence)
+                for job in jobs
+                if job.batch_id is not None or job.sequence is not None
+            )
+        )
+
+    async def _store_stage(self, jobs: list[IngestJob]) -> None:
+        buffered = [
+            point
+            for job in jobs
+            if not job.writes and not job.write_through
+            for point in job.points
+        ]
+        if buffered:
+            await self.buffer.add(buffered)
+
+        direct = [
+            point
+            for job in jobs
+            if not job.writes and job.write_through
+            for point in job.points
+        ]
+        if direct:
+            await self.store.save_batch(direct)
+
+        for job in jobs:
+            if job.writes:
+                await self.store.write_prepared(job.writes)
+
+        await self._remember(jobs)
+
+    async def _activity_stage(self, jobs: list[IngestJob]) -> None:
+        for job in jobs:
+            await self.counters.record(
+                job.device_id,
+                len(job.points),
+                await self.device_service.resolve_group(job.device_id),
+            )
+
+        for device_id in dict.fromkeys(job.device_id for job in jobs):
+            await self.device_service.mark_active(device_id)
+
+    async def _alert_stage(self, jobs: list[IngestJob]) -> None:
+        for job in jobs:
+            for point in job.points:
+                await self.alert_service.check_alerts(point)
+
+    async def _event_stage(self, jobs: list[IngestJob]) -> None:
+        for job in jobs:
+            if job.event_type == "telemetry.point":
+                point = job.points[0]
+                payload = {
+                    "device_id": point.device_id,
+                    "metric": point.metric,
+                    "value": point.value,
+                }
+            else:
+                payload = {
+                    "device_id": job.device_id,
+                    "point_count": len(job.points),
+                }
+
+            await self.event_bus.publish("telemetry.ingested", job.event_type, payload)
 
     async def query_telemetry(self, query: TelemetryQuery) -> list[TelemetryPoint]:
-        return await self.store.query_points(
+        points, _ = await self.query_telemetry_page(query)
+        return points
+
+    async def query_telemetry_page(
+        self, query: TelemetryQuery
+    ) -> tuple[list[TelemetryPoint], Optional[str]]:
+        return await self.store.query_page(
             query.device_id,
             query.metric,
             query.start_time,
             query.end_time,
             query.limit,
+            query.cursor,
+        )
+
+    async def stream_telemetry(
+        self, query: TelemetryQuery, max_points: Optional[int] = None
+    ) -> AsyncIterator[list[TelemetryPoint]]:
+        page_size = self.settings.telemetry_query_page_size
+        cursor = query.cursor
+        remaining = max_points
+
+        while remaining is None or remaining > 0:
+            page_query = query.model_copy(
+                update={
+                    "limit": page_size
+                    if remaining is None
+                    else min(page_size, remaining),
+                    "cursor": cursor,
+                }
+            )
+            points, cursor = await self.query_telemetry_page(page_query)
+            if points:
+                yield points
+            if remaining is not None:
+                remaining -= len(points)
+            if not cursor:
+                break
+
+    async def query_rollups(self, query: TelemetryQuery) -> list[TelemetryRollup]:
+        return await self.store.query_rollups(
+            query.device_id,
+            query.resolution,
+            query.metric,
+            query.start_time,
+            query.end_time,
+            query.limit,
         )
 
     async def get_latest(self, device_id: str, metric: str) -> Optional[TelemetryPoint]:
         return await self.store.get_latest(device_id, metric)
 
+    async def get_latest_values(
+        self, query: LatestValuesQuery
+    ) -> dict[str, dict[str, dict]]:
+        device_ids = list(dict.fromkeys(query.device_ids))
+        if query.group_id:
+            for device_id in await self.device_service.list_group_device_ids(
+                query.group_id
+            ):
+                if device_id not in device_ids:
+                    device_ids.append(device_id)
+
+        return await self.store.get_latest_values(device_ids, query.metrics)
+
 
 _service = TelemetryService()
 
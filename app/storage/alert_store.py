@@ -1,13 +1,138 @@
 from datetime import datetime
 from typing import Optional
 
+from app.config.settings import get_settings
 from app.core.redis_client import get_redis_client
+from app.core.scripts import get_script_registry
 from app.models.alert import Alert, AlertRule, AlertStatus
 
+UPDATE_WINDOW_SCRIPT = """
+local slots = tonumber(ARGV[1])
+local width = tonumber(ARGV[2])
+local ts = tonumber(ARGV[3])
+local value = tonumber(ARGV[4])
+local aggregate = ARGV[5]
+local op = ARGV[6]
+local threshold = tonumber(ARGV[7])
+local min_count = tonumber(ARGV[8])
+local layout = '<iIdddIdddd'
+local size = 68
+
+local function compare(a, b)
+    if op == 'gt' then return a > b end
+    if op == 'lt' then return a < b end
+    if op == 'eq' then return a == b end
+    return a ~= b
+end
+
+local active = 0
+local ring = {}
+local data = redis.call('GET', KEYS[1])
+if data and #data == 1 + slots * size then
+    active = struct.unpack('<B', data)
+    local pos = 2
+    for i = 1, slots do
+        local slot = {struct.unpack(layout, data, pos)}
+        pos = table.remove(slot)
+        if slot[1] >= 0 then
+            ring[i] = slot
+        end
+    end
+end
+
+local id = math.floor(ts / width)
+local newest = id
+for i = 1, slots do
+    if ring[i] and ring[i][1] > newest then
+        newest = ring[i][1]
+    end
+end
+
+local index = id % slots + 1
+local slot = ring[index]
+if id > newest - slots and not (slot and slot[1] > id) then
+    if not slot or slot[1] < id then
+        slot = {id, 0, 0, value, value, 0, ts, value, ts, value}
+        ring[index] = slot
+    end
+    slot[2] = slot[2] + 1
+    slot[3] = slot[3] + value
+    slot[4] = math.min(slot[4], value)
+    slot[5] = math.max(slot[5], value)
+    if compare(value, threshold) then
+        slot[6] = slot[6] + 1
+    end
+    if ts < slot[7] then
+        slot[7] = ts
+        slot[8] = value
+    end
+    if ts >= slot[9] then
+        slot[9] = ts
+        slot[10] = value
+    end
+end
+
+local count, sum, matches = 0, 0, 0
+local low, high, first, last
+for i = 1, slots do
+    local s = ring[i]
+    if s and s[1] > newest - slots then
+        count = count + s[2]
+        sum = sum + s[3]
+        matches = matches + s[6]
+        low = low and math.min(low, s[4]) or s[4]
+        high = high and math.max(high, s[5]) or s[5]
+        if not first or s[7] < first[1] then first = {s[7], s[8]} end
+        if not last or s[9] >= last[1] then last = {s[9], s[10]} end
+    else
+        ring[i] = nil
+    end
+end
+
+local result
+if aggregate == 'avg' and count > 0 then
+    result = sum / count
+elseif aggregate == 'min' then
+    result = low
+elseif aggregate == 'max' then
+    result = high
+elseif aggregate == 'rate' and first and last[1] > first[1] then
+    result = (last[2] - first[2]) / (last[1] - first[1])
+elseif aggregate == 'count' then
+    result = matches
+end
+
+local breached = false
+if result then
+    if aggregate == 'count' then
+        breached = result >= min_count
+    else
+        breached = compare(result, threshold)
+    end
+end
+
+local fired = breached and active == 0
+local parts = {struct.pack('<B', breached and 1 or 0)}
+for i = 1, slots do
+    local s = ring[i] or {-1, 0, 0, 0, 0, 0, 0, 0, 0, 0}
+    parts[i + 1] = struct.pack(layout, unpack(s))
+end
+redis.call('SET', KEYS[1], table.concat(parts), 'EX', ARGV[9])
+
+if fired then
+    return tostring(result)
+end
+return false
+"""
+
+get_script_registry().register("alert_update_window", UPDATE_WINDOW_SCRIPT)
+
 
 class AlertStore:
     def __init__(self):
         self.redis = None
+        self.settings = get_settings()
+        self.scripts = get_script_registry()
 
     async def initialize(self):
         if not self.redis:
@@ -49,6 +174,30 @@ class AlertStore:
 
         return rules
 
+    async def update_window(
+        self, rule: AlertRule, device_id: str, timestamp: float, value: float
+    ) -> Optional[float]:
+        await self.initialize()
+
+        slots = min(self.settings.alert_window_slots, rule.window_seconds)
+        width = -(-rule.window_seconds // slots)
+        result = await self.scripts.call(
+            "alert_update_window",
+            [f"alert:window:{rule.id}:{device_id}"],
+            [
+                slots,
+                width,
+                repr(timestamp),
+                repr(value),
+                rule.aggregate.value,
+                rule.operator.value,
+                repr(rule.threshold),
+                rule.min_count,
+                width * slots * 2,
+            ],
+        )
+        return float(result) if result is not None else None
+
     async def save_alert(self, alert: Alert) -> None:
         await self.initialize()
         key = f"alert:{alert.id}"
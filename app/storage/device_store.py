@@ -1,13 +1,27 @@
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from typing import Optional
 
 from app.core.redis_client import get_redis_client
+from app.core.scripts import get_script_registry
 from app.models.device import Device, DeviceStatus
 
+MARK_ACTIVE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('ZADD', KEYS[2], 'GT', ARGV[1], ARGV[3])
+redis.call('HSET', KEYS[3], ARGV[3], ARGV[2])
+return 1
+"""
+
+get_script_registry().register("device_mark_active", MARK_ACTIVE_SCRIPT)
+
 
 class DeviceStore:
     def __init__(self):
         self.redis = None
+        self.scripts = get_script_registry()
 
     async def initialize(self):
         if not self.redis:
@@ -22,15 +36,36 @@ class DeviceStore:
             pipe.sadd("device:all", device.id)
             if device.group_id:
                 pipe.sadd(f"device:group:{device.group_id}", device.id)
+            pipe.hset("device:status", device.id, device.status.value)
+            if device.last_seen:
+                seen = device.last_seen.replace(tzinfo=timezone.utc).timestamp()
+                pipe.zadd("device:last_seen", {device.id: seen}, gt=True)
             await pipe.execute()
 
+    def _merge_activity(
+        self, data: bytes, last_seen: Optional[float], status: Optional[bytes]
+    ) -> Device:
+        device = Device.model_validate_json(data)
+        if last_seen is not None:
+            device.last_seen = datetime.fromtimestamp(last_seen, timezone.utc).replace(
+                tzinfo=None
+            )
+        if status:
+            device.status = DeviceStatus(status.decode())
+        return device
+
     async def get_device(self, device_id: str) -> Optional[Device]:
         await self.initialize()
-        key = f"device:{device_id}"
-        data = await self.redis.get(key)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(f"device:{device_id}")
+            pipe.zscore("device:last_seen", device_id)
+            pipe.hget("device:status", device_id)
+            data, last_seen, status = await pipe.execute()
+
         if not data:
             return None
-        return Device.model_validate_json(data)
+        return self._merge_activity(data, last_seen, status)
 
     async def get_device_by_serial(self, serial: str) -> Optional[Device]:
         await self.initialize()
@@ -45,11 +80,14 @@ class DeviceStore:
         if not device:
             raise KeyError(f"Device {device_id} not found")
 
+        previous_group = device.group_id
         for key, value in updates.items():
-            if hasattr(device, key) and value is not None:
+            if hasattr(device, key) and (value is not None or key == "group_id"):
                 setattr(device, key, value)
 
         await self.save_device(device)
+        if previous_group and previous_group != device.group_id:
+            await self.redis.srem(f"device:group:{previous_group}", device_id)
         return device
 
     async def list_devices(
@@ -62,21 +100,35 @@ class DeviceStore:
         else:
             device_ids = await self.redis.smembers("device:all")
 
-        devices = []
-        for device_id in list(device_ids)[:limit]:
-            device = await self.get_device(device_id.decode())
-            if device:
-                devices.append(device)
+        device_ids = [d.decode() for d in list(device_ids)[:limit]]
+        if not device_ids:
+            return []
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.mget([f"device:{device_id}" for device_id in device_ids])
+            pipe.zmscore("device:last_seen", device_ids)
+            pipe.hmget("device:status", device_ids)
+            documents, last_seen, statuses = await pipe.execute()
 
-        return devices
+        return [
+            self._merge_activity(data, seen, status)
+            for data, seen, status in zip(documents, last_seen, statuses)
+            if data
+        ]
 
-    async def update_last_seen(self, device_id: str) -> None:
+    async def list_group_device_ids(self, group_id: str) -> list[str]:
         await self.initialize()
-        device = await self.get_device(device_id)
-        if device:
-            device.last_seen = datetime.utcnow()
-            device.status = DeviceStatus.ACTIVE
-            await self.save_device(device)
+        device_ids = await self.redis.smembers(f"device:group:{group_id}")
+        return sorted(d.decode() for d in device_ids)
+
+    async def update_last_seen(self, device_id: str) -> bool:
+        await self.initialize()
+        updated = await self.scripts.call(
+            "device_mark_active",
+            [f"device:{device_id}", "device:last_seen", "device:status"],
+            [time.time(), DeviceStatus.ACTIVE.value, device_id],
+        )
+        return bool(updated)
 
     async def exists_by_serial(self, serial_number: str) -> bool:
         await self.initialize()
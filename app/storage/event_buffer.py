@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from app.config.settings import get_settings
+from app.storage.event_store import EventRecord, get_event_store
+
+logger = logging.getLogger(__name__)
+
+
+class EventWriteBuffer:
+    def __init__(self):
+        self.settings = get_settings()
+        self.store = get_event_store()
+        self.pending: list[tuple[EventRecord, Optional[asyncio.Future]]] = []
+        self.running = False
+        self.flusher: Optional[asyncio.Task] = None
+        self.flush_lock: asyncio.Lock = None
+        self.wakeup: asyncio.Event = None
+        self.drained: asyncio.Event = None
+        self.oldest_enqueued_at: Optional[float] = None
+
+        self.flush_count = 0
+        self.flushed_events = 0
+        self.failed_flushes = 0
+        self.last_flush_lag_ms = 0.0
+        self.max_flush_lag_ms = 0.0
+
+    async def start(self):
+        self.flush_lock = asyncio.Lock()
+        self.wakeup = asyncio.Event()
+        self.drained = asyncio.Event()
+        self.running = True
+        self.flusher = asyncio.create_task(self._flush_loop())
+
+        logger.info(
+            "Event write buffer started "
+            f"(linger={self.settings.event_store_linger_ms}ms, "
+            f"flush_size={self.settings.event_store_flush_size})"
+        )
+
+    async def stop(self):
+        self.running = False
+
+        if self.flusher:
+            self.wakeup.set()
+            await asyncio.gather(self.flusher, return_exceptions=True)
+            self.flusher = None
+
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Lost {len(self.pending)} buffered events on shutdown")
+            for _, waiter in self.pending:
+                if waiter and not waiter.done():
+                    waiter.set_exception(e)
+            self.pending = []
+
+        logger.info("Event write buffer stopped")
+
+    async def add(self, record: EventRecord, wait: bool = False) -> None:
+        if not self.running:
+            await self.store.write_events([record])
+            return
+
+        max_pending = self.settings.event_store_max_pending
+        while self.running and len(self.pending) >= max_pending:
+            self.drained.clear()
+            self.wakeup.set()
+            await self.drained.wait()
+
+        waiter = asyncio.get_running_loop().create_future() if wait else None
+        if not self.pending:
+            self.oldest_enqueued_at = time.monotonic()
+        self.pending.append((record, waiter))
+
+        if waiter or len(self.pending) >= self.settings.event_store_flush_size:
+            self.wakeup.set()
+
+        if waiter:
+            await waiter
+
+    async def flush(self) -> int:
+        async with self.flush_lock:
+            if not self.pending:
+                return 0
+
+            entries = self.pending
+            enqueued_at = self.oldest_enqueued_at
+            self.pending = []
+            self.oldest_enqueued_at = None
+
+            try:
+                await self.store.write_events([record for record, _ in entries])
+            except Exception as e:
+                self.failed_flushes += 1
+                logger.error(f"Event flush of {len(entries)} events failed: {e}")
+                self.pending = entries + self.pending
+                self.oldest_enqueued_at = enqueued_at
+                raise
+            finally:
+                self.drained.set()
+
+            for _, waiter in entries:
+                if waiter and not waiter.done():
+                    waiter.set_result(None)
+
+            lag_ms = (time.monotonic() - enqueued_at) * 1000
+            self.flush_count += 1
+            self.flushed_events += len(entries)
+            self.last_flush_lag_ms = lag_ms
+            self.max_flush_lag_ms = max(self.max_flush_lag_ms, lag_ms)
+
+            return len(entries)
+
+    async def _flush_loop(self):
+        linger = self.settings.event_store_linger_ms / 1000
+
+        while self.running:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=linger)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception:
+                await asyncio.sleep(linger)
+
+    def get_stats(self) -> dict:
+        return {
+            "buffered_events": len(self.pending),
+            "flush_count": self.flush_count,
+            "flushed_events": self.flushed_events,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_lag_ms": round(self.last_flush_lag_ms, 2),
+            "max_flush_lag_ms": round(self.max_flush_lag_ms, 2),
+        }
+
+
+_buffer = EventWriteBuffer()
+
+
+def get_event_buffer() -> EventWriteBuffer:
+    return _buffer
@@ -1,52 +1,227 @@
 import json
+import time
 from datetime import datetime
-from typing import Optional
+from typing import NamedTuple, Optional
 
+from redis.exceptions import ResponseError
+
+from app.config.settings import get_settings
 from app.core.redis_client import get_redis_client
 
 
+class EventRecord(NamedTuple):
+    topic: str
+    fields: dict[str, str]
+
+
 class EventStore:
     def __init__(self):
         self.redis = None
+        self.settings = get_settings()
 
     async def initialize(self):
         if not self.redis:
             self.redis = await get_redis_client()
 
-    async def append_event(self, topic: str, event_type: str, payload: dict) -> str:
+    def _stream_key(self, topic: str) -> str:
+        return f"events:stream:{topic}"
+
+    def _topic(self, stream_key: bytes) -> str:
+        return stream_key.decode()[len(self._stream_key("")) :]
+
+    def build_event(self, topic: str, event_type: str, payload: dict) -> EventRecord:
+        return EventRecord(
+            topic,
+            {
+                "type": event_type,
+                "payload": json.dumps(payload),
+                "timestamp": datetime.utcnow().isoformat(),
+            },
+        )
+
+    async def write_events(self, records: list[EventRecord]) -> list[str]:
         await self.initialize()
 
-        event_id = f"{topic}:{int(datetime.utcnow().timestamp() * 1000000)}"
-        event_data = {
-            "id": event_id,
+        retention = self.settings.event_store_retention_seconds
+        min_id = int((time.time() - retention) * 1000)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for record in records:
+                pipe.xadd(
+                    self._stream_key(record.topic),
+                    record.fields,
+                    maxlen=self.settings.event_store_max_len,
+                    approximate=True,
+                )
+            for topic in {record.topic for record in records}:
+                key = self._stream_key(topic)
+                pipe.xtrim(key, minid=min_id, approximate=True)
+                pipe.expire(key, retention)
+            results = await pipe.execute()
+
+        return [entry_id.decode() for entry_id in results[: len(records)]]
+
+    async def append_event(self, topic: str, event_type: str, payload: dict) -> str:
+        record = self.build_event(topic, event_type, payload)
+        (event_id,) = await self.write_events([record])
+        return event_id
+
+    def _parse(self, topic: str, entry_id: bytes, fields: dict) -> dict:
+        return {
+            "id": entry_id.decode(),
             "topic": topic,
-            "type": event_type,
-            "payload": payload,
-            "timestamp": datetime.utcnow().isoformat(),
+            "type": fields[b"type"].decode(),
+            "payload": json.loads(fields[b"payload"]),
+            "timestamp": fields[b"timestamp"].decode(),
         }
 
-        key = f"events:{topic}"
-        await self.redis.zadd(
-            key,
-            {json.dumps(event_data): int(datetime.utcnow().timestamp())},
+    async def get_events(
+        self,
+        topic: str,
+        start_time: Optional[datetime] = None,
+        limit: int = 100,
+        after: Optional[str] = None,
+    ) -> list[dict]:
+        await self.initialize()
+
+        if after:
+            start = f"({after}"
+        elif start_time:
+            start = str(int(start_time.timestamp() * 1000))
+        else:
+            start = "-"
+
+        entries = await self.redis.xrange(
+            self._stream_key(topic), min=start, max="+", count=limit
         )
-        await self.redis.expire(key, 86400)
+        return [self._parse(topic, entry_id, fields) for entry_id, fields in entries]
 
-        return event_id
+    async def create_consumer_group(
+        self, topic: str, group: str, start_id: str = "0"
+    ) -> None:
+        await self.initialize()
 
-    async def get_events(
-        self, topic: str, start_time: Optional[datetime] = None, limit: int = 100
+        try:
+            await self.redis.xgroup_create(
+                self._stream_key(topic), group, id=start_id, mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read_group(
+        self,
+        topic: str,
+        group: str,
+        consumer: str,
+        limit: int = 100,
+        block_ms: Optional[int] = None,
+        pending: bool = False,
+    ) -> list[dict]:
+        return await self.read_group_topics(
+            [topic], group, consumer, limit, block_ms, pending
+        )
+
+    async def read_group_topics(
+        self,
+        topics: list[str],
+        group: str,
+        consumer: str,
+        limit: int = 100,
+        block_ms: Optional[int] = None,
+        pending: bool = False,
     ) -> list[dict]:
         await self.initialize()
-        key = f"events:{topic}"
 
-        min_score = int(start_time.timestamp()) if start_time else "-inf"
+        start = "0" if pending else ">"
+        response = await self.redis.xreadgroup(
+            group,
+            consumer,
+            {self._stream_key(topic): start for topic in topics},
+            count=limit,
+            block=None if pending else block_ms,
+        )
+        return self._parse_response(response)
+
+    async def read_pending_topics(
+        self, cursors: dict[str, str], group: str, consumer: str, limit: int = 100
+    ) -> list[dict]:
+        await self.initialize()
 
-        results = await self.redis.zrangebyscore(
-            key, min_score, "+inf", start=0, num=limit
+        response = await self.redis.xreadgroup(
+            group,
+            consumer,
+            {self._stream_key(topic): cursor for topic, cursor in cursors.items()},
+            count=limit,
         )
+        return self._parse_response(response)
+
+    async def claim_idle(
+        self,
+        topic: str,
+        group: str,
+        consumer: str,
+        min_idle_ms: int,
+        limit: int = 100,
+        start_id: str = "0-0",
+    ) -> tuple[str, list[dict]]:
+        await self.initialize()
+
+        response = await self.redis.xautoclaim(
+            self._stream_key(topic),
+            group,
+            consumer,
+            min_idle_ms,
+            start_id=start_id,
+            count=limit,
+        )
+        cursor = response[0]
+        events = [
+            self._parse(topic, entry_id, fields)
+            for entry_id, fields in response[1]
+            if fields
+        ]
+        return cursor.decode() if isinstance(cursor, bytes) else cursor, events
+
+    async def latest_ids(self, topics: list[str]) -> dict[str, str]:
+        await self.initialize()
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for topic in topics:
+                pipe.xrevrange(self._stream_key(topic), count=1)
+            results = await pipe.execute()
 
-        return [json.loads(r) for r in results]
+        return {
+            topic: entries[0][0].decode() if entries else "0-0"
+            for topic, entries in zip(topics, results)
+        }
+
+    async def read_topics(
+        self, cursors: dict[str, str], limit: int = 100, block_ms: Optional[int] = None
+    ) -> list[dict]:
+        await self.initialize()
+
+        response = await self.redis.xread(
+            {self._stream_key(topic): cursor for topic, cursor in cursors.items()},
+            count=limit,
+            block=block_ms,
+        )
+        return self._parse_response(response)
+
+    def _parse_response(self, response) -> list[dict]:
+        return [
+            self._parse(self._topic(stream), entry_id, fields)
+            for stream, entries in response or []
+            for entry_id, fields in entries
+            if fields
+        ]
+
+    async def ack(self, topic: str, group: str, event_ids: list[str]) -> int:
+        if not event_ids:
+            return 0
+
+        await self.initialize()
+        return await self.redis.xack(self._stream_key(topic), group, *event_ids)
 
 
 _store = EventStore()
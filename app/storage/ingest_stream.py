@@ -0,0 +1,200 @@
+import zlib
+from typing import NamedTuple, Optional
+
+from pydantic import TypeAdapter
+from redis.exceptions import ResponseError
+
+from app.config.settings import get_settings
+from app.core.redis_client import get_redis_client
+from app.models.telemetry import TelemetryPoint
+
+_points_adapter = TypeAdapter(list[TelemetryPoint])
+
+
+class StreamEntry(NamedTuple):
+    stream: str
+    entry_id: str
+    device_id: str
+    event_type: str
+    points: bytes
+
+
+class StreamBacklogFullError(Exception):
+    pass
+
+
+class IngestStreamStore:
+    def __init__(self):
+        self.redis = None
+        self.settings = get_settings()
+
+    async def initialize(self):
+        if not self.redis:
+            self.redis = await get_redis_client()
+
+    def _stream_key(self, partition: int) -> str:
+        return f"telemetry:ingest:{partition}"
+
+    def partition_for(self, device_id: str) -> int:
+        return (
+            zlib.crc32(device_id.encode()) % self.settings.telemetry_stream_partitions
+        )
+
+    def stream_keys(self) -> list[str]:
+        return [
+            self._stream_key(partition)
+            for partition in range(self.settings.telemetry_stream_partitions)
+        ]
+
+    async def append(
+        self, entries: list[tuple[str, str, list[TelemetryPoint]]]
+    ) -> list[str]:
+        await self.initialize()
+        keys = [
+            self._stream_key(self.partition_for(device_id))
+            for device_id, _, _ in entries
+        ]
+        await self._check_backlog(sorted(set(keys)))
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, (device_id, event_type, points) in zip(keys, entries):
+                pipe.xadd(
+                    key,
+                    {
+                        "device_id": device_id,
+                        "event_type": event_type,
+                        "points": _points_adapter.dump_json(points),
+                    },
+                )
+            ids = await pipe.execute()
+
+        return [entry_id.decode() for entry_id in ids]
+
+    async def _check_backlog(self, keys: list[str]) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.xlen(key)
+            lengths = await pipe.execute()
+
+        max_len = self.settings.telemetry_stream_max_len
+        for key, length in zip(keys, lengths):
+            if length >= max_len:
+                raise StreamBacklogFullError(
+                    f"Ingest stream {key} has {length} unpersisted entries "
+                    f"(limit {max_len})"
+                )
+
+    async def ensure_groups(self) -> None:
+        await self.initialize()
+        group = self.settings.telemetry_stream_group
+
+        for key in self.stream_keys():
+            try:
+                await self.redis.xgroup_create(key, group, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    def _parse(self, stream: str, entry_id, fields: dict) -> StreamEntry:
+        return StreamEntry(
+            stream=stream,
+            entry_id=entry_id.decode() if isinstance(entry_id, bytes) else entry_id,
+            device_id=fields.get(b"device_id", b"").decode(errors="replace"),
+            event_type=fields.get(b"event_type", b"").decode(errors="replace"),
+            points=fields.get(b"points", b""),
+        )
+
+    async def read(
+        self,
+        consumer: str,
+        count: int,
+        block_ms: Optional[int] = None,
+        pending: bool = False,
+        cursors: Optional[dict[str, str]] = None,
+    ) -> list[StreamEntry]:
+        await self.initialize()
+
+        cursors = cursors or {}
+        response = await self.redis.xreadgroup(
+            self.settings.telemetry_stream_group,
+            consumer,
+            {
+                key: cursors.get(key, "0") if pending else ">"
+                for key in self.stream_keys()
+            },
+            count=count,
+            block=None if pending else block_ms,
+        )
+
+        entries = []
+        for stream, messages in response or []:
+            stream = stream.decode()
+            for entry_id, fields in messages:
+                if fields:
+                    entries.append(self._parse(stream, entry_id, fields))
+        return entries
+
+    async def claim_idle(
+        self, consumer: str, min_idle_ms: int, count: int
+    ) -> list[StreamEntry]:
+        await self.initialize()
+        group = self.settings.telemetry_stream_group
+
+        entries = []
+        for key in self.stream_keys():
+            response = await self.redis.xautoclaim(
+                key, group, consumer, min_idle_ms, start_id="0-0", count=count
+            )
+            for entry_id, fields in response[1]:
+                if fields:
+                    entries.append(self._parse(key, entry_id, fields))
+        return entries
+
+    async def ack(self, entries: list[StreamEntry]) -> None:
+        if not entries:
+            return
+
+        await self.initialize()
+        group = self.settings.telemetry_stream_group
+
+        by_stream: dict[str, list[str]] = {}
+        for entry in entries:
+            by_stream.setdefault(entry.stream, []).append(entry.entry_id)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for stream, ids in by_stream.items():
+                pipe.xack(stream, group, *ids)
+                pipe.xdel(stream, *ids)
+            await pipe.execute()
+
+    def decode_points(self, entry: StreamEntry) -> list[TelemetryPoint]:
+        if not entry.device_id or not entry.event_type or not entry.points:
+            raise ValueError(f"Stream entry {entry.entry_id} is missing fields")
+        return _points_adapter.validate_json(entry.points)
+
+    async def get_stats(self) -> dict:
+        await self.initialize()
+        group = self.settings.telemetry_stream_group.encode()
+        keys = self.stream_keys()
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.xlen(key)
+            lengths = await pipe.execute()
+
+        pending = 0
+        for key in keys:
+            try:
+                groups = await self.redis.xinfo_groups(key)
+            except ResponseError:
+                continue
+            pending += sum(info["pending"] for info in groups if info["name"] == group)
+
+        return {"partitions": len(keys), "length": sum(lengths), "pending": pending}
+
+
+_store = IngestStreamStore()
+
+
+def get_ingest_stream_store() -> IngestStreamStore:
+    return _store
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from redis.exceptions import (
+    ExecAbortError,
+    MasterDownError,
+    OutOfMemoryError,
+    ReadOnlyError,
+    ResponseError,
+    TryAgainError,
+)
+
+from app.config.settings import get_settings
+from app.models.telemetry import TelemetryPoint
+from app.storage.telemetry_store import get_telemetry_store
+
+logger = logging.getLogger(__name__)
+
+_RETRYABLE_RESPONSE_ERRORS = (
+    ExecAbortError,
+    MasterDownError,
+    OutOfMemoryError,
+    ReadOnlyError,
+    TryAgainError,
+)
+
+
+class TelemetryWriteBuffer:
+    def __init__(self):
+        self.settings = get_settings()
+        self.store = get_telemetry_store()
+        self.pending: list[TelemetryPoint] = []
+        self.running = False
+        self.flusher: Optional[asyncio.Task] = None
+        self.flush_lock: asyncio.Lock = None
+        self.wakeup: asyncio.Event = None
+        self.drained: asyncio.Event = None
+        self.oldest_enqueued_at: Optional[float] = None
+
+        self.flush_count = 0
+        self.flushed_points = 0
+        self.failed_flushes = 0
+        self.consecutive_failures = 0
+        self.dead_lettered_points = 0
+        self.last_flush_lag_ms = 0.0
+        self.max_flush_lag_ms = 0.0
+
+    async def start(self):
+        self.flush_lock = asyncio.Lock()
+        self.wakeup = asyncio.Event()
+        self.drained = asyncio.Event()
+        self.running = True
+        self.flusher = asyncio.create_task(self._flush_loop())
+
+        logger.info(
+            "Telemetry write-behind buffer started "
+            f"(linger={self.settings.telemetry_write_behind_linger_ms}ms, "
+            f"max_points={self.settings.telemetry_write_behind_max_points})"
+        )
+
+    async def stop(self):
+        self.running = False
+
+        if self.flusher:
+            self.wakeup.set()
+            await asyncio.gather(self.flusher, return_exceptions=True)
+            self.flusher = None
+
+        if self.settings.telemetry_write_behind_flush_on_shutdown:
+            try:
+                await self.flush()
+            except Exception:
+                logger.error(
+                    f"Lost {len(self.pending)} buffered telemetry points on shutdown"
+                )
+                self.pending = []
+        elif self.pending:
+            logger.warning(
+                f"Discarding {len(self.pending)} buffered telemetry points on shutdown"
+            )
+            self.pending = []
+
+        logger.info("Telemetry write-behind buffer stopped")
+
+    async def add(self, points: list[TelemetryPoint]) -> None:
+        if not self.running:
+            await self.store.save_batch(points)
+            return
+
+        max_points = self.settings.telemetry_write_behind_max_points
+        while self.running and len(self.pending) + len(points) > max_points:
+            if not self.pending:
+                break
+            self.drained.clear()
+            self.wakeup.set()
+            await self.drained.wait()
+
+        if not self.pending:
+            self.oldest_enqueued_at = time.monotonic()
+        self.pending.extend(points)
+
+        if len(self.pending) >= self.settings.telemetry_write_behind_flush_size:
+            self.wakeup.set()
+
+    async def flush(self) -> int:
+        async with self.flush_lock:
+            if not self.pending:
+                return 0
+
+            points = self.pending
+            enqueued_at = self.oldest_enqueued_at
+            self.pending = []
+            self.oldest_enqueued_at = None
+
+            try:
+                await self.store.save_batch(points)
+            except Exception as e:
+                self.failed_flushes += 1
+                if isinstance(e, ResponseError) and not isinstance(
+                    e, _RETRYABLE_RESPONSE_ERRORS
+                ):
+                    self._dead_letter(points, e)
+                    return 0
+
+                self.consecutive_failures += 1
+                logger.error(f"Telemetry flush of {len(points)} points failed: {e}")
+                if (
+                    self.consecutive_failures
+                    >= self.settings.telemetry_write_behind_max_retries
+                ):
+                    self.consecutive_failures = 0
+                    self._dead_letter(points, e)
+                else:
+                    self.pending = points + self.pending
+                    self.oldest_enqueued_at = enqueued_at
+                raise
+            finally:
+                self.drained.set()
+
+            self.consecutive_failures = 0
+
+            lag_ms = (time.monotonic() - enqueued_at) * 1000
+            self.flush_count += 1
+            self.flushed_points += len(points)
+            self.last_flush_lag_ms = lag_ms
+            self.max_flush_lag_ms = max(self.max_flush_lag_ms, lag_ms)
+
+            return len(points)
+
+    def _dead_letter(self, points: list[TelemetryPoint], error: Exception) -> None:
+        self.dead_lettered_points += len(points)
+        devices = sorted({point.device_id for point in points})
+        logger.error(
+            f"Dead-lettered {len(points)} telemetry points for "
+            f"{len(devices)} devices ({', '.join(devices[:10])}): {error}"
+        )
+
+    async def _flush_loop(self):
+        linger = self.settings.telemetry_write_behind_linger_ms / 1000
+
+        while self.running:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=linger)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception:
+                await asyncio.sleep(min(linger * 2**self.consecutive_failures, 5.0))
+
+    def get_buffered_count(self) -> int:
+        return len(self.pending)
+
+    def get_stats(self) -> dict:
+        return {
+            "buffered_points": len(self.pending),
+            "flush_count": self.flush_count,
+            "flushed_points": self.flushed_points,
+            "failed_flushes": self.failed_flushes,
+            "dead_lettered_points": self.dead_lettered_points,
+            "last_flush_lag_ms": round(self.last_flush_lag_ms, 2),
+            "max_flush_lag_ms": round(self.max_flush_lag_ms, 2),
+        }
+
+
+_buffer = TelemetryWriteBuffer()
+
+
+def get_telemetry_buffer() -> TelemetryWriteBuffer:
+    return _buffer
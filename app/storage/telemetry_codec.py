@@ -0,0 +1,315 @@
+import json
+import struct
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator, NamedTuple, Optional
+
+from pydantic_core import to_json
+
+from app.models.telemetry import TelemetryPoint
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+_LENGTH = struct.Struct(">I")
+_HEADER = struct.Struct(">BiI")
+_FLOAT = struct.Struct(">d")
+_UINT64 = struct.Struct(">Q")
+
+FLAG_AWARE = 0x01
+FLAG_INT = 0x02
+
+_MAX_EXACT_INT = 1 << 53
+
+# (prefix, prefix bits, payload bits) for delta-of-delta timestamps in microseconds
+_DOD_BUCKETS = ((0b10, 2, 14), (0b110, 3, 20), (0b1110, 4, 32))
+
+
+class SampleRow(NamedTuple):
+    ts: int
+    value: Any
+    unit: str
+    metadata: dict
+    tz: Optional[timezone]
+
+
+class BitWriter:
+    def __init__(self):
+        self.buffer = bytearray()
+        self.current = 0
+        self.bits = 0
+
+    def write(self, value: int, nbits: int) -> None:
+        self.current = (self.current << nbits) | (value & ((1 << nbits) - 1))
+        self.bits += nbits
+        while self.bits >= 8:
+            self.bits -= 8
+            self.buffer.append((self.current >> self.bits) & 0xFF)
+        self.current &= (1 << self.bits) - 1
+
+    def getvalue(self) -> bytes:
+        if self.bits:
+            return bytes(self.buffer) + bytes([self.current << (8 - self.bits)])
+        return bytes(self.buffer)
+
+
+class BitReader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def read_bit(self) -> int:
+        pos = self.pos
+        self.pos = pos + 1
+        return (self.data[pos >> 3] >> (7 - (pos & 7))) & 1
+
+    def read(self, nbits: int) -> int:
+        start = self.pos
+        end = start + nbits
+        first_byte = start >> 3
+        last_byte = (end + 7) >> 3
+        chunk = int.from_bytes(self.data[first_byte:last_byte], "big")
+        self.pos = end
+        return (chunk >> ((last_byte << 3) - end)) & ((1 << nbits) - 1)
+
+
+def to_micros(ts: datetime) -> int:
+    return (ts.astimezone(timezone.utc) - _EPOCH) // _MICROSECOND
+
+
+def from_micros(micros: int, tz: Optional[timezone]) -> datetime:
+    ts = _EPOCH + timedelta(microseconds=micros)
+    if tz is None:
+        return ts.astimezone().replace(tzinfo=None)
+    return ts.astimezone(tz)
+
+
+def _signed(value: int, nbits: int) -> int:
+    if value >= 1 << (nbits - 1):
+        return value - (1 << nbits)
+    return value
+
+
+def _write_dod(writer: BitWriter, dod: int) -> None:
+    if dod == 0:
+        writer.write(0, 1)
+        return
+
+    for prefix, prefix_bits, nbits in _DOD_BUCKETS:
+        bound = 1 << (nbits - 1)
+        if -bound <= dod < bound:
+            writer.write(prefix, prefix_bits)
+            writer.write(dod, nbits)
+            return
+
+    writer.write(0b1111, 4)
+    writer.write(dod, 64)
+
+
+def _read_dod(reader: BitReader) -> int:
+    if not reader.read_bit():
+        return 0
+
+    for _, _, nbits in _DOD_BUCKETS:
+        if not reader.read_bit():
+            return _signed(reader.read(nbits), nbits)
+
+    return _signed(reader.read(64), 64)
+
+
+def _value_kind(value) -> Optional[int]:
+    if type(value) is float:
+        return 0
+    if type(value) is int and -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT:
+        return FLAG_INT
+    return None
+
+
+def _encode_block(points: list[TelemetryPoint], offset: Optional[int]) -> bytes:
+    points = sorted(points, key=lambda p: to_micros(p.timestamp))
+
+    kinds = {_value_kind(p.value) for p in points} - {None}
+    flags = FLAG_INT if kinds == {FLAG_INT} else 0
+    if offset is not None:
+        flags |= FLAG_AWARE
+
+    unit = points[0].unit
+    extras = {}
+    writer = BitWriter()
+    prev_ts = prev_delta = 0
+    prev_bits = 0
+    prev_leading = prev_trailing = -1
+
+    for index, point in enumerate(points):
+        ts = to_micros(point.timestamp)
+        override = {}
+
+        if _value_kind(point.value) == flags & FLAG_INT:
+            bits = _UINT64.unpack(_FLOAT.pack(float(point.value)))[0]
+        else:
+            override["v"] = point.value
+            bits = prev_bits
+        if point.unit != unit:
+            override["u"] = point.unit
+        if point.metadata:
+            override["m"] = point.metadata
+        if override:
+            extras[str(index)] = override
+
+        if index == 0:
+            writer.write(ts, 64)
+            writer.write(bits, 64)
+        else:
+            delta = ts - prev_ts
+            _write_dod(writer, delta - prev_delta)
+            prev_delta = delta
+
+            xor = bits ^ prev_bits
+            if xor == 0:
+                writer.write(0, 1)
+            else:
+                leading = min(64 - xor.bit_length(), 31)
+                trailing = (xor & -xor).bit_length() - 1
+                if (
+                    prev_leading >= 0
+                    and leading >= prev_leading
+                    and trailing >= prev_trailing
+                ):
+                    writer.write(0b10, 2)
+                    writer.write(
+                        xor >> prev_trailing, 64 - prev_leading - prev_trailing
+                    )
+                else:
+                    significant = 64 - leading - trailing
+                    writer.write(0b11, 2)
+                    writer.write(leading, 5)
+                    writer.write(significant - 1, 6)
+                    writer.write(xor >> trailing, significant)
+                    prev_leading, prev_trailing = leading, trailing
+
+        prev_ts = ts
+        prev_bits = bits
+
+    meta = {}
+    if unit:
+        meta["u"] = unit
+    if extras:
+        meta["x"] = extras
+    meta_bytes = to_json(meta) if meta else b""
+
+    body = (
+        _HEADER.pack(flags, offset or 0, len(points))
+        + _LENGTH.pack(len(meta_bytes))
+        + meta_bytes
+        + writer.getvalue()
+    )
+    return _LENGTH.pack(len(body)) + body
+
+
+def encode_blocks(points: list[TelemetryPoint]) -> list[bytes]:
+    by_offset: dict[Optional[int], list[TelemetryPoint]] = defaultdict(list)
+    for point in points:
+        utcoffset = point.timestamp.utcoffset()
+        offset = int(utcoffset.total_seconds()) if utcoffset is not None else None
+        by_offset[offset].append(point)
+
+    return [_encode_block(group, offset) for offset, group in by_offset.items()]
+
+
+def iter_blocks(data: bytes) -> Iterator[bytes]:
+    pos = 0
+    while pos + _LENGTH.size <= len(data):
+        (length,) = _LENGTH.unpack_from(data, pos)
+        pos += _LENGTH.size
+        yield data[pos : pos + length]
+        pos += length
+
+
+def _decode_block(body: bytes) -> Iterator[SampleRow]:
+    flags, offset, count = _HEADER.unpack_from(body, 0)
+    pos = _HEADER.size
+    (meta_length,) = _LENGTH.unpack_from(body, pos)
+    pos += _LENGTH.size
+    meta = json.loads(body[pos : pos + meta_length]) if meta_length else {}
+    reader = BitReader(body[pos + meta_length :])
+
+    tz = timezone(timedelta(seconds=offset)) if flags & FLAG_AWARE else None
+    as_int = bool(flags & FLAG_INT)
+    unit = meta.get("u", "")
+    extras = meta.get("x", {})
+
+    ts = prev_delta = 0
+    bits = 0
+    leading = trailing = 0
+
+    for index in range(count):
+        if index == 0:
+            ts = _signed(reader.read(64), 64)
+            bits = reader.read(64)
+        else:
+            prev_delta += _read_dod(reader)
+            ts += prev_delta
+
+            if reader.read_bit():
+                if reader.read_bit():
+                    leading = reader.read(5)
+                    significant = reader.read(6) + 1
+                    trailing = 64 - leading - significant
+                bits ^= reader.read(64 - leading - trailing) << trailing
+
+        value = _FLOAT.unpack(_UINT64.pack(bits))[0]
+        if as_int:
+            value = int(value)
+
+        override = extras.get(str(index))
+        if override:
+            yield SampleRow(
+                ts,
+                override["v"] if "v" in override else value,
+                override.get("u", unit),
+                override.get("m", {}),
+                tz,
+            )
+        else:
+            yield SampleRow(ts, value, unit, {}, tz)
+
+
+def decode_rows(data: bytes) -> list[SampleRow]:
+    decoded = []
+    for body in iter_blocks(data):
+        decoded.extend(_decode_block(body))
+
+    return merge_rows(decoded)
+
+
+def merge_rows(decoded: list[SampleRow]) -> list[SampleRow]:
+    decoded.sort(key=lambda row: row.ts)
+
+    rows = []
+    run_ts = None
+    run: list[SampleRow] = []
+    for row in decoded:
+        if row.ts != run_ts:
+            run_ts = row.ts
+            run = []
+        if row in run:
+            continue
+        run.append(row)
+        rows.append(row)
+
+    return rows
+
+
+def to_point(row: SampleRow, device_id: str, metric: str) -> TelemetryPoint:
+    return TelemetryPoint.model_construct(
+        device_id=device_id,
+        timestamp=from_micros(row.ts, row.tz),
+        metric=metric,
+        value=row.value,
+        unit=row.unit,
+        metadata=row.metadata,
+    )
+
+
+def decode_chunk(data: bytes, device_id: str, metric: str) -> list[TelemetryPoint]:
+    return [to_point(row, device_id, metric) for row in decode_rows(data)]
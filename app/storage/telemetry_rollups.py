@@ -0,0 +1,147 @@
+import math
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+from app.models.telemetry import RollupResolution, TelemetryPoint, TelemetryRollup
+from app.storage.telemetry_codec import to_micros
+
+UPDATE_ROLLUPS_SCRIPT = """
+for i = 1, #KEYS do
+    local base = (i - 1) * 8
+    local key = KEYS[i]
+    local bucket = ARGV[base + 1]
+
+    redis.call('HINCRBY', key, bucket .. ':count', ARGV[base + 2])
+    redis.call('HINCRBYFLOAT', key, bucket .. ':sum', ARGV[base + 3])
+
+    local min = redis.call('HGET', key, bucket .. ':min')
+    if not min or tonumber(ARGV[base + 4]) < tonumber(min) then
+        redis.call('HSET', key, bucket .. ':min', ARGV[base + 4])
+    end
+
+    local max = redis.call('HGET', key, bucket .. ':max')
+    if not max or tonumber(ARGV[base + 5]) > tonumber(max) then
+        redis.call('HSET', key, bucket .. ':max', ARGV[base + 5])
+    end
+
+    local last_ts = redis.call('HGET', key, bucket .. ':ts')
+    if not last_ts or tonumber(ARGV[base + 6]) >= tonumber(last_ts) then
+        redis.call('HSET', key, bucket .. ':ts', ARGV[base + 6])
+        redis.call('HSET', key, bucket .. ':last', ARGV[base + 7])
+    end
+
+    redis.call('EXPIRE', key, ARGV[base + 8])
+end
+return #KEYS
+"""
+
+
+class Resolution(NamedTuple):
+    bucket_seconds: int
+    partition_seconds: int
+
+
+RESOLUTIONS: dict[RollupResolution, Resolution] = {
+    RollupResolution.MINUTE: Resolution(60, 86400),
+    RollupResolution.HOUR: Resolution(3600, 86400 * 30),
+    RollupResolution.DAY: Resolution(86400, 86400 * 365),
+}
+
+
+class RollupAccumulator:
+    __slots__ = ("count", "sum", "min", "max", "last_ts", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self.last_ts = None
+        self.last = None
+
+    def add(self, ts: int, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        if self.last_ts is None or ts >= self.last_ts:
+            self.last_ts = ts
+            self.last = value
+
+
+def rollup_value(value) -> Optional[float]:
+    if type(value) in (int, float) and math.isfinite(value):
+        return value
+    return None
+
+
+def bucket_start(micros: int, resolution: RollupResolution) -> int:
+    size = RESOLUTIONS[resolution].bucket_seconds
+    return (micros // 1_000_000) // size * size
+
+
+def partition_start(bucket: int, resolution: RollupResolution) -> int:
+    size = RESOLUTIONS[resolution].partition_seconds
+    return bucket // size * size
+
+
+def accumulate_rollups(
+    points: list[TelemetryPoint],
+) -> dict[tuple[RollupResolution, str, str, int], RollupAccumulator]:
+    rollups: dict[tuple[RollupResolution, str, str, int], RollupAccumulator] = {}
+
+    for point in points:
+        value = rollup_value(point.value)
+        if value is None:
+            continue
+
+        ts = to_micros(point.timestamp)
+        for resolution in RESOLUTIONS:
+            key = (
+                resolution,
+                point.device_id,
+                point.metric,
+                bucket_start(ts, resolution),
+            )
+            accumulator = rollups.get(key)
+            if accumulator is None:
+                accumulator = rollups[key] = RollupAccumulator()
+            accumulator.add(ts, value)
+
+    return rollups
+
+
+def parse_partition(
+    fields: dict[bytes, bytes],
+    device_id: str,
+    metric: str,
+    resolution: RollupResolution,
+) -> list[TelemetryRollup]:
+    buckets: dict[int, dict[str, bytes]] = {}
+    for field, raw in fields.items():
+        bucket, _, name = field.decode().partition(":")
+        buckets.setdefault(int(bucket), {})[name] = raw
+
+    rollups = []
+    for bucket, values in buckets.items():
+        if "count" not in values or "ts" not in values:
+            continue
+        count = int(values["count"])
+        total = float(values["sum"])
+        rollups.append(
+            TelemetryRollup(
+                device_id=device_id,
+                metric=metric,
+                resolution=resolution,
+                bucket_start=datetime.fromtimestamp(bucket, tz=timezone.utc),
+                count=count,
+                sum=total,
+                min=float(values["min"]),
+                max=float(values["max"]),
+                avg=total / count if count else 0.0,
+                last=float(values["last"]),
+            )
+        )
+    return rollups
@@ -0,0 +1,247 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import timedelta, timezone
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote, unquote
+
+from pydantic_core import to_json
+
+from app.config.settings import get_settings
+from app.storage.telemetry_codec import SampleRow, merge_rows
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".seg"
+
+_MAGIC = b"SHS1"
+_HEADER = struct.Struct("<4sII")
+_NAIVE = -(1 << 31)
+_MAX_EXACT_INT = 1 << 53
+
+ROW_INT = 0x01
+
+
+def _path_name(name: str) -> str:
+    return quote(name, safe="").replace(".", "%2E")
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def encode_segment(rows: list[SampleRow]) -> bytes:
+    timestamps = array("q")
+    values = array("d")
+    offsets = array("i")
+    flags = bytearray()
+    unit = rows[0].unit if rows else ""
+    extras = {}
+
+    for index, row in enumerate(rows):
+        override = {}
+        timestamps.append(row.ts)
+
+        if type(row.value) is int and -_MAX_EXACT_INT <= row.value <= _MAX_EXACT_INT:
+            values.append(float(row.value))
+            flags.append(ROW_INT)
+        elif type(row.value) is float:
+            values.append(row.value)
+            flags.append(0)
+        else:
+            values.append(0.0)
+            flags.append(0)
+            override["v"] = row.value
+
+        if row.tz is None:
+            offsets.append(_NAIVE)
+        else:
+            offsets.append(int(row.tz.utcoffset(None).total_seconds()))
+
+        if row.unit != unit:
+            override["u"] = row.unit
+        if row.metadata:
+            override["m"] = row.metadata
+        if override:
+            extras[str(index)] = override
+
+    meta = {"u": unit}
+    if extras:
+        meta["x"] = extras
+    meta_bytes = to_json(meta)
+
+    head = _HEADER.pack(_MAGIC, len(rows), len(meta_bytes)) + meta_bytes
+    padding = b"\0" * (_align(len(head)) - len(head))
+    return (
+        head
+        + padding
+        + timestamps.tobytes()
+        + values.tobytes()
+        + offsets.tobytes()
+        + bytes(flags)
+    )
+
+
+def decode_segment(
+    data, start_us: Optional[int] = None, end_us: Optional[int] = None
+) -> list[SampleRow]:
+    magic, count, meta_length = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC:
+        raise ValueError("Not a telemetry segment")
+
+    pos = _HEADER.size
+    meta = json.loads(bytes(data[pos : pos + meta_length]))
+    pos = _align(pos + meta_length)
+
+    view = memoryview(data)
+    timestamps = view[pos : pos + 8 * count].cast("q")
+    values = view[pos + 8 * count : pos + 16 * count].cast("d")
+    offsets = view[pos + 16 * count : pos + 20 * count].cast("i")
+    flags = view[pos + 20 * count : pos + 21 * count]
+
+    try:
+        first = bisect_left(timestamps, start_us) if start_us is not None else 0
+        last = bisect_right(timestamps, end_us) if end_us is not None else count
+
+        unit = meta.get("u", "")
+        extras = meta.get("x", {})
+        zones: dict[int, Optional[timezone]] = {_NAIVE: None}
+        rows = []
+
+        for index in range(first, last):
+            offset = offsets[index]
+            tz = zones.get(offset)
+            if tz is None and offset != _NAIVE:
+                tz = zones[offset] = timezone(timedelta(seconds=offset))
+
+            value = values[index]
+            if flags[index] & ROW_INT:
+                value = int(value)
+
+            override = extras.get(str(index))
+            if override:
+                rows.append(
+                    SampleRow(
+                        timestamps[index],
+                        override["v"] if "v" in override else value,
+                        override.get("u", unit),
+                        override.get("m", {}),
+                        tz,
+                    )
+                )
+            else:
+                rows.append(SampleRow(timestamps[index], value, unit, {}, tz))
+
+        return rows
+    finally:
+        for column in (timestamps, values, offsets, flags):
+            column.release()
+        view.release()
+
+
+class SegmentStore:
+    def __init__(self):
+        self.settings = get_settings()
+
+    @property
+    def root(self) -> Path:
+        return Path(self.settings.telemetry_cold_tier_path)
+
+    def _series_dir(self, device_id: str, metric: str) -> Path:
+        return self.root / _path_name(device_id) / _path_name(metric)
+
+    def _segment_path(self, device_id: str, metric: str, span_start: int) -> Path:
+        return self._series_dir(device_id, metric) / f"{span_start}{SEGMENT_SUFFIX}"
+
+    def write_segment(
+        self, device_id: str, metric: str, span_start: int, rows: list[SampleRow]
+    ) -> int:
+        path = self._segment_path(device_id, metric, span_start)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if path.exists():
+            rows = merge_rows(self.read_rows(device_id, metric, span_start) + rows)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(encode_segment(rows))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        return len(rows)
+
+    def read_rows(
+        self,
+        device_id: str,
+        metric: str,
+        span_start: int,
+        start_us: Optional[int] = None,
+        end_us: Optional[int] = None,
+    ) -> list[SampleRow]:
+        path = self._segment_path(device_id, metric, span_start)
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return []
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return decode_segment(mapped, start_us, end_us)
+        except FileNotFoundError:
+            return []
+
+    def list_spans(self, device_id: str, metric: str) -> list[int]:
+        try:
+            names = os.listdir(self._series_dir(device_id, metric))
+        except FileNotFoundError:
+            return []
+        return [
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in names
+            if name.endswith(SEGMENT_SUFFIX)
+        ]
+
+    def list_metrics(self, device_id: str) -> list[str]:
+        try:
+            names = os.listdir(self.root / _path_name(device_id))
+        except FileNotFoundError:
+            return []
+        return [unquote(name) for name in names]
+
+    def purge_expired(self, now: float) -> int:
+        if not self.root.exists():
+            return 0
+
+        cutoff = now - self.settings.telemetry_cold_tier_retention_seconds
+        span = self.settings.telemetry_chunk_span_seconds
+        purged = 0
+
+        for path in self.root.glob(f"*/*/*{SEGMENT_SUFFIX}"):
+            try:
+                span_start = int(path.name[: -len(SEGMENT_SUFFIX)])
+            except ValueError:
+                continue
+            if span_start + span <= cutoff:
+                path.unlink(missing_ok=True)
+                purged += 1
+
+        if purged:
+            logger.info(f"Purged {purged} expired cold telemetry segments")
+
+        return purged
+
+
+_segments = SegmentStore()
+
+
+def get_segment_store() -> SegmentStore:
+    return _segments
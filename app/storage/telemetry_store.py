@@ -1,48 +1,547 @@
+import asyncio
+import base64
+import heapq
+import json
+from collections import defaultdict
 from datetime import datetime
-from typing import Optional
+from typing import NamedTuple, Optional
+
+from pydantic_core import to_json
 
 from app.config.settings import get_settings
+from app.core.locks import distributed_lock
 from app.core.redis_client import get_redis_client
-from app.models.telemetry import TelemetryPoint
+from app.core.scripts import get_script_registry
+from app.models.telemetry import RollupResolution, TelemetryPoint, TelemetryRollup
+from app.storage.telemetry_codec import (
+    SampleRow,
+    decode_chunk,
+    decode_rows,
+    encode_blocks,
+    iter_blocks,
+    merge_rows,
+    to_micros,
+    to_point,
+)
+from app.storage.telemetry_rollups import (
+    UPDATE_ROLLUPS_SCRIPT,
+    RollupAccumulator,
+    accumulate_rollups,
+    bucket_start,
+    parse_partition,
+    partition_start,
+)
+from app.storage.telemetry_segments import get_segment_store
+
+COMPACT_CHUNK_SCRIPT = """
+local tail = redis.call('GETRANGE', KEYS[1], ARGV[2], -1)
+redis.call('SET', KEYS[1], ARGV[1] .. tail, 'EX', ARGV[5])
+redis.call('HINCRBY', KEYS[2], ARGV[3], ARGV[4])
+return string.len(tail)
+"""
+
+MOVE_CHUNK_SCRIPT = """
+local tail = redis.call('GETRANGE', KEYS[1], ARGV[1], -1)
+if tail == '' then
+    redis.call('DEL', KEYS[1])
+    redis.call('HDEL', KEYS[2], ARGV[2])
+else
+    redis.call('SET', KEYS[1], tail, 'KEEPTTL')
+    redis.call('HSET', KEYS[2], ARGV[2], 1)
+end
+return string.len(tail)
+"""
+
+UPDATE_LATEST_SCRIPT = """
+for i = 1, #KEYS do
+    local base = (i - 1) * 3
+    local current = redis.call('HGET', KEYS[i], ARGV[base + 1])
+    local ts = ARGV[base + 2]
+    local current_ts = current and tonumber(string.match(current, '^(%-?%d+)|'))
+    if not current_ts or current_ts <= tonumber(ts) then
+        redis.call('HSET', KEYS[i], ARGV[base + 1], ts .. '|' .. ARGV[base + 3])
+    end
+    redis.call('EXPIRE', KEYS[i], ARGV[#ARGV])
+end
+return #KEYS
+"""
+
+_scripts = get_script_registry()
+_scripts.register("telemetry_compact_chunk", COMPACT_CHUNK_SCRIPT)
+_scripts.register("telemetry_move_chunk", MOVE_CHUNK_SCRIPT)
+_scripts.register("telemetry_update_latest", UPDATE_LATEST_SCRIPT)
+_scripts.register("telemetry_update_rollups", UPDATE_ROLLUPS_SCRIPT)
+
+
+class PreparedWrites(NamedTuple):
+    series: dict[tuple[str, str, int], list[bytes]]
+    device_counts: dict[str, int]
+    latest: dict[tuple[str, str], tuple[int, bytes]]
+    rollups: dict[tuple[RollupResolution, str, str, int], RollupAccumulator]
+
+
+def prepare_writes(
+    points: list[TelemetryPoint], span_seconds: int, rollups: bool = True
+) -> PreparedWrites:
+    series: dict[tuple[str, str, int], list[TelemetryPoint]] = defaultdict(list)
+    device_counts: dict[str, int] = defaultdict(int)
+    latest: dict[tuple[str, str], tuple[int, TelemetryPoint]] = {}
+    for point in points:
+        ts = to_micros(point.timestamp)
+        span_start = (ts // 1_000_000) // span_seconds * span_seconds
+        series[(point.device_id, point.metric, span_start)].append(point)
+        device_counts[point.device_id] += 1
+
+        newest = latest.get((point.device_id, point.metric))
+        if newest is None or ts >= newest[0]:
+            latest[(point.device_id, point.metric)] = (ts, point)
+
+    return PreparedWrites(
+        series={key: encode_blocks(group) for key, group in series.items()},
+        device_counts=dict(device_counts),
+        latest={
+            key: (
+                ts,
+                to_json(
+                    {
+                        "timestamp": point.timestamp,
+                        "value": point.value,
+                        "unit": point.unit,
+                        "metadata": point.metadata,
+                    }
+                ),
+            )
+            for key, (ts, point) in latest.items()
+        },
+        rollups=accumulate_rollups(points) if rollups else {},
+    )
 
 
 class TelemetryStore:
     def __init__(self):
         self.redis = None
         self.settings = get_settings()
+        self.segments = get_segment_store()
+        self.scripts = get_script_registry()
 
     async def initialize(self):
         if not self.redis:
             self.redis = await get_redis_client()
 
+    def _span_start(self, micros: int) -> int:
+        span = self.settings.telemetry_chunk_span_seconds
+        return (micros // 1_000_000) // span * span
+
+    def _chunk_key(self, device_id: str, metric: str, span_start: int) -> str:
+        return f"telemetry:chunk:{device_id}:{metric}:{span_start}"
+
+    def _index_key(self, device_id: str, metric: str) -> str:
+        return f"telemetry:chunks:{device_id}:{metric}"
+
+    def _catalog_key(self, device_id: str) -> str:
+        return f"telemetry:metrics:{device_id}"
+
+    def _latest_key(self, device_id: str) -> str:
+        return f"telemetry:latest:{device_id}"
+
+    def _rollup_key(
+        self, resolution: RollupResolution, device_id: str, metric: str, partition: int
+    ) -> str:
+        return f"telemetry:rollup:{resolution.value}:{device_id}:{metric}:{partition}"
+
+    def _rollup_index_key(
+        self, resolution: RollupResolution, device_id: str, metric: str
+    ) -> str:
+        return f"telemetry:rollups:{resolution.value}:{device_id}:{metric}"
+
+    def _rollup_retention(self, resolution: RollupResolution) -> int:
+        settings = self.settings
+        return {
+            RollupResolution.MINUTE: settings.telemetry_rollup_1m_retention_seconds,
+            RollupResolution.HOUR: settings.telemetry_rollup_1h_retention_seconds,
+            RollupResolution.DAY: settings.telemetry_rollup_1d_retention_seconds,
+        }[resolution]
+
     async def save_point(self, point: TelemetryPoint) -> None:
+        await self.save_batch([point])
+
+    async def save_batch(self, points: list[TelemetryPoint]) -> None:
+        await self.write_prepared(
+            prepare_writes(
+                points,
+                self.settings.telemetry_chunk_span_seconds,
+                self.settings.telemetry_rollups_enabled,
+            )
+        )
+
+    async def write_prepared(self, prepared: PreparedWrites) -> None:
         await self.initialize()
 
-        ts = int(point.timestamp.timestamp())
-        key = f"telemetry:{point.device_id}:{point.metric}"
+        retention = self.settings.telemetry_retention_seconds
+
+        async with self.redis.pipeline() as pipe:
+            for (device_id, metric, span_start), blocks in prepared.series.items():
+                chunk_key = self._chunk_key(device_id, metric, span_start)
+                index_key = self._index_key(device_id, metric)
+
+                pipe.append(chunk_key, b"".join(blocks))
+                pipe.expire(chunk_key, retention)
+                pipe.hincrby(index_key, span_start, len(blocks))
+                pipe.expire(index_key, retention)
+
+            for device_id, metric in {(d, m) for d, m, _ in prepared.series}:
+                pipe.sadd(self._catalog_key(device_id), metric)
+
+            for device_id, count in prepared.device_counts.items():
+                pipe.incrby(f"telemetry:count:{device_id}", count)
+                pipe.expire(self._catalog_key(device_id), retention)
+
+            self._queue_latest(pipe, prepared.latest)
+            self._queue_rollups(pipe, prepared.rollups)
 
-        await self.redis.zadd(
-            key,
-            {point.model_dump_json(): ts},
+            results = await self.scripts.execute(pipe)
+
+        threshold = self.settings.telemetry_chunk_compact_blocks
+        for position, (device_id, metric, span_start) in enumerate(prepared.series):
+            if results[position * 4 + 2] >= threshold:
+                await self._compact_chunk(device_id, metric, span_start)
+
+    def _queue_latest(
+        self, pipe, latest: dict[tuple[str, str], tuple[int, bytes]]
+    ) -> None:
+        if not latest:
+            return
+
+        keys = []
+        args = []
+        for (device_id, metric), (ts, entry) in latest.items():
+            keys.append(self._latest_key(device_id))
+            args.extend([metric, ts, entry])
+
+        self.scripts.queue(
+            pipe,
+            "telemetry_update_latest",
+            keys,
+            [*args, self.settings.telemetry_retention_seconds],
         )
-        await self.redis.expire(key, self.settings.telemetry_retention_seconds)
 
-        await self.redis.incr(f"telemetry:count:{point.device_id}")
+    def _parse_latest(self, raw: bytes) -> dict:
+        _, _, payload = raw.partition(b"|")
+        return json.loads(payload)
 
-    async def save_batch(self, points: list[TelemetryPoint]) -> None:
+    def _queue_rollups(
+        self,
+        pipe,
+        rollups: dict[tuple[RollupResolution, str, str, int], RollupAccumulator],
+    ) -> None:
+        if not rollups:
+            return
+
+        keys = []
+        args = []
+        partitions: dict[tuple[RollupResolution, str, str], set[int]] = defaultdict(set)
+        for (resolution, device_id, metric, bucket), rollup in rollups.items():
+            partition = partition_start(bucket, resolution)
+            keys.append(self._rollup_key(resolution, device_id, metric, partition))
+            args.extend(
+                [
+                    bucket,
+                    rollup.count,
+                    rollup.sum,
+                    rollup.min,
+                    rollup.max,
+                    rollup.last_ts,
+                    rollup.last,
+                    self._rollup_retention(resolution),
+                ]
+            )
+            partitions[(resolution, device_id, metric)].add(partition)
+
+        self.scripts.queue(pipe, "telemetry_update_rollups", keys, args)
+
+        for (resolution, device_id, metric), starts in partitions.items():
+            index_key = self._rollup_index_key(resolution, device_id, metric)
+            pipe.sadd(index_key, *starts)
+            pipe.expire(index_key, self._rollup_retention(resolution))
+
+    async def _compact_chunk(self, device_id: str, metric: str, span_start: int):
+        chunk_key = self._chunk_key(device_id, metric, span_start)
+
+        try:
+            async with distributed_lock(f"compact:{chunk_key}", retry_count=1):
+                data = await self.redis.get(chunk_key)
+                if not data:
+                    return
+
+                old_blocks = sum(1 for _ in iter_blocks(data))
+                blocks = encode_blocks(decode_chunk(data, device_id, metric))
+
+                await self.scripts.call(
+                    "telemetry_compact_chunk",
+                    [chunk_key, self._index_key(device_id, metric)],
+                    [
+                        b"".join(blocks),
+                        len(data),
+                        span_start,
+                        len(blocks) - old_blocks,
+                        self.settings.telemetry_retention_seconds,
+                    ],
+                )
+        except TimeoutError:
+            return
+
+    async def move_aged_chunks(self, before: float) -> tuple[int, int]:
         await self.initialize()
 
-        async with self.redis.pipeline() as pipe:
-            for point in points:
-                ts = int(point.timestamp.timestamp())
-                key = f"telemetry:{point.device_id}:{point.metric}"
-                pipe.zadd(key, {point.model_dump_json(): ts})
-                pipe.expire(key, self.settings.telemetry_retention_seconds)
+        span = self.settings.telemetry_chunk_span_seconds
+        prefix = self._catalog_key("")
+        moved_chunks = moved_points = 0
+
+        async for key in self.redis.scan_iter(match=f"{prefix}*", count=500):
+            device_id = key.decode()[len(prefix) :]
+            for raw_metric in await self.redis.smembers(key):
+                metric = raw_metric.decode()
+                spans = await self.redis.hkeys(self._index_key(device_id, metric))
+                for span_start in sorted(map(int, spans)):
+                    if span_start + span > before:
+                        continue
+                    moved = await self._move_chunk(device_id, metric, span_start)
+                    if moved:
+                        moved_chunks += 1
+                        moved_points += moved
+
+        return moved_chunks, moved_points
+
+    async def _move_chunk(self, device_id: str, metric: str, span_start: int) -> int:
+        chunk_key = self._chunk_key(device_id, metric, span_start)
+        index_key = self._index_key(device_id, metric)
 
-            if points:
-                pipe.incrby(f"telemetry:count:{points[0].device_id}", len(points))
+        try:
+            async with distributed_lock(f"compact:{chunk_key}", retry_count=1):
+                data = await self.redis.get(chunk_key)
+                if not data:
+                    await self.redis.hdel(index_key, span_start)
+                    return 0
 
-            await pipe.execute()
+                rows = decode_rows(data)
+                await asyncio.to_thread(
+                    self.segments.write_segment, device_id, metric, span_start, rows
+                )
+                await self.scripts.call(
+                    "telemetry_move_chunk",
+                    [chunk_key, index_key],
+                    [len(data), span_start],
+                )
+                return len(rows)
+        except TimeoutError:
+            return 0
+
+    async def _list_metrics(self, device_id: str) -> list[str]:
+        metrics = {
+            m.decode() for m in await self.redis.smembers(self._catalog_key(device_id))
+        }
+        if self.settings.telemetry_cold_tier_enabled:
+            metrics.update(
+                await asyncio.to_thread(self.segments.list_metrics, device_id)
+            )
+        return sorted(metrics)
+
+    def _filter_spans(
+        self, spans, start_us: Optional[int], end_us: Optional[int]
+    ) -> list[int]:
+        first = self._span_start(start_us) if start_us is not None else None
+        last = self._span_start(end_us) if end_us is not None else None
+        return sorted(
+            (
+                span
+                for span in map(int, spans)
+                if (first is None or span >= first) and (last is None or span <= last)
+            ),
+            reverse=True,
+        )
+
+    async def _list_spans(
+        self,
+        device_id: str,
+        metrics: list[str],
+        start_us: Optional[int],
+        end_us: Optional[int],
+    ) -> dict[str, list[int]]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for metric in metrics:
+                pipe.hkeys(self._index_key(device_id, metric))
+            results = await pipe.execute()
+
+        return {
+            metric: self._filter_spans(raw_spans, start_us, end_us)
+            for metric, raw_spans in zip(metrics, results)
+        }
+
+    async def _list_cold_spans(
+        self,
+        device_id: str,
+        metrics: list[str],
+        start_us: Optional[int],
+        end_us: Optional[int],
+    ) -> dict[str, list[int]]:
+        if not self.settings.telemetry_cold_tier_enabled:
+            return {metric: [] for metric in metrics}
+
+        return {
+            metric: self._filter_spans(
+                await asyncio.to_thread(self.segments.list_spans, device_id, metric),
+                start_us,
+                end_us,
+            )
+            for metric in metrics
+        }
+
+    async def _fetch_chunks(
+        self, device_id: str, requests: list[tuple[str, int]]
+    ) -> list[Optional[bytes]]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for metric, span_start in requests:
+                pipe.get(self._chunk_key(device_id, metric, span_start))
+            chunks = await pipe.execute()
+
+        expired = defaultdict(list)
+        for (metric, span_start), data in zip(requests, chunks):
+            if data is None:
+                expired[metric].append(span_start)
+        for metric, span_starts in expired.items():
+            await self.redis.hdel(self._index_key(device_id, metric), *span_starts)
+
+        return chunks
+
+    async def _load_series(
+        self,
+        device_id: str,
+        span_start: int,
+        metrics: list[str],
+        hot: dict[str, list[int]],
+        cold: dict[str, list[int]],
+        start_us: Optional[int] = None,
+        end_us: Optional[int] = None,
+    ) -> list[list[SampleRow]]:
+        hot_requests = [(m, span_start) for m in metrics if span_start in hot[m]]
+        chunks = {}
+        if hot_requests:
+            fetched = await self._fetch_chunks(device_id, hot_requests)
+            chunks = {m: data for (m, _), data in zip(hot_requests, fetched)}
+
+        series = []
+        for metric in metrics:
+            rows = decode_rows(chunks[metric]) if chunks.get(metric) else []
+            if span_start in cold[metric]:
+                cold_rows = await asyncio.to_thread(
+                    self.segments.read_rows,
+                    device_id,
+                    metric,
+                    span_start,
+                    start_us,
+                    end_us,
+                )
+                rows = merge_rows(cold_rows + rows) if rows else cold_rows
+            series.append(rows)
+
+        return series
+
+    def _encode_cursor(self, key: tuple[int, str, int]) -> str:
+        ts, metric, index = key
+        raw = json.dumps([-ts, metric, index], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def _decode_cursor(self, cursor: str) -> tuple[int, str, int]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            ts, metric, index = json.loads(base64.urlsafe_b64decode(padded))
+            return (-int(ts), str(metric), int(index))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    def _ordered_rows(
+        self,
+        rows: list[SampleRow],
+        metric: str,
+        start_us: Optional[int],
+        end_us: Optional[int],
+        after: Optional[tuple[int, str, int]],
+    ) -> list[tuple[tuple[int, str, int], SampleRow]]:
+        keyed = []
+        run_ts = None
+        index = 0
+        for row in rows:
+            if row.ts != run_ts:
+                run_ts = row.ts
+                index = 0
+            else:
+                index += 1
+            if start_us is not None and row.ts < start_us:
+                continue
+            if end_us is not None and row.ts > end_us:
+                continue
+            key = (-row.ts, metric, index)
+            if after is not None and key <= after:
+                continue
+            keyed.append((key, row))
+
+        keyed.sort(key=lambda item: item[0])
+        return keyed
+
+    async def query_page(
+        self,
+        device_id: str,
+        metric: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[TelemetryPoint], Optional[str]]:
+        await self.initialize()
+
+        after = self._decode_cursor(cursor) if cursor else None
+        metrics = [metric] if metric else await self._list_metrics(device_id)
+        start_us = to_micros(start_time) if start_time else None
+        end_us = to_micros(end_time) if end_time else None
+        if after is not None:
+            end_us = -after[0] if end_us is None else min(end_us, -after[0])
+
+        spans = await self._list_spans(device_id, metrics, start_us, end_us)
+        cold_spans = await self._list_cold_spans(device_id, metrics, start_us, end_us)
+        pending_spans = sorted(
+            {s for series in (*spans.values(), *cold_spans.values()) for s in series}
+        )
+
+        selected: list[tuple[tuple[int, str, int], SampleRow]] = []
+        while pending_spans and len(selected) <= limit:
+            span_start = pending_spans.pop()
+            requests = [
+                m
+                for m in metrics
+                if span_start in spans[m] or span_start in cold_spans[m]
+            ]
+            series = await self._load_series(
+                device_id, span_start, requests, spans, cold_spans, start_us, end_us
+            )
+
+            series_rows = [
+                self._ordered_rows(rows, series_metric, start_us, end_us, after)
+                for series_metric, rows in zip(requests, series)
+                if rows
+            ]
+
+            for item in heapq.merge(*series_rows, key=lambda item: item[0]):
+                selected.append(item)
+                if len(selected) > limit:
+                    break
+
+        page = selected[:limit]
+        points = [to_point(row, device_id, key[1]) for key, row in page]
+        next_cursor = None
+        if page and len(selected) > limit:
+            next_cursor = self._encode_cursor(page[-1][0])
+
+        return points, next_cursor
 
     async def query_points(
         self,
@@ -52,40 +551,152 @@ class TelemetryStore:
         end_time: Optional[datetime] = None,
         limit: int = 100,
     ) -> list[TelemetryPoint]:
+        points, _ = await self.query_page(
+            device_id, metric, start_time, end_time, limit
+        )
+        return points
+
+    async def query_rollups(
+        self,
+        device_id: str,
+        resolution: RollupResolution,
+        metric: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> list[TelemetryRollup]:
         await self.initialize()
 
-        if metric:
-            keys = [f"telemetry:{device_id}:{metric}"]
-        else:
-            pattern = f"telemetry:{device_id}:*"
-            keys = [k.decode() for k in await self.redis.keys(pattern)]
+        metrics = [metric] if metric else await self._list_metrics(device_id)
+        first = bucket_start(to_micros(start_time), resolution) if start_time else None
+        last = bucket_start(to_micros(end_time), resolution) if end_time else None
+        first_partition = (
+            partition_start(first, resolution) if first is not None else None
+        )
+        last_partition = partition_start(last, resolution) if last is not None else None
 
-        min_score = int(start_time.timestamp()) if start_time else "-inf"
-        max_score = int(end_time.timestamp()) if end_time else "+inf"
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for series_metric in metrics:
+                pipe.smembers(
+                    self._rollup_index_key(resolution, device_id, series_metric)
+                )
+            results = await pipe.execute()
 
-        points = []
-        for key in keys:
-            results = await self.redis.zrangebyscore(
-                key, min_score, max_score, start=0, num=limit
-            )
-            for result in results:
-                points.append(TelemetryPoint.model_validate_json(result))
+        partitions = {
+            series_metric: {
+                start
+                for start in map(int, raw)
+                if (first_partition is None or start >= first_partition)
+                and (last_partition is None or start <= last_partition)
+            }
+            for series_metric, raw in zip(metrics, results)
+        }
+        pending = sorted({s for starts in partitions.values() for s in starts})
+
+        selected: list[TelemetryRollup] = []
+        while pending and len(selected) < limit:
+            partition = pending.pop()
+            requests = [m for m in metrics if partition in partitions[m]]
+
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for series_metric in requests:
+                    pipe.hgetall(
+                        self._rollup_key(
+                            resolution, device_id, series_metric, partition
+                        )
+                    )
+                hashes = await pipe.execute()
+
+            rows = []
+            for series_metric, fields in zip(requests, hashes):
+                if not fields:
+                    await self.redis.srem(
+                        self._rollup_index_key(resolution, device_id, series_metric),
+                        partition,
+                    )
+                    continue
+                rows.extend(
+                    rollup
+                    for rollup in parse_partition(
+                        fields, device_id, series_metric, resolution
+                    )
+                    if (first is None or rollup.bucket_start.timestamp() >= first)
+                    and (last is None or rollup.bucket_start.timestamp() <= last)
+                )
 
-        return sorted(points, key=lambda p: p.timestamp, reverse=True)[:limit]
+            rows.sort(key=lambda r: (-r.bucket_start.timestamp(), r.metric))
+            selected.extend(rows)
+
+        return selected[:limit]
 
     async def get_latest(self, device_id: str, metric: str) -> Optional[TelemetryPoint]:
         await self.initialize()
-        key = f"telemetry:{device_id}:{metric}"
-        results = await self.redis.zrange(key, -1, -1)
-        if not results:
-            return None
-        return TelemetryPoint.model_validate_json(results[0])
+
+        cached = await self.redis.hget(self._latest_key(device_id), metric)
+        if cached:
+            entry = self._parse_latest(cached)
+            return TelemetryPoint.model_construct(
+                device_id=device_id,
+                timestamp=datetime.fromisoformat(entry["timestamp"]),
+                metric=metric,
+                value=entry["value"],
+                unit=entry["unit"],
+                metadata=entry["metadata"],
+            )
+
+        spans = await self._list_spans(device_id, [metric], None, None)
+        cold_spans = await self._list_cold_spans(device_id, [metric], None, None)
+
+        for span_start in sorted({*spans[metric], *cold_spans[metric]}, reverse=True):
+            (rows,) = await self._load_series(
+                device_id, span_start, [metric], spans, cold_spans
+            )
+            if rows:
+                return to_point(rows[-1], device_id, metric)
+
+        return None
+
+    async def get_latest_values(
+        self, device_ids: list[str], metrics: Optional[list[str]] = None
+    ) -> dict[str, dict[str, dict]]:
+        await self.initialize()
+        if not device_ids:
+            return {}
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for device_id in device_ids:
+                if metrics:
+                    pipe.hmget(self._latest_key(device_id), metrics)
+                else:
+                    pipe.hgetall(self._latest_key(device_id))
+            results = await pipe.execute()
+
+        latest = {}
+        for device_id, result in zip(device_ids, results):
+            if metrics:
+                entries = zip(metrics, result)
+            else:
+                entries = ((field.decode(), raw) for field, raw in result.items())
+            latest[device_id] = {
+                metric: self._parse_latest(raw) for metric, raw in entries if raw
+            }
+        return latest
 
     async def get_message_count(self, device_id: str) -> int:
         await self.initialize()
         count = await self.redis.get(f"telemetry:count:{device_id}")
         return int(count) if count else 0
 
+    async def get_total_message_count(self, device_ids: list[str]) -> int:
+        await self.initialize()
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for device_id in device_ids:
+                pipe.get(f"telemetry:count:{device_id}")
+            counts = await pipe.execute()
+
+        return sum(int(count) for count in counts if count)
+
 
 _store = TelemetryStore()
 
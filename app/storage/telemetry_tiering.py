@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from app.config.settings import get_settings
+from app.storage.telemetry_segments import get_segment_store
+from app.storage.telemetry_store import get_telemetry_store
+
+logger = logging.getLogger(__name__)
+
+
+class TelemetryTierCompactor:
+    def __init__(self):
+        self.settings = get_settings()
+        self.store = get_telemetry_store()
+        self.segments = get_segment_store()
+        self.running = False
+        self.compactor: Optional[asyncio.Task] = None
+        self.stopping: asyncio.Event = None
+
+        self.runs = 0
+        self.moved_chunks = 0
+        self.moved_points = 0
+        self.purged_segments = 0
+        self.last_run_ms = 0.0
+
+    async def start(self):
+        self.stopping = asyncio.Event()
+        self.running = True
+        self.compactor = asyncio.create_task(self._compact_loop())
+
+        logger.info(
+            "Telemetry cold tier compactor started "
+            f"(path={self.settings.telemetry_cold_tier_path}, "
+            f"age={self.settings.telemetry_cold_tier_age_seconds}s)"
+        )
+
+    async def stop(self):
+        self.running = False
+
+        if self.compactor:
+            self.stopping.set()
+            await asyncio.gather(self.compactor, return_exceptions=True)
+            self.compactor = None
+
+        logger.info("Telemetry cold tier compactor stopped")
+
+    async def run_once(self, now: Optional[float] = None) -> int:
+        now = now if now is not None else time.time()
+        started = time.monotonic()
+
+        moved_chunks, moved_points = await self.store.move_aged_chunks(
+            now - self.settings.telemetry_cold_tier_age_seconds
+        )
+        purged = await asyncio.to_thread(self.segments.purge_expired, now)
+
+        self.runs += 1
+        self.moved_chunks += moved_chunks
+        self.moved_points += moved_points
+        self.purged_segments += purged
+        self.last_run_ms = (time.monotonic() - started) * 1000
+
+        if moved_chunks:
+            logger.info(
+                f"Moved {moved_points} telemetry points in {moved_chunks} chunks "
+                "to the cold tier"
+            )
+
+        return moved_chunks
+
+    async def _compact_loop(self):
+        interval = self.settings.telemetry_cold_tier_interval_seconds
+
+        while self.running:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Cold tier compaction failed: {e}")
+
+            try:
+                await asyncio.wait_for(self.stopping.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "moved_chunks": self.moved_chunks,
+            "moved_points": self.moved_points,
+            "purged_segments": self.purged_segments,
+            "last_run_ms": round(self.last_run_ms, 2),
+        }
+
+
+_compactor = TelemetryTierCompactor()
+
+
+def get_tier_compactor() -> TelemetryTierCompactor:
+    return _compactor
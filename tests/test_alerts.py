@@ -2,7 +2,7 @@
 Alert rule and alert management tests.
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
 
@@ -126,3 +126,177 @@ def test_acknowledge_alert(client, device_id):
         ack_response = client.post(f"/alerts/{alert_id}/acknowledge")
         assert ack_response.status_code == 200
         assert ack_response.json()["status"] == "acknowledged"
+
+
+def test_group_rule_triggers_alert_for_member_device(client, unique_id):
+    """Group-level rules apply to devices registered in that group."""
+    group_id = f"group-{unique_id}"
+    device_id = client.post(
+        "/devices",
+        json={
+            "serial_number": f"SN-{unique_id}",
+            "device_type": "sensor",
+            "firmware_version": "1.0.0",
+            "group_id": group_id,
+        },
+        headers={"idempotency-key": f"reg-{unique_id}"},
+    ).json()["id"]
+
+    client.post(
+        "/alerts/rules",
+        json={
+            "group_id": group_id,
+            "metric": "humidity",
+            "operator": "lt",
+            "threshold": 10.0,
+            "severity": "warning",
+        },
+    )
+
+    client.post(
+        "/telemetry/point",
+        json={
+            "device_id": device_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "metric": "humidity",
+            "value": 5.0,
+        },
+    )
+
+    response = client.get(f"/alerts?device_id={device_id}")
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+
+def test_group_rule_stops_matching_after_group_is_cleared(client, unique_id):
+    """Clearing a device's group drops its cached membership for group rules."""
+    group_id = f"group-{unique_id}"
+    device_id = client.post(
+        "/devices",
+        json={
+            "serial_number": f"SN-{unique_id}",
+            "device_type": "sensor",
+            "firmware_version": "1.0.0",
+            "group_id": group_id,
+        },
+        headers={"idempotency-key": f"reg-{unique_id}"},
+    ).json()["id"]
+
+    client.post(
+        "/alerts/rules",
+        json={
+            "group_id": group_id,
+            "metric": "humidity",
+            "operator": "lt",
+            "threshold": 10.0,
+            "severity": "warning",
+        },
+    )
+
+    def send(value):
+        client.post(
+            "/telemetry/point",
+            json={
+                "device_id": device_id,
+                "timestamp": datetime.utcnow().isoformat(),
+                "metric": "humidity",
+                "value": value,
+            },
+        )
+
+    send(5.0)
+    assert len(client.get(f"/alerts?device_id={device_id}").json()) == 1
+
+    response = client.patch(f"/devices/{device_id}", json={"group_id": None})
+    assert response.status_code == 200
+    assert response.json()["group_id"] is None
+    assert device_id not in {
+        device["id"] for device in client.get(f"/devices?group_id={group_id}").json()
+    }
+
+    send(4.0)
+    assert len(client.get(f"/alerts?device_id={device_id}").json()) == 1
+
+
+def test_windowed_average_rule_fires_once_per_breach(client, device_id):
+    """Windowed average rules fire when the rolling mean crosses the threshold."""
+    client.post(
+        "/alerts/rules",
+        json={
+            "device_id": device_id,
+            "metric": "temperature",
+            "operator": "gt",
+            "threshold": 50.0,
+            "severity": "warning",
+            "aggregate": "avg",
+            "window_seconds": 300,
+        },
+    )
+
+    now = datetime.utcnow()
+    client.post(
+        "/telemetry/batch",
+        json={
+            "device_id": device_id,
+            "points": [
+                {
+                    "device_id": device_id,
+                    "timestamp": (now + timedelta(seconds=i)).isoformat(),
+                    "metric": "temperature",
+                    "value": value,
+                }
+                for i, value in enumerate([40.0, 45.0, 70.0, 80.0])
+            ],
+        },
+    )
+
+    alerts = client.get(f"/alerts?device_id={device_id}").json()
+    assert len(alerts) == 1
+    assert alerts[0]["value"] == pytest.approx(155.0 / 3)
+    assert alerts[0]["message"] == "avg(temperature, 300s) gt 50.0"
+
+
+def test_windowed_count_rule_keeps_state_between_batches(client, device_id):
+    """Count rules accumulate matching points across requests in Redis."""
+    response = client.post(
+        "/alerts/rules",
+        json={
+            "device_id": device_id,
+            "metric": "pressure",
+            "operator": "gt",
+            "threshold": 100.0,
+            "severity": "critical",
+            "aggregate": "count",
+        },
+    )
+    assert response.status_code == 400
+
+    client.post(
+        "/alerts/rules",
+        json={
+            "device_id": device_id,
+            "metric": "pressure",
+            "operator": "gt",
+            "threshold": 100.0,
+            "severity": "critical",
+            "aggregate": "count",
+            "window_seconds": 60,
+            "min_count": 3,
+        },
+    )
+
+    now = datetime.utcnow()
+    for i, value in enumerate([120.0, 90.0, 130.0, 140.0]):
+        client.post(
+            "/telemetry/point",
+            json={
+                "device_id": device_id,
+                "timestamp": (now + timedelta(seconds=i)).isoformat(),
+                "metric": "pressure",
+                "value": value,
+            },
+        )
+        alerts = client.get(f"/alerts?device_id={device_id}").json()
+        assert len(alerts) == (1 if i == 3 else 0)
+
+    assert alerts[0]["value"] == 3
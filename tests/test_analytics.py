@@ -60,3 +60,64 @@ def test_get_group_analytics(client, device_id, unique_id):
     data = response.json()
     assert data["group_id"] == group_id
     assert data["device_count"] >= 1
+
+
+def test_analytics_report_message_throughput(client, device_id, unique_id):
+    """Fleet and group analytics report totals and a non-zero message rate."""
+    client.post(
+        "/telemetry/batch",
+        json={
+            "device_id": device_id,
+            "points": [
+                {
+                    "device_id": device_id,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "metric": "temperature",
+                    "value": 20.0 + i,
+                }
+                for i in range(5)
+            ],
+        },
+    )
+
+    fleet = client.get("/analytics/fleet").json()
+    assert fleet["total_messages"] >= 5
+    assert fleet["messages_per_second"] > 0
+
+    group = client.get(f"/analytics/groups/group-{unique_id}").json()
+    assert group["total_messages"] == 5
+    assert group["messages_per_second"] > 0
+
+    device = client.get(f"/analytics/devices/{device_id}").json()
+    assert device["message_count"] == 5
+    assert device["messages_per_second"] > 0
+
+
+def test_group_totals_follow_current_members(client, device_id, unique_id):
+    """Group totals sum the current members' message counts."""
+    client.post(
+        "/telemetry/batch",
+        json={
+            "device_id": device_id,
+            "points": [
+                {
+                    "device_id": device_id,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "metric": "temperature",
+                    "value": 20.0 + i,
+                }
+                for i in range(3)
+            ],
+        },
+    )
+
+    response = client.patch(
+        f"/devices/{device_id}", json={"group_id": f"moved-{unique_id}"}
+    )
+    assert response.status_code == 200
+
+    old_group = client.get(f"/analytics/groups/group-{unique_id}").json()
+    assert old_group["total_messages"] == 0
+
+    new_group = client.get(f"/analytics/groups/moved-{unique_id}").json()
+    assert new_group["total_messages"] == 3
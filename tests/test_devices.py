@@ -107,3 +107,38 @@ def test_list_devices(client, unique_id):
     response = client.get("/devices")
     assert response.status_code == 200
     assert len(response.json()) >= 3
+
+
+def test_telemetry_marks_device_active_with_last_seen(client, unique_id):
+    """Ingest records last_seen and status without rewriting the device."""
+    from datetime import datetime
+
+    device_id = client.post(
+        "/devices",
+        json={
+            "serial_number": f"SN-{unique_id}",
+            "device_type": "sensor",
+            "firmware_version": "1.0.0",
+            "group_id": f"group-{unique_id}",
+        },
+        headers={"idempotency-key": f"reg-{unique_id}"},
+    ).json()["id"]
+
+    client.patch(f"/devices/{device_id}", json={"status": "maintenance"})
+    client.post(
+        "/telemetry/point",
+        json={
+            "device_id": device_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "metric": "temperature",
+            "value": 21.0,
+        },
+    )
+
+    device = client.get(f"/devices/{device_id}").json()
+    assert device["status"] == "active"
+    assert device["last_seen"] is not None
+
+    listed = client.get(f"/devices?group_id=group-{unique_id}").json()
+    assert listed[0]["status"] == "active"
+    assert listed[0]["last_seen"] == device["last_seen"]
@@ -2,6 +2,7 @@
 End-to-end integration tests.
 """
 
+import json
 import time
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
@@ -158,3 +159,487 @@ def test_high_volume_telemetry_with_rate_limiting(client, unique_id):
     assert success_count <= 105, (
         f"Rate limit should prevent excessive requests (got {success_count})"
     )
+
+
+def test_batches_are_charged_per_point(client, unique_id, monkeypatch):
+    """Device rate limits charge each batch by its point count in one key."""
+    from app.config.settings import get_settings
+    from app.core.scripts import get_script_registry
+
+    monkeypatch.setattr(get_settings(), "rate_limit_telemetry_points_per_device", 10)
+
+    device_id = client.post(
+        "/devices",
+        json={
+            "serial_number": f"SN-{unique_id}",
+            "device_type": "sensor",
+            "firmware_version": "1.0.0",
+        },
+        headers={"idempotency-key": f"reg-{unique_id}"},
+    ).json()["id"]
+
+    def batch(size):
+        return client.post(
+            "/telemetry/batch",
+            json={
+                "device_id": device_id,
+                "points": [
+                    {
+                        "device_id": device_id,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "metric": "temperature",
+                        "value": 25.0,
+                    }
+                    for _ in range(size)
+                ],
+            },
+        )
+
+    assert batch(8).status_code == 202
+    assert batch(5).status_code == 429
+    assert batch(2).status_code == 202
+    assert batch(11).status_code == 413
+
+    redis = get_script_registry().redis
+    key = f"ratelimit:gcra:device_points:{device_id}"
+    assert client.portal.call(redis.type, key) == b"string"
+
+
+def test_full_size_batches_are_admitted_at_default_limits(client, unique_id):
+    """Batches up to the maximum batch size fit the default device burst."""
+    from app.config.settings import get_settings
+
+    max_size = get_settings().telemetry_batch_max_size
+    device_id = client.post(
+        "/devices",
+        json={
+            "serial_number": f"SN-{unique_id}",
+            "device_type": "sensor",
+            "firmware_version": "1.0.0",
+        },
+        headers={"idempotency-key": f"reg-{unique_id}"},
+    ).json()["id"]
+
+    def point():
+        return {
+            "device_id": device_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "metric": "temperature",
+            "value": 25.0,
+        }
+
+    response = client.post(
+        "/telemetry/batch",
+        json={"device_id": device_id, "points": [point() for _ in range(max_size)]},
+    )
+    assert response.status_code == 202
+    assert response.json()["count"] == max_size
+
+    response = client.post(
+        "/telemetry/bulk",
+        content="\n".join(json.dumps(point()) for _ in range(200)),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert response.status_code == 202
+    assert response.json()["accepted"] == 200
+    assert response.json()["rejected"] == 0
+
+
+def test_global_rate_limit_spends_leased_tokens_locally(client, unique_id):
+    """Global admission leases token blocks instead of calling Redis per request."""
+    client.get(f"/telemetry/{unique_id}")
+    before = client.get("/health").json()["global_rate_limit"]
+
+    for _ in range(20):
+        assert client.get(f"/telemetry/{unique_id}").status_code == 200
+
+    after = client.get("/health").json()["global_rate_limit"]
+    assert after["local_grants"] - before["local_grants"] == 20
+    assert after["leases"] - before["leases"] <= 1
+    assert after["leased_tokens"] <= after["lease_size"] * after["leases"]
+
+
+def test_scripts_recover_after_script_cache_flush(client, unique_id):
+    """Scripts run by SHA and are reloaded when Redis reports NOSCRIPT."""
+    from app.core.scripts import get_script_registry
+
+    registry = get_script_registry()
+    device_id = client.post(
+        "/devices",
+        json={
+            "serial_number": f"SN-{unique_id}",
+            "device_type": "sensor",
+            "firmware_version": "1.0.0",
+        },
+        headers={"idempotency-key": f"reg-{unique_id}"},
+    ).json()["id"]
+
+    reloads = client.get("/health").json()["scripts"]["reloads"]
+    client.portal.call(registry.redis.script_flush)
+
+    response = client.post(
+        "/telemetry/batch",
+        json={
+            "device_id": device_id,
+            "points": [
+                {
+                    "device_id": device_id,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "metric": "temperature",
+                    "value": 21.5,
+                }
+            ],
+        },
+    )
+    assert response.status_code == 202
+
+    latest = client.get(f"/telemetry/{device_id}/temperature/latest")
+    assert latest.json()["value"] == 21.5
+    assert client.get("/health").json()["scripts"]["reloads"] > reloads
+
+
+def test_combined_admission_enforces_group_limit(client, unique_id, monkeypatch):
+    """One admission script charges global, device and group limits together."""
+    from app.config.settings import get_settings
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "rate_limit_global_lease_size", 0)
+    monkeypatch.setattr(settings, "rate_limit_telemetry_per_group", 10)
+
+    group_id = f"group-{unique_id}"
+    device_ids = [
+        client.post(
+            "/devices",
+            json={
+                "serial_number": f"SN-{unique_id}-{n}",
+                "device_type": "sensor",
+                "firmware_version": "1.0.0",
+                "group_id": group_id,
+            },
+            headers={"idempotency-key": f"reg-{unique_id}-{n}"},
+        ).json()["id"]
+        for n in range(2)
+    ]
+
+    def batch(device_id, size):
+        return client.post(
+            "/telemetry/batch",
+            json={
+                "device_id": device_id,
+                "points": [
+                    {
+                        "device_id": device_id,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "metric": "temperature",
+                        "value": 25.0,
+                    }
+                    for _ in range(size)
+                ],
+            },
+        )
+
+    assert batch(device_ids[0], 6).status_code == 202
+    assert batch(device_ids[1], 6).status_code == 429
+    assert batch(device_ids[1], 4).status_code == 202
+
+
+def test_event_writes_are_batched_and_flushed_on_shutdown(unique_id, monkeypatch):
+    """Durable publishes wait for the write; the buffered tail is flushed on stop."""
+    from fastapi.testclient import TestClient
+
+    from app.config.settings import get_settings
+    from app.core.event_bus import get_event_bus
+    from app.main import app
+    from app.storage.event_store import get_event_store
+
+    monkeypatch.setattr(get_settings(), "event_store_linger_ms", 60000)
+    topic = f"test.{unique_id}"
+    event_bus = get_event_bus()
+    event_store = get_event_store()
+
+    with TestClient(app) as client:
+        client.portal.call(event_bus.publish, topic, "durable", {"n": 1}, True)
+        events = client.portal.call(event_store.get_events, topic)
+        assert [e["type"] for e in events] == ["durable"]
+
+        client.portal.call(event_bus.publish, topic, "buffered", {"n": 2})
+        assert len(client.portal.call(event_store.get_events, topic)) == 1
+        assert client.get("/health").json()["event_writes"]["buffered_events"] == 1
+
+    with TestClient(app) as client:
+        events = client.portal.call(event_store.get_events, topic)
+        assert [e["type"] for e in events] == ["durable", "buffered"]
+
+
+def test_event_store_pages_by_cursor_and_replays_to_groups(client, unique_id):
+    """Stream-backed events page by exact ID and replay through consumer groups."""
+    from app.storage.event_store import get_event_store
+
+    topic = f"test.{unique_id}"
+    store = get_event_store()
+    for n in range(5):
+        client.portal.call(store.append_event, topic, "tick", {"n": n})
+
+    first = client.portal.call(store.get_events, topic, None, 3)
+    rest = client.portal.call(store.get_events, topic, None, 3, first[-1]["id"])
+    assert [e["payload"]["n"] for e in first + rest] == [0, 1, 2, 3, 4]
+
+    client.portal.call(store.create_consumer_group, topic, "replay")
+    batch = client.portal.call(store.read_group, topic, "replay", "worker-1", 2)
+    assert [e["payload"]["n"] for e in batch] == [0, 1]
+    assert client.portal.call(store.ack, topic, "replay", [batch[0]["id"]]) == 1
+
+    pending = client.portal.call(
+        store.read_group, topic, "replay", "worker-1", 10, None, True
+    )
+    assert [e["payload"]["n"] for e in pending] == [1]
+
+
+def test_event_bus_orders_by_key_and_offloads_sync_handlers(client, unique_id):
+    """Events for one key stay ordered; sync handlers run off the event loop."""
+    import threading
+
+    from app.core.event_bus import get_event_bus
+
+    topic = f"test.{unique_id}"
+    event_bus = get_event_bus()
+    seen = []
+    threads = set()
+    done = threading.Event()
+
+    def record(event):
+        time.sleep(0.001)
+        threads.add(threading.current_thread().name)
+        seen.append((event["payload"]["device_id"], event["payload"]["n"]))
+        if len(seen) == 40:
+            done.set()
+
+    event_bus.subscribe(topic, record)
+    for n in range(20):
+        for device_id in ("a", "b"):
+            client.portal.call(
+                event_bus.publish, topic, "tick", {"device_id": device_id, "n": n}
+            )
+
+    assert done.wait(5)
+    for device_id in ("a", "b"):
+        assert [n for d, n in seen if d == device_id] == list(range(20))
+    assert all(name.startswith("event-handler") for name in threads)
+
+
+def test_event_bus_sheds_low_priority_topics_first(unique_id, monkeypatch):
+    """Firehose topics are sampled under load while high-priority events wait."""
+    import threading
+
+    from fastapi.testclient import TestClient
+
+    from app.config.settings import get_settings
+    from app.core.event_bus import get_event_bus
+    from app.main import app
+
+    settings = get_settings()
+    firehose, critical, gate = (f"{unique_id}.{n}" for n in ("fire", "crit", "gate"))
+    monkeypatch.setattr(settings, "event_bus_worker_count", 1)
+    monkeypatch.setattr(settings, "event_bus_low_priority_queue_max_size", 10)
+    monkeypatch.setattr(
+        settings, "event_bus_topic_priorities", {firehose: "low", critical: "high"}
+    )
+    monkeypatch.setattr(
+        settings, "event_bus_topic_overflow", {firehose: "sample", critical: "block"}
+    )
+
+    event_bus = get_event_bus()
+    release = threading.Event()
+    handled = []
+    event_bus.subscribe(gate, lambda event: release.wait(5))
+    event_bus.subscribe(firehose, lambda event: handled.append(event["topic"]))
+    event_bus.subscribe(critical, lambda event: handled.append(event["topic"]))
+
+    with TestClient(app) as client:
+        client.portal.call(event_bus.publish, gate, "hold", {})
+        time.sleep(0.1)
+        for n in range(30):
+            client.portal.call(event_bus.publish, firehose, "tick", {"n": n})
+        for n in range(3):
+            client.portal.call(event_bus.publish, critical, "alert", {"n": n})
+        release.set()
+
+        for _ in range(100):
+            if len(handled) == 10:
+                break
+            time.sleep(0.02)
+
+        assert handled[:3] == [critical] * 3
+        assert handled[3:] == [firehose] * 7
+        stats = client.get("/health").json()["event_bus"]
+        assert stats["dropped"][firehose] == 23
+        assert critical not in stats["dropped"]
+
+
+def test_event_bus_transport_fans_out_across_processes(unique_id, monkeypatch):
+    """Remote events reach broadcast subscribers and competing groups via Redis."""
+    from fastapi.testclient import TestClient
+
+    from app.config.settings import get_settings
+    from app.core.event_bus import DeliveryMode, get_event_bus
+    from app.main import app
+    from app.storage.event_store import get_event_store
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "event_bus_transport_enabled", True)
+    monkeypatch.setattr(settings, "event_bus_transport_block_ms", 50)
+
+    broadcast, competing = f"{unique_id}.broadcast", f"{unique_id}.competing"
+    event_bus = get_event_bus()
+    store = get_event_store()
+    seen = []
+
+    async def record(event):
+        seen.append((event["topic"], event["payload"]["n"]))
+
+    def wait_for(count):
+        for _ in range(100):
+            if len(seen) >= count:
+                return
+            time.sleep(0.02)
+
+    event_bus.subscribe(broadcast, record)
+    event_bus.subscribe(competing, record, DeliveryMode.COMPETING, "billing")
+
+    with TestClient(app) as client:
+        time.sleep(0.3)
+        client.portal.call(store.append_event, broadcast, "remote", {"n": 1})
+        client.portal.call(event_bus.publish, broadcast, "local", {"n": 2}, True)
+        for n in range(3):
+            client.portal.call(store.append_event, competing, "job", {"n": n})
+
+        wait_for(5)
+        time.sleep(0.1)
+        assert sorted(seen) == [(broadcast, 1), (broadcast, 2)] + [
+            (competing, n) for n in range(3)
+        ]
+
+        pending = client.portal.call(
+            store.redis.xpending, f"events:stream:{competing}", "billing"
+        )
+        assert pending["pending"] == 0
+        stats = client.get("/health").json()["event_bus"]["transport"]
+        assert stats["groups"] == ["billing"]
+
+
+def test_event_bus_transport_reclaims_crashed_consumer_entries(unique_id, monkeypatch):
+    """Idle entries left pending by a dead consumer are reclaimed page by page."""
+    from fastapi.testclient import TestClient
+
+    from app.config.settings import get_settings
+    from app.core.event_bus import DeliveryMode, get_event_bus
+    from app.main import app
+    from app.storage.event_store import get_event_store
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "event_bus_transport_enabled", True)
+    monkeypatch.setattr(settings, "event_bus_transport_block_ms", 50)
+    monkeypatch.setattr(settings, "event_bus_transport_read_count", 2)
+    monkeypatch.setattr(settings, "event_bus_transport_claim_idle_ms", 0)
+    monkeypatch.setattr(settings, "event_bus_transport_claim_interval_ms", 50)
+
+    topic = f"{unique_id}.jobs"
+    group = f"workers-{unique_id}"
+    store = get_event_store()
+    seen = []
+
+    async def record(event):
+        seen.append(event["payload"]["n"])
+
+    async def crash_consumer():
+        await store.create_consumer_group(topic, group)
+        for n in range(5):
+            await store.append_event(topic, "job", {"n": n})
+        return await store.read_group(topic, group, "crashed-worker", 10)
+
+    with TestClient(app) as client:
+        assert len(client.portal.call(crash_consumer)) == 5
+        get_event_bus().subscribe(topic, record, DeliveryMode.COMPETING, group)
+
+        for _ in range(100):
+            if len(seen) >= 5:
+                break
+            time.sleep(0.02)
+        time.sleep(0.1)
+        assert sorted(set(seen)) == list(range(5))
+
+        pending = client.portal.call(
+            store.redis.xpending, f"events:stream:{topic}", group
+        )
+        assert pending["pending"] == 0
+        assert client.get("/health").json()["event_bus"]["transport"]["claimed"] >= 5
+
+
+def test_low_priority_backlog_does_not_trigger_backpressure(client, unique_id):
+    """Sheddable low-priority events are left out of the backpressure signal."""
+    from app.config.settings import get_settings
+    from app.core.event_bus import EventPriority, get_event_bus
+
+    event_bus = get_event_bus()
+    threshold = get_settings().backpressure_reject_threshold
+    backlog = [
+        {"topic": f"{unique_id}.low", "type": "noise", "payload": {}}
+        for _ in range(threshold // len(event_bus.lanes) + 1)
+    ]
+
+    for lane in event_bus.lanes:
+        lane.queues[EventPriority.LOW].extend(backlog)
+    try:
+        assert event_bus.get_queue_size() < threshold
+        assert client.get(f"/telemetry/{unique_id}").status_code == 200
+
+        event_bus.lanes[0].queues[EventPriority.NORMAL].extend(backlog * 4)
+        assert client.get(f"/telemetry/{unique_id}").status_code == 503
+    finally:
+        for lane in event_bus.lanes:
+            lane.queues[EventPriority.LOW].clear()
+            lane.queues[EventPriority.NORMAL].clear()
+
+
+def test_blocking_topics_wait_for_capacity(unique_id, monkeypatch):
+    """Publishing to a full blocking lane waits for room instead of dropping."""
+    import threading
+
+    from fastapi.testclient import TestClient
+
+    from app.config.settings import get_settings
+    from app.core.event_bus import get_event_bus
+    from app.main import app
+
+    settings = get_settings()
+    critical, gate = f"{unique_id}.crit", f"{unique_id}.gate"
+    monkeypatch.setattr(settings, "event_bus_worker_count", 1)
+    monkeypatch.setattr(settings, "event_bus_high_priority_queue_max_size", 1)
+    monkeypatch.setattr(settings, "event_bus_topic_priorities", {critical: "high"})
+    monkeypatch.setattr(settings, "event_bus_topic_overflow", {critical: "block"})
+
+    event_bus = get_event_bus()
+    release = threading.Event()
+    received = []
+    event_bus.subscribe(gate, lambda event: release.wait(5))
+    event_bus.subscribe(critical, lambda event: received.append(event))
+
+    with TestClient(app) as client:
+        client.portal.call(event_bus.publish, gate, "hold", {})
+        time.sleep(0.1)
+        try:
+            assert client.portal.call(event_bus.publish, critical, "alert", {})
+            threading.Timer(0.2, release.set).start()
+            started = time.monotonic()
+            assert client.portal.call(event_bus.publish, critical, "alert", {})
+            assert time.monotonic() - started >= 0.15
+        finally:
+            release.set()
+
+        deadline = time.monotonic() + 2
+        while len(received) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(received) == 2
+
+        stats = client.get("/health").json()["event_bus"]
+        assert critical not in stats["dropped"]
@@ -2,7 +2,7 @@
 Telemetry ingestion and query tests.
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
 
@@ -96,3 +96,1009 @@ def test_get_latest_telemetry(client, device_id):
     response = client.get(f"/telemetry/{device_id}/temperature/latest")
     assert response.status_code == 200
     assert response.json()["metric"] == "temperature"
+
+
+def test_query_telemetry_round_trips_stored_points(client, device_id):
+    """Stored points decode back with their original values, units and metadata."""
+    points = [
+        {
+            "device_id": device_id,
+            "timestamp": f"2026-01-01T00:00:{second:02d}.250000",
+            "metric": "temperature",
+            "value": value,
+            "unit": "celsius",
+        }
+        for second, value in enumerate([21.5, 21.5, 21.75, 22.0, -3.125])
+    ]
+    points.append(
+        {
+            "device_id": device_id,
+            "timestamp": "2026-01-01T00:00:10",
+            "metric": "temperature",
+            "value": "sensor-fault",
+            "metadata": {"code": 7},
+        }
+    )
+    client.post(
+        "/telemetry/batch",
+        json={"device_id": device_id, "points": points},
+    )
+
+    response = client.get(f"/telemetry/{device_id}?metric=temperature")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert [p["value"] for p in data] == [
+        "sensor-fault",
+        -3.125,
+        22.0,
+        21.75,
+        21.5,
+        21.5,
+    ]
+    assert data[0]["metadata"] == {"code": 7}
+    assert data[0]["unit"] == ""
+    assert data[1]["unit"] == "celsius"
+    assert data[1]["timestamp"] == "2026-01-01T00:00:04.250000"
+
+
+def test_write_behind_batches_are_flushed(unique_id, monkeypatch):
+    """Write-behind ingestion acknowledges first and persists on flush."""
+    from fastapi.testclient import TestClient
+
+    from app.config.settings import get_settings
+    from app.main import app
+
+    device_id = f"device-{unique_id}"
+    settings = get_settings()
+    monkeypatch.setattr(settings, "telemetry_write_behind_enabled", True)
+    monkeypatch.setattr(settings, "telemetry_write_behind_linger_ms", 20)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/telemetry/batch",
+            json={
+                "device_id": device_id,
+                "points": [
+                    {
+                        "device_id": device_id,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "metric": "pressure",
+                        "value": 1000.0 + i,
+                    }
+                    for i in range(20)
+                ],
+            },
+        )
+        assert response.status_code == 202
+        assert "write_behind" in client.get("/health").json()
+
+    with TestClient(app) as client:
+        response = client.get(f"/telemetry/{device_id}?metric=pressure")
+        assert len(response.json()) == 20
+
+
+def test_write_behind_dead_letters_failing_flushes(unique_id, monkeypatch):
+    """Failed flushes are retried a bounded number of times, never re-applied."""
+    from fastapi.testclient import TestClient
+    from redis.exceptions import ConnectionError, ResponseError
+
+    from app.config.settings import get_settings
+    from app.main import app
+    from app.models.telemetry import TelemetryPoint
+    from app.storage.telemetry_buffer import get_telemetry_buffer
+    from app.storage.telemetry_store import get_telemetry_store
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "telemetry_write_behind_enabled", True)
+    monkeypatch.setattr(settings, "telemetry_write_behind_linger_ms", 60000)
+    monkeypatch.setattr(settings, "telemetry_write_behind_max_retries", 2)
+
+    store = get_telemetry_store()
+    save_batch = store.save_batch
+    failures = {"poison": ResponseError("ERR value is not a valid float")}
+    calls = []
+
+    async def flaky_save_batch(points):
+        device_id = points[0].device_id
+        calls.append(device_id)
+        if device_id in failures:
+            raise failures[device_id]
+        await save_batch(points)
+
+    monkeypatch.setattr(store, "save_batch", flaky_save_batch)
+
+    def points(device_id):
+        return [
+            TelemetryPoint(
+                device_id=device_id,
+                timestamp=datetime.utcnow(),
+                metric="flow",
+                value=1.0,
+            )
+        ]
+
+    with TestClient(app) as client:
+        buffer = get_telemetry_buffer()
+        dead_lettered = buffer.dead_lettered_points
+
+        client.portal.call(buffer.add, points("poison"))
+        assert client.portal.call(buffer.flush) == 0
+        assert calls == ["poison"]
+        assert buffer.dead_lettered_points == dead_lettered + 1
+
+        failures["offline"] = ConnectionError("connection refused")
+        client.portal.call(buffer.add, points("offline"))
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                client.portal.call(buffer.flush)
+        assert calls.count("offline") == 2
+        assert buffer.get_buffered_count() == 0
+        assert buffer.dead_lettered_points == dead_lettered + 2
+
+        device_id = f"device-{unique_id}"
+        client.portal.call(buffer.add, points(device_id))
+        assert client.portal.call(buffer.flush) == 1
+        assert len(client.get(f"/telemetry/{device_id}?metric=flow").json()) == 1
+
+
+def test_bulk_ndjson_ingestion_mixes_devices(client, device_id, unique_id):
+    """Bulk NDJSON ingestion groups points per device and reports counts."""
+    import json
+
+    other_device = f"gateway-child-{unique_id}"
+    lines = [
+        json.dumps(
+            {
+                "device_id": did,
+                "timestamp": datetime.utcnow().isoformat(),
+                "metric": "temperature",
+                "value": 20.0 + i,
+            }
+        )
+        for i, did in enumerate([device_id, other_device, device_id])
+    ]
+    lines.append("{not json")
+
+    response = client.post(
+        "/telemetry/bulk",
+        content="\n".join(lines) + "\n",
+        headers={"content-type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 202
+    data = response.json()
+    assert data["accepted"] == 3
+    assert data["invalid"] == 1
+    assert data["devices"][device_id] == {"accepted": 2, "rejected": 0}
+    assert data["devices"][other_device] == {"accepted": 1, "rejected": 0}
+
+    stored = client.get(f"/telemetry/{device_id}?metric=temperature").json()
+    assert len(stored) == 2
+
+
+def test_bulk_ndjson_counts_oversized_lines_as_invalid(client, device_id):
+    """An oversized NDJSON line is skipped and counted while the rest is stored."""
+    import json
+
+    def line(value):
+        return json.dumps(
+            {
+                "device_id": device_id,
+                "timestamp": datetime.utcnow().isoformat(),
+                "metric": "humidity",
+                "value": value,
+            }
+        ).encode()
+
+    response = client.post(
+        "/telemetry/bulk",
+        content=line(1.0) + b"\n" + line(2.0) + b"\n" + b"x" * 70000,
+        headers={"content-type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 202
+    assert response.json()["accepted"] == 2
+    assert response.json()["invalid"] == 1
+
+    stored = client.get(f"/telemetry/{device_id}?metric=humidity").json()
+    assert sorted(point["value"] for point in stored) == [1.0, 2.0]
+
+
+def test_ingest_msgpack_batch(client, device_id):
+    """MessagePack batches, including compact array points, are accepted."""
+    from datetime import timezone
+
+    import msgpack
+
+    now = datetime.now(timezone.utc)
+    body = msgpack.packb(
+        {
+            "device_id": device_id,
+            "points": [
+                [now, "voltage", 3.3, "V"],
+                {"timestamp": now, "metric": "voltage", "value": 3.1},
+            ],
+        },
+        datetime=True,
+    )
+
+    response = client.post(
+        "/telemetry/batch",
+        content=body,
+        headers={"content-type": "application/msgpack"},
+    )
+    assert response.status_code == 202
+    assert response.json()["count"] == 2
+
+    stored = client.get(f"/telemetry/{device_id}?metric=voltage").json()
+    assert sorted(p["value"] for p in stored) == [3.1, 3.3]
+    assert {p["unit"] for p in stored} == {"V", ""}
+
+
+def test_msgpack_compact_points_reject_extra_fields(client, device_id):
+    """Compact array points with too many fields are rejected, not truncated."""
+    from datetime import timezone
+
+    import msgpack
+
+    now = datetime.now(timezone.utc)
+    body = msgpack.packb(
+        {
+            "device_id": device_id,
+            "points": [
+                [now, "voltage", 3.3, "V"],
+                [now, "voltage", 3.3, "V", {}, "extra"],
+            ],
+        },
+        datetime=True,
+    )
+
+    response = client.post(
+        "/telemetry/batch",
+        content=body,
+        headers={"content-type": "application/msgpack"},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["points", 1]
+
+
+def test_corrupt_msgpack_body_is_a_validation_error(client, device_id):
+    """Undecodable msgpack bodies are rejected with 422, like malformed JSON."""
+    import msgpack
+
+    body = msgpack.packb({"device_id": device_id, "points": []})
+
+    for corrupt in (body[:-3], body + b"\xc1", b"\xc1"):
+        response = client.post(
+            "/telemetry/batch",
+            content=corrupt,
+            headers={"content-type": "application/msgpack"},
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["type"] == "msgpack_invalid"
+
+    response = client.post(
+        "/telemetry/point",
+        content=b"\x92\xc1",
+        headers={"content-type": "application/msgpack"},
+    )
+    assert response.status_code == 422
+
+
+def test_payload_benchmark_formats_decode_identically():
+    """The payload benchmark's formats decode to the same full-size batch."""
+    from app.config.settings import get_settings
+    from app.core.payloads import decode_batch
+    from app.payload_benchmark import build_bodies
+
+    size = get_settings().telemetry_batch_max_size
+    batches = [
+        decode_batch(body, content_type)
+        for content_type, body in build_bodies(size).values()
+    ]
+
+    assert len(batches[0].points) == size
+    assert all(batch == batches[0] for batch in batches[1:])
+
+
+def test_ingest_request_bodies_are_documented(client):
+    """Point and batch ingest endpoints publish their request body schemas."""
+    paths = client.get("/openapi.json").json()["paths"]
+
+    for path, field in (("/telemetry/point", "metric"), ("/telemetry/batch", "points")):
+        content = paths[path]["post"]["requestBody"]["content"]
+        assert {"application/json", "application/msgpack"} <= set(content)
+        assert field in content["application/json"]["schema"]["properties"]
+
+
+def test_ingest_unsupported_content_type(client, device_id):
+    """Unknown payload encodings are rejected with 415."""
+    response = client.post(
+        "/telemetry/point",
+        content=b"<point/>",
+        headers={"content-type": "application/xml"},
+    )
+    assert response.status_code == 415
+
+
+def test_query_all_metrics_newest_first_with_limit(client, device_id):
+    """Queries without a metric merge every series newest-first up to limit."""
+    points = [
+        {
+            "device_id": device_id,
+            "timestamp": f"2026-01-01T00:{minute:02d}:00",
+            "metric": metric,
+            "value": float(minute),
+        }
+        for minute, metric in enumerate(["temperature", "humidity"] * 5)
+    ]
+    client.post("/telemetry/batch", json={"device_id": device_id, "points": points})
+
+    response = client.get(f"/telemetry/{device_id}?limit=3")
+    assert [p["value"] for p in response.json()] == [9.0, 8.0, 7.0]
+    assert [p["metric"] for p in response.json()] == [
+        "humidity",
+        "temperature",
+        "humidity",
+    ]
+
+    response = client.get(
+        f"/telemetry/{device_id}"
+        "?start_time=2026-01-01T00:02:00&end_time=2026-01-01T00:04:00"
+    )
+    assert [p["value"] for p in response.json()] == [4.0, 3.0, 2.0]
+
+
+def test_query_telemetry_cursor_pagination(client, device_id):
+    """Pages chained through X-Next-Cursor cover every point exactly once."""
+    points = [
+        {
+            "device_id": device_id,
+            "timestamp": f"2026-01-01T00:00:{second // 2:02d}",
+            "metric": "temperature" if second % 2 else "humidity",
+            "value": float(second),
+        }
+        for second in range(11)
+    ]
+    client.post("/telemetry/batch", json={"device_id": device_id, "points": points})
+
+    seen = []
+    cursor = None
+    while True:
+        url = f"/telemetry/{device_id}?limit=4"
+        if cursor:
+            url += f"&cursor={cursor}"
+        response = client.get(url)
+        assert response.status_code == 200
+        seen.extend(p["value"] for p in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == 11
+    assert sorted(seen) == [float(i) for i in range(11)]
+
+
+def test_query_telemetry_ndjson_stream(client, device_id):
+    """NDJSON mode streams the whole range one JSON point per line."""
+    import json
+
+    points = [
+        {
+            "device_id": device_id,
+            "timestamp": f"2026-01-01T00:{minute:02d}:00",
+            "metric": "temperature",
+            "value": float(minute),
+        }
+        for minute in range(30)
+    ]
+    client.post("/telemetry/batch", json={"device_id": device_id, "points": points})
+
+    response = client.get(f"/telemetry/{device_id}?format=ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [p["value"] for p in lines] == [float(m) for m in reversed(range(30))]
+
+
+def test_query_telemetry_rollups(client, device_id):
+    """Rollup buckets aggregate raw points and are served by resolution."""
+    points = [
+        {
+            "device_id": device_id,
+            "timestamp": f"2026-01-01T00:{minute:02d}:{second:02d}",
+            "metric": "temperature",
+            "value": float(minute * 10 + second // 15),
+        }
+        for minute in range(3)
+        for second in (0, 15, 30, 45)
+    ]
+    client.post("/telemetry/batch", json={"device_id": device_id, "points": points})
+
+    response = client.get(f"/telemetry/{device_id}?resolution=1m&metric=temperature")
+    assert response.status_code == 200
+
+    buckets = response.json()
+    assert [b["bucket_start"][:16] for b in buckets] == [
+        "2026-01-01T00:02",
+        "2026-01-01T00:01",
+        "2026-01-01T00:00",
+    ]
+    newest = buckets[0]
+    assert newest["count"] == 4
+    assert newest["min"] == 20.0
+    assert newest["max"] == 23.0
+    assert newest["sum"] == 86.0
+    assert newest["last"] == 23.0
+
+    response = client.get(f"/telemetry/{device_id}?resolution=1h")
+    (hourly,) = response.json()
+    assert hourly["count"] == 12
+    assert hourly["min"] == 0.0
+    assert hourly["max"] == 23.0
+
+
+def test_non_finite_values_are_left_out_of_rollups(client, device_id):
+    """NaN and infinite values are stored raw but skipped by rollups."""
+    body = (
+        '{"device_id": "%s", "points": ['
+        '{"device_id": "%s", "timestamp": "2026-01-02T00:00:00", '
+        '"metric": "load", "value": NaN}, '
+        '{"device_id": "%s", "timestamp": "2026-01-02T00:00:10", '
+        '"metric": "load", "value": Infinity}, '
+        '{"device_id": "%s", "timestamp": "2026-01-02T00:00:20", '
+        '"metric": "load", "value": 4.0}]}'
+    ) % ((device_id,) * 4)
+
+    response = client.post(
+        "/telemetry/batch",
+        content=body,
+        headers={"content-type": "application/json"},
+    )
+    assert response.status_code == 202
+
+    response = client.get(f"/telemetry/{device_id}?resolution=1m&metric=load")
+    (bucket,) = response.json()
+    assert bucket["count"] == 1
+    assert bucket["sum"] == 4.0
+
+
+def test_cold_tier_moves_aged_chunks(client, device_id, monkeypatch, tmp_path):
+    """Aged chunks move to disk segments and queries merge both tiers."""
+    from app.config.settings import get_settings
+    from app.storage.telemetry_tiering import get_tier_compactor
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "telemetry_cold_tier_enabled", True)
+    monkeypatch.setattr(settings, "telemetry_cold_tier_path", str(tmp_path))
+
+    base = (datetime.utcnow() - timedelta(days=2)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+    def point(minutes, value):
+        return {
+            "device_id": device_id,
+            "timestamp": (base + timedelta(minutes=minutes)).isoformat(),
+            "metric": "temperature",
+            "value": value,
+            "unit": "celsius",
+        }
+
+    points = [point(minute, 20.0 + minute) for minute in range(10)]
+    client.post("/telemetry/batch", json={"device_id": device_id, "points": points})
+
+    moved = client.portal.call(get_tier_compactor().run_once)
+    assert moved == 1
+    assert list(tmp_path.rglob("*.seg"))
+
+    late = [point(10, 99), point(24 * 60, 1.5)]
+    client.post("/telemetry/batch", json={"device_id": device_id, "points": late})
+
+    response = client.get(f"/telemetry/{device_id}?metric=temperature&limit=100")
+    values = [p["value"] for p in response.json()]
+    assert values == [1.5, 99] + [20.0 + m for m in reversed(range(10))]
+    assert response.json()[-1]["unit"] == "celsius"
+
+    start = (base + timedelta(minutes=3)).isoformat()
+    end = (base + timedelta(minutes=5)).isoformat()
+    response = client.get(
+        f"/telemetry/{device_id}?metric=temperature&start_time={start}&end_time={end}"
+    )
+    assert [p["value"] for p in response.json()] == [25.0, 24.0, 23.0]
+
+    client.portal.call(get_tier_compactor().run_once)
+    latest = client.get(f"/telemetry/{device_id}/temperature/latest").json()
+    assert latest["value"] == 1.5
+
+
+def test_bulk_latest_values_for_group(client, unique_id):
+    """Bulk latest lookup returns each device's newest value per metric."""
+    group_id = f"wallboard-{unique_id}"
+    device_ids = [
+        client.post(
+            "/devices",
+            json={
+                "serial_number": f"SN-{unique_id}-{n}",
+                "device_type": "sensor",
+                "firmware_version": "1.0.0",
+                "group_id": group_id,
+            },
+            headers={"idempotency-key": f"reg-{unique_id}-{n}"},
+        ).json()["id"]
+        for n in range(3)
+    ]
+
+    for n, device_id in enumerate(device_ids):
+        points = [
+            {
+                "device_id": device_id,
+                "timestamp": f"2026-01-01T00:0{minute}:00",
+                "metric": "temperature",
+                "value": float(n * 10 + minute),
+            }
+            for minute in (2, 0, 1)
+        ]
+        client.post("/telemetry/batch", json={"device_id": device_id, "points": points})
+
+    late = {
+        "device_id": device_ids[0],
+        "timestamp": "2026-01-01T00:00:30",
+        "metric": "temperature",
+        "value": -1.0,
+    }
+    client.post("/telemetry/point", json=late)
+
+    response = client.post("/telemetry/latest", json={"group_id": group_id})
+    assert response.status_code == 200
+
+    latest = response.json()
+    assert set(latest) == set(device_ids)
+    for n, device_id in enumerate(device_ids):
+        assert latest[device_id]["temperature"]["value"] == float(n * 10 + 2)
+
+    response = client.post(
+        "/telemetry/latest",
+        json={"device_ids": [device_ids[1], "unknown"], "metrics": ["temperature"]},
+    )
+    assert response.json() == {
+        device_ids[1]: {
+            "temperature": {
+                "timestamp": "2026-01-01T00:02:00",
+                "value": 12.0,
+                "unit": "",
+                "metadata": {},
+            }
+        },
+        "unknown": {},
+    }
+
+
+def test_duplicate_batches_are_acknowledged_once(client, device_id):
+    """Retried batches with the same batch ID or sequence skip ingestion."""
+
+    def batch(value, **identity):
+        return {
+            "device_id": device_id,
+            "points": [
+                {
+                    "device_id": device_id,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "metric": "temperature",
+                    "value": value,
+                }
+            ],
+            **identity,
+        }
+
+    first = client.post("/telemetry/batch", json=batch(1.0, batch_id="b-1"))
+    retry = client.post("/telemetry/batch", json=batch(1.0, batch_id="b-1"))
+    assert first.json()["status"] == "accepted"
+    assert retry.status_code == 202
+    assert retry.json()["status"] == "duplicate"
+
+    keyed = client.post(
+        "/telemetry/batch", json=batch(2.0), headers={"idempotency-key": "b-2"}
+    )
+    keyed_retry = client.post(
+        "/telemetry/batch", json=batch(2.0), headers={"idempotency-key": "b-2"}
+    )
+    assert keyed.json()["status"] == "accepted"
+    assert keyed_retry.json()["status"] == "duplicate"
+
+    for sequence in (7, 8, 7):
+        client.post("/telemetry/batch", json=batch(3.0, sequence=sequence))
+
+    metrics = client.get(f"/analytics/devices/{device_id}").json()
+    assert metrics["message_count"] == 4
+
+
+def test_concurrent_batch_retries_are_ingested_once(client, device_id, monkeypatch):
+    """Concurrent retries race on one atomic claim; rejected batches release it."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.config.settings import get_settings
+
+    def send(batch_id, size=1):
+        return client.post(
+            "/telemetry/batch",
+            json={
+                "device_id": device_id,
+                "batch_id": batch_id,
+                "points": [
+                    {
+                        "device_id": device_id,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "metric": "temperature",
+                        "value": 1.0,
+                    }
+                    for _ in range(size)
+                ],
+            },
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(send, ["race"] * 8))
+    statuses = [response.json()["status"] for response in responses]
+    assert statuses.count("accepted") == 1
+    assert statuses.count("duplicate") == 7
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "rate_limit_telemetry_points_per_device", 1)
+    assert send("limited", 2).status_code == 413
+    monkeypatch.setattr(settings, "rate_limit_telemetry_points_per_device", 10000)
+    assert send("limited", 2).json()["status"] == "accepted"
+
+
+def test_pipeline_runs_side_stages_asynchronously(unique_id, monkeypatch):
+    """Async side stages report per-stage stats and drain on shutdown."""
+    from fastapi.testclient import TestClient
+
+    from app.config.settings import get_settings
+    from app.main import app
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "ingest_pipeline_async_side_stages", True)
+
+    with TestClient(app) as client:
+        device_id = client.post(
+            "/devices",
+            json={
+                "serial_number": f"SN-{unique_id}",
+                "device_type": "sensor",
+                "firmware_version": "1.0.0",
+            },
+            headers={"idempotency-key": f"reg-{unique_id}"},
+        ).json()["id"]
+
+        for batch in range(3):
+            response = client.post(
+                "/telemetry/batch",
+                json={
+                    "device_id": device_id,
+                    "points": [
+                        {
+                            "device_id": device_id,
+                            "timestamp": datetime.utcnow().isoformat(),
+                            "metric": "pressure",
+                            "value": float(batch * 10 + i),
+                        }
+                        for i in range(5)
+                    ],
+                },
+            )
+            assert response.status_code == 202
+
+        stages = client.get("/health").json()["pipeline"]
+        assert stages["storage"]["mode"] == "inline"
+        assert stages["storage"]["processed"] >= 3
+        assert stages["alerts"]["mode"] == "async"
+        assert "queue_depth" in stages["events"]
+        assert "avg_latency_ms" in stages["activity"]
+
+    with TestClient(app) as client:
+        response = client.get(f"/telemetry/{device_id}?metric=pressure")
+        assert len(response.json()) == 15
+        metrics = client.get(f"/analytics/devices/{device_id}").json()
+        assert metrics["message_count"] == 15
+
+
+def test_large_batches_are_prepared_in_process_pool(unique_id, monkeypatch):
+    """Batches above the offload threshold are decoded out of process."""
+    from fastapi.testclient import TestClient
+
+    from app.config.settings import get_settings
+    from app.core.offload import get_batch_offloader
+    from app.main import app
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "telemetry_offload_enabled", True)
+    monkeypatch.setattr(settings, "telemetry_offload_workers", 1)
+    monkeypatch.setattr(settings, "telemetry_offload_min_bytes", 1024)
+
+    with TestClient(app) as client:
+        device_id = client.post(
+            "/devices",
+            json={
+                "serial_number": f"SN-{unique_id}",
+                "device_type": "sensor",
+                "firmware_version": "1.0.0",
+            },
+            headers={"idempotency-key": f"reg-{unique_id}"},
+        ).json()["id"]
+
+        points = [
+            {
+                "device_id": device_id,
+                "timestamp": f"2026-01-01T00:{i // 60:02d}:{i % 60:02d}",
+                "metric": "temperature",
+                "value": 20.0 + i,
+                "unit": "celsius",
+            }
+            for i in range(50)
+        ]
+        offloaded = get_batch_offloader().offloaded_batches
+
+        response = client.post(
+            "/telemetry/batch", json={"device_id": device_id, "points": points}
+        )
+        assert response.status_code == 202
+        assert response.json()["count"] == 50
+        assert get_batch_offloader().offloaded_batches == offloaded + 1
+
+        response = client.get(f"/telemetry/{device_id}?metric=temperature&limit=100")
+        assert [p["value"] for p in response.json()] == [
+            20.0 + i for i in reversed(range(50))
+        ]
+
+        invalid = [{**p, "timestamp": "not-a-time"} for p in points]
+        response = client.post(
+            "/telemetry/batch", json={"device_id": device_id, "points": invalid}
+        )
+        assert response.status_code == 422
+
+
+def test_stream_ingestion_recovers_entries_from_crashed_consumer(
+    unique_id, monkeypatch
+):
+    """Stream mode acks on append; a persister reclaims a dead consumer's entries."""
+    import time
+
+    from fastapi.testclient import TestClient
+
+    from app.config.settings import get_settings
+    from app.main import app
+    from app.services.stream_persister import get_stream_persister
+    from app.storage.ingest_stream import get_ingest_stream_store
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "telemetry_stream_ingest_enabled", True)
+    monkeypatch.setattr(settings, "telemetry_stream_in_process_consumer", False)
+    monkeypatch.setattr(settings, "telemetry_stream_block_ms", 50)
+    monkeypatch.setattr(settings, "telemetry_stream_claim_idle_ms", 0)
+    monkeypatch.setattr(settings, "telemetry_stream_claim_interval_ms", 50)
+
+    with TestClient(app) as client:
+        stream = get_ingest_stream_store()
+        client.portal.call(stream.ensure_groups)
+
+        device_id = client.post(
+            "/devices",
+            json={
+                "serial_number": f"SN-{unique_id}",
+                "device_type": "sensor",
+                "firmware_version": "1.0.0",
+            },
+            headers={"idempotency-key": f"reg-{unique_id}"},
+        ).json()["id"]
+
+        response = client.post(
+            "/telemetry/batch",
+            json={
+                "device_id": device_id,
+                "points": [
+                    {
+                        "device_id": device_id,
+                        "timestamp": f"2026-01-01T00:00:0{i}",
+                        "metric": "flow",
+                        "value": float(i),
+                    }
+                    for i in range(5)
+                ],
+            },
+        )
+        assert response.status_code == 202
+        assert client.get(f"/telemetry/{device_id}?metric=flow").json() == []
+
+        entries = client.portal.call(stream.read, "crashed-worker", 10000, None)
+        assert device_id in {entry.device_id for entry in entries}
+
+        client.portal.call(get_stream_persister().start, "recovery-worker")
+        for _ in range(100):
+            points = client.get(f"/telemetry/{device_id}?metric=flow").json()
+            if len(points) == 5:
+                break
+            time.sleep(0.02)
+        assert len(points) == 5
+
+        stats = client.get("/health").json()["ingest_stream"]
+        assert stats["consumer"] == "recovery-worker"
+        assert stats["claimed_entries"] >= 1
+
+
+def test_stream_persister_writes_through_before_ack(unique_id, monkeypatch):
+    """Persisted stream entries are stored before they are acked."""
+    from fastapi.testclient import TestClient
+
+    from app.config.settings import get_settings
+    from app.main import app
+    from app.services.stream_persister import get_stream_persister
+    from app.storage.ingest_stream import get_ingest_stream_store
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "telemetry_stream_ingest_enabled", True)
+    monkeypatch.setattr(settings, "telemetry_stream_in_process_consumer", False)
+    monkeypatch.setattr(settings, "telemetry_write_behind_enabled", True)
+    monkeypatch.setattr(settings, "telemetry_write_behind_linger_ms", 60000)
+
+    device_id = f"device-{unique_id}"
+    with TestClient(app) as client:
+        stream = get_ingest_stream_store()
+        client.portal.call(stream.ensure_groups)
+
+        response = client.post(
+            "/telemetry/batch",
+            json={
+                "device_id": device_id,
+                "points": [
+                    {
+                        "device_id": device_id,
+                        "timestamp": f"2026-01-01T00:00:0{i}",
+                        "metric": "flow",
+                        "value": float(i),
+                    }
+                    for i in range(3)
+                ],
+            },
+        )
+        assert response.status_code == 202
+
+        entries = client.portal.call(stream.read, f"worker-{unique_id}", 10000, None)
+        entries = [entry for entry in entries if entry.device_id == device_id]
+        assert client.portal.call(get_stream_persister().persist, entries) == 1
+
+        points = client.get(f"/telemetry/{device_id}?metric=flow").json()
+        assert len(points) == 3
+        assert client.get("/health").json()["write_behind"]["buffered_points"] == 0
+
+
+def test_stream_persister_acks_malformed_entries(unique_id, monkeypatch):
+    """Stream entries with missing fields are dropped instead of retried forever."""
+    from fastapi.testclient import TestClient
+
+    from app.config.settings import get_settings
+    from app.main import app
+    from app.services.stream_persister import get_stream_persister
+    from app.storage.ingest_stream import get_ingest_stream_store
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "telemetry_stream_ingest_enabled", True)
+    monkeypatch.setattr(settings, "telemetry_stream_in_process_consumer", False)
+
+    consumer = f"worker-{unique_id}"
+    with TestClient(app) as client:
+        stream = get_ingest_stream_store()
+        client.portal.call(stream.ensure_groups)
+
+        key = stream.stream_keys()[0]
+        client.portal.call(stream.redis.xadd, key, {"device_id": unique_id})
+
+        entries = client.portal.call(stream.read, consumer, 10000, None)
+        assert unique_id in {entry.device_id for entry in entries}
+
+        persister = get_stream_persister()
+        poison = persister.poison_entries
+        client.portal.call(persister.persist, entries)
+        assert persister.poison_entries > poison
+
+        pending = client.portal.call(stream.read, consumer, 10000, None, True)
+        assert unique_id not in {entry.device_id for entry in pending}
+
+
+def test_stream_persister_pages_through_own_pending_entries(unique_id, monkeypatch):
+    """A restarted persister drains every entry it left pending, not one page."""
+    import time
+
+    from fastapi.testclient import TestClient
+
+    from app.config.settings import get_settings
+    from app.main import app
+    from app.services.stream_persister import get_stream_persister
+    from app.storage.ingest_stream import get_ingest_stream_store
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "telemetry_stream_ingest_enabled", True)
+    monkeypatch.setattr(settings, "telemetry_stream_in_process_consumer", False)
+    monkeypatch.setattr(settings, "telemetry_stream_partitions", 1)
+    monkeypatch.setattr(settings, "telemetry_stream_read_count", 2)
+
+    device_id = f"device-{unique_id}"
+    consumer = f"worker-{unique_id}"
+    with TestClient(app) as client:
+        stream = get_ingest_stream_store()
+        client.portal.call(stream.ensure_groups)
+
+        for i in range(5):
+            response = client.post(
+                "/telemetry/point",
+                json={
+                    "device_id": device_id,
+                    "timestamp": f"2026-01-01T00:00:0{i}",
+                    "metric": "flow",
+                    "value": float(i),
+                },
+            )
+            assert response.status_code == 202
+
+        assert len(client.portal.call(stream.read, consumer, 10000, None)) == 5
+
+        persister = get_stream_persister()
+        claimed = persister.claimed_entries
+        client.portal.call(persister.start, consumer)
+        for _ in range(100):
+            points = client.get(f"/telemetry/{device_id}?metric=flow").json()
+            if len(points) == 5:
+                break
+            time.sleep(0.02)
+        assert len(points) == 5
+        assert persister.claimed_entries == claimed
+
+
+def test_stream_ingestion_rejects_appends_when_backlog_is_full(unique_id, monkeypatch):
+    """A full ingest stream answers 503 instead of trimming unpersisted entries."""
+    from fastapi.testclient import TestClient
+
+    from app.config.settings import get_settings
+    from app.main import app
+    from app.services.stream_persister import get_stream_persister
+    from app.storage.ingest_stream import get_ingest_stream_store
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "telemetry_stream_ingest_enabled", True)
+    monkeypatch.setattr(settings, "telemetry_stream_in_process_consumer", False)
+    monkeypatch.setattr(settings, "telemetry_stream_partitions", 1)
+    monkeypatch.setattr(settings, "telemetry_stream_max_len", 3)
+
+    device_id = f"device-{unique_id}"
+
+    def send(i):
+        return client.post(
+            "/telemetry/point",
+            json={
+                "device_id": device_id,
+                "timestamp": f"2026-01-01T00:00:0{i}",
+                "metric": "flow",
+                "value": float(i),
+            },
+        )
+
+    with TestClient(app) as client:
+        stream = get_ingest_stream_store()
+        client.portal.call(stream.ensure_groups)
+
+        for i in range(3):
+            assert send(i).status_code == 202
+
+        response = send(3)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+
+        entries = client.portal.call(stream.read, f"worker-{unique_id}", 10000, None)
+        assert len(entries) == 3
+        assert client.portal.call(get_stream_persister().persist, entries) == 3
+        assert client.portal.call(stream.get_stats)["length"] == 0
+
+        assert send(3).status_code == 202
+        assert len(client.get(f"/telemetry/{device_id}?metric=flow").json()) == 3